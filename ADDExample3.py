@@ -24,7 +24,8 @@
 # This file is part of the SAND library
  
 from sand.add import *
-import math, random
+from sand.cost import CostModel
+import random
 
 numNodes = 250
 # Node labels:
@@ -33,14 +34,8 @@ labels = [str(i) for i in range(numNodes)]
 # Node positions:
 pos = {i:(random.random() , random.random()) for i in range(numNodes)}
 
-# Set cost matrix:
-cost = [[2**32-1 for i in range(numNodes)] for i in range(numNodes)]
-for i in range(numNodes):
-    for j in range(i, numNodes):
-        r1, c1 = pos[i]
-        r2, c2 = pos[j]
-        d = round(math.sqrt(abs(r1-r2) + abs(c1-c2)) * 1000)
-        cost[i][j] = cost[j][i] = d
+# Set cost model, computing the cost matrix entries when they are needed:
+cost = CostModel(pos, metric="sqrtmanhattan", scale=1000, rounded=True)
 
 # Locate the centre node near the centre of the graph:
 dmin=2**32-1
@@ -66,7 +61,8 @@ out = algo.run(cost, Ccost, weight, Wlimit=5, center=ncenter)
 
 # Print results
 printCost(out, cost)
-plotNetwork(out, pos, labels, title="ADD Algorithm - Example 3")
+plotNetwork(out, pos, labels, title="ADD Algorithm - Example 3",
+            show=True)
 
 
 
@@ -62,6 +62,7 @@ out = algo.run(cost, req, wparm=1, rparm=0.5, dparm=0.5, alpha=1.0, cap=32, slac
 
 # Print results:
 printCost(out, cost, labels)
-plotNetwork(out, pos, labels, title="MENTOR Algorthim - Example #1")
+plotNetwork(out, pos, labels, title="MENTOR Algorthim - Example #1",
+            show=True)
     
 
@@ -24,7 +24,8 @@
 # This file is part of the SAND library
  
 from sand.mentor import *
-import math, random
+from sand.cost import CostModel
+import random
 
 numNodes = 250
 # Node labels:
@@ -33,16 +34,9 @@ labels = [str(i) for i in range(numNodes)]
 # Node positions:
 pos = {i:(random.random() , random.random()) for i in range(numNodes)}
 
-# Set cost matrix:
+# Set cost model, computing the cost matrix entries when they are needed:
 base_cost = 1000
-cost = [[2**32-1 for j in range(numNodes)] for i in range(numNodes)]
-for i in range(numNodes):
-    for j in range(i, numNodes):
-        r1, c1 = pos[i]
-        r2, c2 = pos[j]
-        d = round(math.sqrt(abs(r1-r2) + abs(c1-c2)) * base_cost)
-        cost[i][j] = cost[j][i] = d
-       
+cost = CostModel(pos, metric="sqrtmanhattan", scale=base_cost, rounded=True)
 
 # Set traffic requirements matrix:
 base_cap = 1 # Mbps
@@ -54,6 +48,7 @@ out = algo.run(cost, req, wparm=0.95, rparm=0.5, dparm=0.5, alpha=0.5, cap=1000*
 
 # Print results:
 printCost(out, cost, labels)
-plotNetwork(out, pos, labels, edisp=False, title="MENTOR Algorthim - Example #2")
+plotNetwork(out, pos, labels, edisp=False, title="MENTOR Algorthim - Example #2",
+            show=True)
 
 
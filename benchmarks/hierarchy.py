@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# This file compares the hierarchical design of sand/hierarchy.py with the 
+# flat design, in which ADD chooses the concentrators of all the nodes at 
+# once, on instances small enough for both. The nodes are placed as in 
+# instances.py, with random traffic between 0 and 10 for every pair.
+#
+# Usage: python benchmarks/hierarchy.py [--size SIZE] [--wlimit W] [n1 n2 ...]
+
+import argparse, os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from sand.hierarchy import compareFlat
+from benchmarks.instances import positions
+
+try:
+    import numpy as np
+except ImportError:                 # traffic is a list of lists
+    np = None
+
+def traffic(n, seed):
+    if np is not None:
+        return np.random.default_rng(seed).random((n, n)) * 10
+    import random
+    rnd = random.Random(seed + 1)
+    return [[rnd.random() * 10 for j in range(n)] for i in range(n)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python benchmarks/hierarchy.py",
+                description="Compare the hierarchical and the flat designs.")
+    parser.add_argument("sizes", nargs="*", type=int, 
+                        default=[500, 1000, 2000])
+    parser.add_argument("--size", type=int, default=250,
+                        help="nodes per region (default 250)")
+    parser.add_argument("--wlimit", type=int, default=10)
+    parser.add_argument("--cap", type=float, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    print('%8s%8s%12s%12s%10s%12s%12s%8s' % ('Nodes', 'Regions', 'Flat (s)', 
+                'Hier (s)', 'Speedup', 'Flat cost', 'Hier cost', 'Gap'))
+    for n in args.sizes:
+        r = compareFlat(positions(n, args.seed), traffic(n, args.seed), 
+                        size=args.size, Wlimit=args.wlimit, 
+                        workers=args.workers,
+                        addOptions={"backend": "numpy"} if np else None, 
+                        mentorOptions={"cap": args.cap})
+        print('%8d%8d%12.2f%12.2f%10.1f%12d%12d%7.1f%%' % (n, r["regions"], 
+                r["time"][1], r["time"][0], r["speedup"], r["cost"][1], 
+                r["cost"][0], 100 * r["gap"]))
+        sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy 
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights 
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell 
+# copies of the Software, and to permit persons to whom the Software is 
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, 
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE 
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER 
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, 
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# This file includes generators of random instances for the benchmarks. 
+# Nodes are placed at random in the unit square, like in ADDExample3.py and 
+# MentorExample2.py, and the cost between two nodes is the square root of 
+# their Manhattan distance times 1000, rounded. The same seed gives the same
+# instance. The cost can be a matrix (a numpy array of 32 bit integers, or a
+# list of lists without numpy) or a cost model.
+
+import random
+from sand.cost import CostModel
+from sand.main import getColumn
+
+try:
+    import numpy as np
+except ImportError:                 # matrices are lists, built row by row
+    np = None
+
+BASE_COST = 1000
+
+# Place n nodes at random, with the positions as in the examples
+def positions(n, seed):
+    rnd = random.Random(seed)
+    return {i:(rnd.random(), rnd.random()) for i in range(n)}
+
+# Return the cost between the nodes at pos as a "matrix", a "list" of lists
+# or a cost "model". Matrices are built a block of rows at a time, with the
+# same values as the cost model.
+def costMatrix(pos, form="matrix"):
+    model = CostModel(pos, metric="sqrtmanhattan", scale=BASE_COST, 
+                      rounded=True)
+    if form == "model":
+        return model
+    if form == "list" or np is None:
+        return [model[i] for i in range(len(pos))]
+    if form != "matrix":
+        raise ValueError("Unknown form '%s'" % form)
+
+    n = len(pos)
+    P = np.array([pos[i] for i in range(n)], dtype=np.float64).reshape(-1, 2)
+    cost = np.empty((n, n), dtype=np.int32)
+    step = max(1, (1 << 22) // max(1, n))
+    for b in range(0, n, step):
+        d = (np.abs(P[b:b+step, None, 0] - P[None, :, 0]) + 
+             np.abs(P[b:b+step, None, 1] - P[None, :, 1]))
+        cost[b:b+step] = np.rint(np.sqrt(d) * BASE_COST)
+    return cost
+
+# An instance of ADD with n nodes, which are both the terminals and the 
+# possible concentrators, as in ADDExample3.py. The center is the node 
+# nearest to the middle of the square.
+def addInstance(n, seed, form="matrix"):
+    pos = positions(n, seed)
+    cost = costMatrix(pos, form)
+    center = min(pos, key=lambda i: (pos[i][0] - 0.5)**2 + (pos[i][1] - 0.5)**2)
+    Ccost = [c + 100 for c in getColumn(cost, center)]
+    Ccost[center] = 0
+    weight = [1] * n
+    return pos, cost, Ccost, weight, center
+
+# An instance of MENTOR with n nodes and random traffic between 0 and 10 for
+# every pair, as in MentorExample2.py. The traffic is the same for every 
+# form, and a list of lists with form "list".
+def mentorInstance(n, seed, form="matrix"):
+    pos = positions(n, seed)
+    cost = costMatrix(pos, form)
+    if np is not None:
+        req = np.random.default_rng(seed).random((n, n)) * 10
+        if form == "list":
+            req = req.tolist()
+    else:
+        rnd = random.Random(seed + 1)
+        req = [[rnd.random() * 10 for j in range(n)] for i in range(n)]
+    return pos, cost, req
+
+# A random tree over n random nodes, as a list of predecessors, with the
+# cost matrix as a list of lists and the root
+def randomTree(n, seed):
+    rnd = random.Random(seed)
+    pos = {i:(rnd.random(), rnd.random()) for i in range(n)}
+    cost = costMatrix(pos, "list")
+    nodes = list(range(n))
+    rnd.shuffle(nodes)
+    pred = [0] * n
+    pred[nodes[0]] = nodes[0]
+    for k in range(1, n):
+        pred[nodes[k]] = nodes[rnd.randrange(k)]
+    return cost, nodes[0], pred
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy 
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights 
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell 
+# copies of the Software, and to permit persons to whom the Software is 
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, 
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE 
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER 
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, 
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# This file compares the time MENTOR takes to compute the tree distances and
+# predecessors (MENTOR.__setDist) with the earlier implementation, which 
+# rescanned all nodes to find the preorder and filled the tables with nested
+# loops. Both must give the same tables.
+#
+# Usage: python benchmarks/setdist.py [n1 n2 ...]
+
+import os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from sand.main import getItem
+from sand.mentor import MENTOR
+from benchmarks.instances import randomTree
+
+# The earlier implementation of MENTOR.__setDist
+def oldSetDist(nt, cost, root, pred):
+    preOrder = [root]
+    n = 1
+    while n < nt:
+        for i in range(nt):
+            if((i not in preOrder) and (pred[i] in preOrder)):
+                preOrder.append(i)
+                n += 1
+
+    spDist = [[0 for j in range(nt)] for i in range(nt)]
+    for i in range(nt):
+        j = preOrder[i]
+        p = pred[j]
+        for k in range(i):
+            l = preOrder[k]
+            spDist[j][l] = spDist[l][j] = spDist[p][l] + getItem(cost, j, p)
+    
+    spPred = [[pred[j] for j in range(nt)] for i in range(nt)]
+    for i in range(nt):
+        spPred[i][i] = i
+    for i in range(nt):
+        if(i == root):
+            continue
+        p = pred[i]
+        spPred[i][p] = i
+        while(p != root):
+            pp = pred[p]
+            spPred[i][pp] = p
+            p = pp
+    
+    return spPred, spDist
+
+def tolist(m):
+    return m.tolist() if hasattr(m, "tolist") else m
+
+def main(sizes):
+    print('%8s%12s%12s%10s%6s' % ('Nodes', 'Old (s)', 'New (s)', 'Speedup', 
+                                  'Same'))
+    for n in sizes:
+        cost, root, pred = randomTree(n, n)
+        t = time.perf_counter()
+        old = oldSetDist(n, cost, root, pred)
+        told = time.perf_counter() - t
+
+        algo = MENTOR()
+        algo.nt = n
+        algo.cost = cost
+        t = time.perf_counter()
+        new = algo._MENTOR__setDist(root, pred)
+        tnew = time.perf_counter() - t
+
+        same = old[0] == tolist(new[0]) and old[1] == tolist(new[1])
+        print('%8d%12.3f%12.3f%10.1f%6s' % (n, told, tnew, told / tnew, same))
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [100, 200, 400, 800, 1600])
@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy 
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights 
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell 
+# copies of the Software, and to permit persons to whom the Software is 
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, 
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE 
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER 
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, 
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# This file runs the SAND algorithms on random instances of growing size, 
+# and reports the time of every stage and the peak memory of every run. 
+# Every variant of an algorithm (backends, caching, path tables, inputs) is 
+# checked against the reference variant, the first implementation kept in 
+# reference.py, which must give the same network. Results
+# can be saved as a baseline, and later runs are compared with it to catch
+# regressions.
+#
+# Usage:
+#   python -m benchmarks.suite --sizes 100 250 500 --save baseline.json
+#   python -m benchmarks.suite --sizes 100 250 500 --baseline baseline.json
+#
+# The exit status is 1 if a variant differs from the reference or is slower
+# than the baseline.
+
+import argparse, concurrent.futures, hashlib, json, multiprocessing, sys, time
+import tracemalloc
+
+from sand.add import ADD
+from sand.cache import StageCache
+from sand.mentor import MENTOR, totalCost
+from benchmarks import reference
+from benchmarks.instances import addInstance, mentorInstance
+
+# The arguments of run() for every variant. The first variant of every 
+# algorithm is the reference, which runs on the matrices as lists. Other
+# keys are:
+#   "form": the form of the cost matrix, instead of the one of the suite
+#   "cache": MENTOR runs with a StageCache, and the second run is timed
+#   "warm": MENTOR runs with warm=True, and two redesigns are timed, one 
+#           that changes the traffic and one that changes it back
+VARIANTS = {
+    "add": {"reference": {},
+            "default": {},
+            "incremental": {"incremental": True},
+            "lazy": {"incremental": True, "lazy": True},
+            "nearest": {"incremental": True, "k": 10},
+            "numpy": {"backend": "numpy"},
+            "numpy-lazy": {"backend": "numpy", "incremental": True, 
+                           "lazy": True},
+            "parallel": {"workers": 2},
+            "list": {"incremental": True, "form": "list"},
+            "model": {"incremental": True, "form": "model"}},
+    "mentor": {"reference": {},
+               "default": {"paths": "matrix"},
+               "lca": {"paths": "lca"},
+               "cache": {"cache": True},
+               "warm": {"warm": True},
+               "list": {"form": "list"},
+               "model": {"form": "model"}}}
+
+# Variants that can give another network than the reference. Their check is
+# the gap between their cost and the cost of the reference.
+APPROXIMATE = {("add", "nearest")}
+
+# The other arguments, as in ADDExample3.py and MentorExample2.py
+PARAMS = {"add": {"Wlimit": 5},
+          "mentor": {"wparm": 0.95, "rparm": 0.5, "dparm": 0.5, "alpha": 0.5,
+                     "cap": 1000, "slack": 0.2}}
+
+# Run a variant of an algorithm on the instance with n nodes. Returns the 
+# total time and the time of every stage in seconds, the peak memory that 
+# the run allocates in MB, the cost of the network and a digest of it. The
+# memory is measured by tracemalloc in a second run, so that tracing does 
+# not slow down the timed one. It does not include shared memory and the
+# memory of worker processes. With memory False it is not measured.
+def runCase(algorithm, n, variant, seed=1, form="matrix", memory=True):
+    kwargs = dict(PARAMS[algorithm], **VARIANTS[algorithm][variant])
+    form = kwargs.pop("form", form)
+    cache = kwargs.pop("cache", False)
+    warm = kwargs.pop("warm", False)
+    if algorithm == "add":
+        pos, cost, Ccost, weight, center = addInstance(n, seed, form)
+        algo = reference.ADD() if variant == "reference" else ADD()
+        args = (cost, Ccost, weight)
+        if variant == "reference":
+            args = (_lists(cost), Ccost, weight)
+        kwargs["center"] = center
+    else:
+        pos, cost, req = mentorInstance(n, seed, form)
+        if variant == "reference":
+            algo = reference.MENTOR()
+            args = (_lists(cost), _lists(req))
+        else:
+            algo = MENTOR(cache=StageCache() if cache else None)
+            args = (cost, req)
+
+    work = lambda: algo.run(*args, **kwargs)
+    if cache:
+        algo.run(*args, **kwargs)
+    if warm:
+        first = algo.run(*args, warm=True, **kwargs)
+        delta = {(i, (i * 7 + 3) % n): 5 for i in range(0, n, 10) 
+                                                  if (i * 7 + 3) % n != i}
+        back = {pair: -d for pair, d in delta.items()}
+        def work():
+            return algo.redesign(algo.redesign(first, delta), back)
+
+    start = time.perf_counter()
+    out = work()
+    total = time.perf_counter() - start
+    times = dict(getattr(algo, "times", {}))
+    if memory:
+        memory = _peakMemory(work)
+    else:
+        memory = None
+
+    if algorithm == "add":
+        network = (out["cost"], list(out["assoc"]))
+        value = out["cost"]
+    else:
+        network = (list(out["backbone"]), _links(out["tree"]), 
+                   _links(out["mesh"]), list(out["channels"]), out["median"])
+        value = totalCost(out, cost)
+    return {"algorithm": algorithm, "n": n, "variant": variant, 
+            "time": total, "stages": times, "memory": memory, 
+            "cost": value, 
+            "digest": hashlib.sha1(repr(network).encode()).hexdigest()}
+
+# Run every case in a new process, so that one case does not change the
+# others, repeat times, and keep the fastest run
+def runSuite(algorithms, sizes, variants=None, repeat=1, seed=1, 
+             form="matrix", memory=True):
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for algorithm in algorithms:
+        names = [v for v in VARIANTS[algorithm] 
+                                       if variants is None or v in variants]
+        for n in sizes:
+            reference = None
+            for variant in names:
+                best = None
+                for r in range(repeat):
+                    with concurrent.futures.ProcessPoolExecutor(1, 
+                                            mp_context=context) as executor:
+                        row = executor.submit(runCase, algorithm, n, variant, 
+                                              seed, form, memory).result()
+                    if best is None or row["time"] < best["time"]:
+                        best = row
+                if variant == "reference":
+                    reference = best
+                    best["check"] = "ref"
+                elif reference is None:
+                    best["check"] = "-"
+                elif (algorithm, variant) in APPROXIMATE:
+                    best["check"] = "%+.1f%%" % (100.0 * (best["cost"] / 
+                                        reference["cost"] - 1))
+                else:
+                    best["check"] = ("ok" if best["digest"] == 
+                                     reference["digest"] else "DIFF")
+                results.append(best)
+                yield best
+
+# Compare a result with the baseline, if there is one for the case. A time
+# is slower if it is more than tolerance above the baseline, and by more 
+# than minTime seconds; memory if it is more than tolerance and minMemory MB
+# above the baseline.
+def compareBaseline(row, baseline, tolerance=0.25, minTime=0.05, 
+                    minMemory=8):
+    base = baseline.get(_key(row))
+    if base is None:
+        return "-"
+    slower = []
+    times = dict(row["stages"], total=row["time"])
+    baseTimes = dict(base["stages"], total=base["time"])
+    for name, t in times.items():
+        b = baseTimes.get(name)
+        if b is not None and t > b * (1 + tolerance) and t - b > minTime:
+            slower.append(name)
+    if (row["memory"] is not None and base["memory"] is not None and 
+            row["memory"] > base["memory"] * (1 + tolerance) and 
+            row["memory"] - base["memory"] > minMemory):
+        slower.append("memory")
+    if slower:
+        return "SLOWER(%s)" % ",".join(slower)
+    return "%.2fx" % (row["time"] / base["time"] if base["time"] else 1)
+
+def loadBaseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+def saveBaseline(path, rows):
+    with open(path, "w") as f:
+        json.dump({_key(row): {"time": row["time"], "stages": row["stages"],
+                               "memory": row["memory"], "cost": row["cost"]}
+                   for row in rows}, f, indent=1, sort_keys=True)
+
+def _key(row):
+    return "%s/%d/%s" % (row["algorithm"], row["n"], row["variant"])
+
+# A matrix as a list of lists, for the reference
+def _lists(m):
+    if hasattr(m, "tolist"):
+        return m.tolist()
+    return [list(m[i]) for i in range(len(m))]
+
+# Links as lists of pairs, from the reference or from a result
+def _links(links):
+    return [(i, j) for i, j in links]
+
+# The peak memory allocated by f(*args, **kwargs) in MB
+def _peakMemory(f, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        f(*args, **kwargs)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2**20
+
+def _header():
+    return '%-8s%7s %-12s%9s%9s%6s %-11s %s' % ('Algo', 'Nodes', 'Variant', 
+                'Time(s)', 'Mem(MB)', 'Check', 'Baseline', 'Stages (s)')
+
+def _format(row, status):
+    memory = '-' if row["memory"] is None else '%.1f' % row["memory"]
+    stages = ' '.join(['%s=%.3f' % s for s in row["stages"].items()])
+    return '%-8s%7d %-12s%9.3f%9s%6s %-11s %s' % (row["algorithm"], row["n"],
+              row["variant"], row["time"], memory, row["check"], status, stages)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite",
+                       description="Time ADD and MENTOR on random instances.")
+    parser.add_argument("--algorithms", nargs="+", default=sorted(VARIANTS),
+                        choices=sorted(VARIANTS))
+    parser.add_argument("--sizes", nargs="+", type=int, 
+                        default=[100, 250, 500], help="numbers of nodes")
+    parser.add_argument("--variants", nargs="+", default=None, 
+                        help="variants to run (default: all)")
+    parser.add_argument("--form", default="matrix", 
+                        choices=["matrix", "list", "model"],
+                        help="form of the cost matrix")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1, 
+                        help="runs of every case, the fastest is kept")
+    parser.add_argument("--baseline", help="compare with this baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="slowdown allowed over the baseline")
+    parser.add_argument("--save", help="save the results as a baseline")
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="do not measure the peak memory")
+    args = parser.parse_args(argv)
+
+    baseline = loadBaseline(args.baseline) if args.baseline else {}
+    failed = False
+    rows = []
+    print(_header())
+    for row in runSuite(args.algorithms, args.sizes, args.variants, 
+                        args.repeat, args.seed, args.form, args.memory):
+        status = compareBaseline(row, baseline, args.tolerance)
+        failed |= row["check"] == "DIFF" or status.startswith("SLOWER")
+        print(_format(row, status))
+        sys.stdout.flush()
+        rows.append(row)
+    if args.save:
+        saveBaseline(args.save, rows)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
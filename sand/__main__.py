@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# This file runs ADD or MENTOR from the command line, on matrices read from 
+# files (see loaders.py), and writes the network found as JSON, without 
+# plotting it.
+#
+# Examples:
+#   python -m sand add cost.csv ccost.csv --wlimit 5 --center 3 -o add.json
+#   python -m sand mentor cost.npy req.edges --cap 1000 --paths lca
+#   python -m sand add costs ccost.csv --cost-format npy --wlimit 5
+
+import argparse, json, sys
+
+from .main import SANDAlgorithm
+from .loaders import FORMATS, fileFormat, holds, loadMatrix, loadVector
+
+# The value of the missing entries of a cost matrix given as an edge list,
+# as if there were no link
+NO_LINK = SANDAlgorithm().INF
+
+def runAdd(args):
+    from .add import ADD
+    cost = _load(args, "cost", cost=True)
+    Ccost = loadVector(args.ccost, _format(args, "ccost"), args.dtype)
+    weight = (loadVector(args.weight, _format(args, "weight"), args.dtype) 
+              if args.weight else [1] * len(cost))
+    out = ADD().run(cost, Ccost, weight, center=args.center, 
+                    Wlimit=args.wlimit, th_move=args.th_move, 
+                    incremental=args.incremental, backend=args.backend, 
+                    workers=args.workers, lazy=args.lazy, k=args.k)
+    return {"algorithm": "add", "cost": out["cost"], "center": out["center"],
+            "conc": sorted(out["conc"]), "assoc": out["assoc"], 
+            "stats": out["stats"]}
+
+def runMentor(args):
+    from .mentor import MENTOR, totalCost
+    cost = _load(args, "cost", cost=True)
+    req = _load(args, "req")
+    out = MENTOR().run(cost, req, wparm=args.wparm, rparm=args.rparm, 
+                       dparm=args.dparm, alpha=args.alpha, cap=args.cap, 
+                       slack=args.slack, paths=args.paths)
+    return {"algorithm": "mentor", "cost": totalCost(out, cost), 
+            "median": out["median"], "backbone": out["backbone"], 
+            "tree": out["tree"], "mesh": out["mesh"], 
+            "channels": out["channels"], "stats": out["stats"]}
+
+# The value of missing links in a matrix of type dtype, or None if the type
+# cannot hold NO_LINK. Floats get NO_LINK too rather than inf, whose 
+# savings (inf - inf) would be nan.
+def _noLink(dtype):
+    return NO_LINK if holds(dtype, NO_LINK) else None
+
+# The format of the input file name: its own option, or --format, or the 
+# one of its extension
+def _format(args, name):
+    return (getattr(args, name + "_format") or args.format or 
+            fileFormat(getattr(args, name)))
+
+# Edge lists of costs have no link between the nodes that are not given, 
+# and no cost from a node to itself
+def _load(args, name, cost=False):
+    path = getattr(args, name)
+    if cost:
+        return loadMatrix(path, _format(args, name), args.dtype, 
+                          default=_noLink(args.dtype), diagonal=0, 
+                          symmetric=args.symmetric)
+    return loadMatrix(path, _format(args, name), args.dtype, 
+                      symmetric=args.symmetric)
+
+# Numbers in the result can be numpy scalars
+def _json(x):
+    if hasattr(x, "tolist"):
+        return x.tolist()
+    raise TypeError("%s is not JSON serializable" % type(x).__name__)
+
+def _number(s):
+    try:
+        return int(s)
+    except ValueError:
+        return float(s)
+
+# Options for the format of every input file, over --format
+def _formatOptions(parser, names):
+    for name in names:
+        parser.add_argument("--%s-format" % name, choices=FORMATS, 
+                            help="format of the %s file (default: --format"
+                                 " or from its extension)" % name)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sand",
+                    description="Run ADD or MENTOR on matrices read from "
+                                "files, and write the network found as JSON.")
+    parser.add_argument("--format", choices=FORMATS, 
+                        help="format of all the input files (default: from "
+                             "their extension, .npy, .edges or text)")
+    parser.add_argument("--dtype", 
+                        help="type of the matrices, like int32 or float32")
+    parser.add_argument("--symmetric", action="store_true",
+                        help="edge lists give every entry in both directions")
+    parser.add_argument("-o", "--output", 
+                        help="file for the result (default: standard output)")
+    parser.add_argument("--log", help="file for the debug log")
+    subparsers = parser.add_subparsers(dest="algorithm", required=True)
+
+    add = subparsers.add_parser("add", help="concentrator location")
+    add.set_defaults(run=runAdd)
+    add.add_argument("cost", help="cost from terminals to concentrators")
+    add.add_argument("ccost", help="cost of every concentrator")
+    add.add_argument("--weight", help="terminal weights (default 1 for all)")
+    _formatOptions(add, ["cost", "ccost", "weight"])
+    add.add_argument("--center", type=int, default=0)
+    add.add_argument("--wlimit", type=_number, default=10)
+    add.add_argument("--th-move", type=_number, default=0)
+    add.add_argument("--backend", choices=["python", "numpy"], 
+                     default="python")
+    add.add_argument("--incremental", action="store_true")
+    add.add_argument("--lazy", action="store_true")
+    add.add_argument("--k", type=int)
+    add.add_argument("--workers", type=int)
+
+    mentor = subparsers.add_parser("mentor", help="mesh network design")
+    mentor.set_defaults(run=runMentor)
+    mentor.add_argument("cost", help="cost between the nodes")
+    mentor.add_argument("req", help="traffic between the nodes")
+    _formatOptions(mentor, ["cost", "req"])
+    mentor.add_argument("--wparm", type=float, default=0)
+    mentor.add_argument("--rparm", type=float, default=0.5)
+    mentor.add_argument("--dparm", type=float, default=0.5)
+    mentor.add_argument("--alpha", type=float, default=0.5)
+    mentor.add_argument("--cap", type=_number, default=1)
+    mentor.add_argument("--slack", type=float, default=0.4)
+    mentor.add_argument("--paths", choices=["matrix", "lca"], 
+                        default="matrix")
+    args = parser.parse_args(argv)
+    if _format(args, "cost") == "edges" and _noLink(args.dtype) is None:
+        parser.error("--dtype %s cannot hold the cost of missing links "
+                     "(%d), use a wider type" % (args.dtype, NO_LINK))
+
+    if args.log:
+        SANDAlgorithm().log(args.log)
+    result = args.run(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, default=_json)
+    else:
+        json.dump(result, sys.stdout, default=_json)
+        print()
+
+if __name__ == "__main__":
+    main()
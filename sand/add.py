@@ -26,41 +26,318 @@
 # Hill, Inc., New York, NY, USA.
 
 
-from .main import SANDAlgorithm
-import networkx as nx
-import matplotlib.pyplot as plt
+from .main import SANDAlgorithm, getRow, getColumn, getItem, asList
+from .result import ADDResult
+from multiprocessing import shared_memory
+import multiprocessing
+import bisect, heapq, math
+
+try:
+    import numpy as np
+except ImportError:                 # numpy is only needed by the array backend
+    np = None
 
 class ADD(SANDAlgorithm):  
+    blockSize = 1 << 22                 # Matrix entries per array block
+
     def __init__(self):
         SANDAlgorithm.__init__(self)
+        self.remConc = None
         
-    def run(self, cost, Ccost, weight, center=0, Wlimit=10, th_move=0):        
+    def run(self, cost, Ccost, weight, center=0, Wlimit=10, th_move=0, 
+            incremental=False, backend="python", workers=None, lazy=False, 
+            k=None):
+        self.logger.debug('Starting ADD Algorithm')
+        self.params = {"center": center, "Wlimit": Wlimit, "th_move": th_move,
+                       "incremental": incremental, "backend": backend, 
+                       "lazy": lazy, "k": k}
+        self.resetStats()
+        with self.timer("prepare"):
+            self.prepare(cost, Ccost, weight, center, Wlimit, th_move, 
+                         incremental, backend, lazy, k)
+        self.workers = workers              # Number of worker processes
+        if self.workers and self.lazy:
+            raise ValueError("Lazy evaluation does not use worker processes")
+
+        # Calculate the cost savings for the remaining concentrators
+        remConc = list(range(self.nc))
+        remConc.remove(self.center)
+        self.logger.debug("Concentrators to be evaluated = %s", remConc)
+
+        if self.workers:
+            self.__startPool()
+        try:
+            with self.timer("add"):
+                if self.lazy:
+                    self.__addLazy(remConc)
+                else:
+                    self.__addAll(remConc)
+        finally:
+            if self.workers:
+                self.__stopPool()
+        self.remConc = remConc              # Concentrators not added
+        
+        # Sanity check
+        tCost = sum([getItem(self.cost, t, self.Cassoc[t]) 
+                                                    for t in range(self.nt)])
+        cCost = sum([self.Ccost[c] for c in set(self.Cassoc)])
+        if((tCost + cCost) != self.cTotal):
+            self.logger.error("Something is wrong, \
+            detected cost discrepancy! %d %d %d", tCost, cCost, self.cTotal)
+            
+        return self.__result()
+
+    def __result(self):
+        # Number of evaluations of concentrators, and number of evaluations 
+        # avoided by caching or lazy evaluation, number of savings lists 
+        # sorted, with the other counters and the times of the stages
+        self.counters["evaluations"] = self.evaluations
+        self.counters["skipped"] = self.candidates - self.evaluations
+        self.counters["sorts"] = self.sorts
+            
+        return ADDResult(self.cTotal, self.center, self.Cassoc, self.getStats())
+
+    # Set the parameters of the problem and associate all terminals with the
+    # central location
+    def prepare(self, cost, Ccost, weight, center=0, Wlimit=10, th_move=0, 
+                incremental=False, backend="python", lazy=False, k=None):
         self.nt = len(cost)                 # Number of terminals
         self.nc = len(cost[0])              # Number of concentrators
         self.Wlimit = Wlimit                # Maximum number of terminals
         self.th_move = th_move              # Cost to move terminal  
         self.cost = cost                    # Cost matrix (nt x nc)
-        self.weight = weight                # Load vector (nt)
-        self.Ccost = Ccost                  # Cost to build a concentrator (nc)
+        self.weight = asList(weight)        # Load vector (nt)
+        self.Ccost = asList(Ccost)          # Cost to build a concentrator (nc)
         self.center = center                # Index of the central location
- 
+        self.incremental = incremental      # Reuse savings between rounds
+        self.backend = backend              # "python" or "numpy"
+        self.lazy = lazy                    # Skip hopeless concentrators
+        self.k = k                          # Concentrators per terminal
 
-        self.logger.debug('Starting ADD Algorithm')
         # Associate all nodes with the central location
         # and calculate the initial cost
         self.Cassoc = [self.center] * self.nt         # Association with a conc
-        self.cTotal = sum([self.cost[t][self.Cassoc[t]] 
-                            for t in range(self.nt)]) + self.Ccost[self.center]
-        self.logger.debug("Initial cost = %d" % self.cTotal)
+        self.Tcost = getColumn(self.cost, self.center) # Cost of the association
+        self.cTotal = sum(self.Tcost) + self.Ccost[self.center]
+        self.logger.debug("Initial cost = %d", self.cTotal)
 
-        # Calculate the cost savings for the remaining concentrators
-        remConc = list(range(self.nc))
-        remConc.remove(self.center)
-        self.logger.debug("Concentrators to be evaluated = %s" % remConc)
-        
+        # In incremental mode, the savings of every concentrator and the
+        # terminals that benefit from it are kept between rounds
+        self.saved = {}                     # Savings per concentrator
+        self.cand = {}                      # Candidate terminals per conc
+
+        # With k, a terminal is only moved to one of its k cheapest 
+        # concentrators. The result is exact if k covers all concentrators.
+        if self.k is not None and self.k < self.nc - 1:
+            self.__setNearest()
+        else:
+            self.near = None                # Terminals per concentrator
+
+        # In lazy mode, a lower bound of the savings of every concentrator is
+        # kept. With equal weights, savings never decrease from one round to
+        # the next so the last savings are a bound, otherwise the savings 
+        # without the Wlimit constraint are used.
+        self.bound = {}                     # Bound of savings per conc
+        self.uniform = len(set(self.weight)) <= 1
+        self.evaluations = 0                # Concentrators evaluated
+        self.sorts = 0                      # Savings lists sorted
+        self.candidates = 0                 # Concentrators to be evaluated
+        self.rows = None                    # Growable copy of the cost matrix
+
+        if self.backend == "numpy":
+            self.__setArrays()
+        elif self.backend != "python":
+            raise ValueError("Unknown backend '%s'" % self.backend)
+
+    # Return the savings of the concentrators in concs for the current 
+    # association, or for the association Cassoc if it is given
+    def evaluate(self, concs, Cassoc=None):
+        if Cassoc is not None:
+            self.Cassoc = list(Cassoc)
+            self.Tcost = [getItem(self.cost, t, c) 
+                                        for t, c in enumerate(self.Cassoc)]
+            self.saved = {}
+            self.cand = {}
+        if self.backend == "numpy":
+            self.__evalArray(concs)
+        return [self.__evalConc(c) for c in concs]
+
+    # Add a terminal to the solution of the last run, with its row of costs 
+    # to the concentrators and its weight. The terminal is given the last 
+    # index. It is associated with the cheapest concentrator that has room 
+    # for it, or with the central location, and then concentrators are added
+    # as in run(). Only the concentrators that the new terminal benefits 
+    # from are evaluated again. With compare, the result is compared with a
+    # cold run, see compare().
+    def insertTerminal(self, row, weight=1, compare=False):
+        self.__startUpdate()
+        if len(row) != self.nc:
+            raise ValueError("row has %d entries, expected %d" % 
+                                                          (len(row), self.nc))
+        t = self.nt
+        self.__insertRow(row)
+        self.weight.append(weight)
+        row = getRow(self.cost, t)
+
+        load = dict.fromkeys(set(range(self.nc)).difference(self.remConc), 0)
+        for u, c in enumerate(self.Cassoc):
+            load[c] += self.weight[u]
+        conc = self.center
+        for c in sorted(load):
+            if row[c] < row[conc] and load[c] + weight <= self.Wlimit:
+                conc = c
+        self.Cassoc.append(conc)
+        self.Tcost.append(row[conc])
+        self.cTotal += row[conc]
+        self.logger.debug("Terminal %d is associated with %d", t, conc)
+
+        # The terminal may change the savings of the concentrators it 
+        # benefits from, and is one of their candidates from now on
+        if self.near is not None:
+            concs = [c for c in range(self.nc) if c != self.center]
+            concs = heapq.nsmallest(self.k, concs, key=row.__getitem__)
+            for c in concs:
+                self.near[c].append(t)
+        else:
+            concs = self.remConc
+        for c in concs:
+            if row[c] < row[conc]:
+                self.saved.pop(c, None)
+                if c in self.cand:
+                    self.cand[c].append(t)
+        return self.__update(compare)
+
+    # Remove terminal t from the solution of the last run. The terminals 
+    # after t move down by one index. A concentrator that is left without
+    # terminals is removed, then concentrators are added as in run(). Only 
+    # the concentrators that t benefited from are evaluated again.
+    def deleteTerminal(self, t, compare=False):
+        self.__startUpdate()
+        if not 0 <= t < self.nt:
+            raise IndexError("terminal index out of range")
+        row = getRow(self.cost, t)
+        conc = self.Cassoc[t]
+        for c in self.remConc:
+            if row[c] < self.Tcost[t]:
+                self.saved.pop(c, None)
+
+        # Renumber the candidate terminals
+        lists = list(self.cand.values())
+        if self.near is not None:
+            lists += self.near
+        for terms in lists:
+            terms[:] = [u - (u > t) for u in terms if u != t]
+
+        self.cTotal -= self.Tcost[t]
+        del self.Cassoc[t], self.Tcost[t], self.weight[t]
+        self.__deleteRow(t)
+        self.logger.debug("Terminal %d is removed from %d", t, conc)
+        if conc != self.center and conc not in self.Cassoc:
+            self.cTotal -= self.Ccost[conc]
+            bisect.insort(self.remConc, conc)
+            # What was known of conc dates from the round it was added in
+            self.saved.pop(conc, None)
+            self.cand.pop(conc, None)
+            self.bound.pop(conc, None)
+            self.logger.debug("Concentrator %d is removed", conc)
+        return self.__update(compare)
+
+    # Compare the current solution with a cold run on the current terminals.
+    # gap is the cost of the current solution minus the cost of the cold 
+    # run, moved is the number of terminals associated differently and conc
+    # the concentrators used by only one of the solutions. Without terminals
+    # there is nothing to run, and both solutions are the same.
+    def compare(self):
+        if self.nt == 0:
+            return {"cost": self.cTotal, "cold": self.cTotal, "gap": 0, 
+                    "moved": 0, "conc": []}
+        cold = ADD().run(self.cost, self.Ccost, self.weight, **self.params)
+        moved = sum([a != b for a, b in zip(self.Cassoc, cold.assoc)])
+        return {"cost": self.cTotal, "cold": cold.cost, 
+                "gap": self.cTotal - cold.cost, "moved": moved, 
+                "conc": sorted(set(self.Cassoc) ^ cold["conc"])}
+
+    # Changes are always evaluated incrementally and in this process
+    def __startUpdate(self):
+        if self.remConc is None:
+            raise ValueError("There is no solution to change, call run() first")
+        if self.rows is None:
+            self.__setRows()
+        self.incremental = True
+        self.workers = None
+        self.resetStats()
+        self.evaluations = 0
+        self.sorts = 0
+        self.candidates = 0
+
+    def __update(self, compare):
+        self.uniform = len(set(self.weight)) <= 1
+        if self.backend == "numpy":
+            self.__setArrays()
+        if self.nt > 0:
+            with self.timer("add"):
+                if self.lazy:
+                    self.__addLazy(self.remConc)
+                else:
+                    self.__addAll(self.remConc)
+        out = self.__result()
+        if compare:
+            out.compare = self.compare()
+        return out
+
+    # Keep the cost matrix in a form that rows can be added to and removed
+    # from, without changing the matrix given to run(). Arrays are copied to
+    # a buffer with room for more rows, and self.cost is a view of it.
+    def __setRows(self):
+        if hasattr(self.cost, "column"):
+            raise ValueError("Terminals cannot be changed in a cost model")
+        if hasattr(self.cost, "shape") or self.backend == "numpy":
+            C = np.asarray(self.cost)
+            self.rows = np.empty((self.nt + self.nt // 4 + 16, self.nc), 
+                                 dtype=C.dtype)
+            self.rows[:self.nt] = C
+            self.cost = self.rows[:self.nt]
+        else:
+            self.rows = self.cost = list(self.cost)
+
+    def __insertRow(self, row):
+        if isinstance(self.rows, list):
+            self.rows.append(asList(row))
+        else:
+            row = np.asarray(row)
+            dtype = self.rows.dtype
+            if not np.array_equal(row.astype(dtype), row):
+                dtype = np.result_type(dtype, row)
+            if self.nt == len(self.rows) or dtype != self.rows.dtype:
+                rows = np.empty((self.nt + self.nt // 2 + 16, self.nc), 
+                                dtype=dtype)
+                rows[:self.nt] = self.cost
+                self.rows = rows
+            self.rows[self.nt] = row
+            self.cost = self.rows[:self.nt+1]
+        self.nt += 1
+
+    def __deleteRow(self, t):
+        if isinstance(self.rows, list):
+            del self.rows[t]
+        else:
+            self.rows[t:self.nt-1] = self.rows[t+1:self.nt]
+            self.cost = self.rows[:self.nt-1]
+        self.nt -= 1
+
+    # Add the concentrator with the largest savings, one at a time, while 
+    # there are savings
+    def __addAll(self, remConc):
         while len(remConc) > 0:
             savings = 0
             conc = 0
+            self.candidates += len(remConc)
+            if not self.incremental:
+                self.saved = {}
+            if self.workers:
+                self.__evalPool(remConc)
+            elif self.backend == "numpy":
+                self.__evalArray(remConc)
             for t in remConc:
                 expense = self.__evalConc(t)
                 if(expense < savings):
@@ -68,93 +345,349 @@ class ADD(SANDAlgorithm):
                     conc = t
 
             if(savings < 0):
-                self.__addConc(conc)
+                moved = self.__addConc(conc)
                 self.cTotal += savings
                 self.logger.debug("Concentrator %d \
-                         is added for total cost of %d" % (conc, self.cTotal))
+                         is added for total cost of %d", conc, self.cTotal)
                 remConc.remove(conc)
-                self.logger.debug("Current association = %s" % self.Cassoc)
+                self.saved.pop(conc, None)
+                if self.incremental:
+                    self.__invalidate(moved, remConc)
+                self.logger.debug("Current association = %s", self.Cassoc)
+            else:
+                self.logger.debug("No more savings!")
+                break
+
+    # Same as __addAll, but the concentrators are evaluated in the order of 
+    # their bounds, and only while their bound can beat the best savings
+    def __addLazy(self, remConc):
+        heap = [(-math.inf, c) for c in remConc]
+        while heap:
+            self.candidates += len(heap)
+            if not self.incremental:
+                self.saved = {}
+            savings = 0
+            conc = None
+            done = []
+            while heap and (heap[0][0] < savings or (heap[0][0] == savings 
+                                and conc is not None and heap[0][1] < conc)):
+                b, t = heapq.heappop(heap)
+                if self.backend == "numpy":
+                    self.__evalArray([t])
+                expense = self.__evalConc(t)
+                done.append(t)
+                if(expense < savings or (expense == savings and 
+                                         conc is not None and t < conc)):
+                    savings = expense
+                    conc = t
+
+            if conc is not None:
+                done.remove(conc)
+                remConc.remove(conc)
+                self.saved.pop(conc, None)
+            for t in done:
+                heapq.heappush(heap, (self.bound[t], t))
+
+            if(conc is not None):
+                moved = self.__addConc(conc)
+                self.cTotal += savings
+                self.logger.debug("Concentrator %d \
+                         is added for total cost of %d", conc, self.cTotal)
+                if self.incremental:
+                    self.__invalidate(moved, remConc)
+                self.logger.debug("Current association = %s", self.Cassoc)
             else:
                 self.logger.debug("No more savings!")
                 break
-        
-        # Sanity check
-        tCost = sum([self.cost[t][self.Cassoc[t]] for t in range(self.nt)])
-        cCost = sum([self.Ccost[c] for c in set(self.Cassoc)])
-        if((tCost + cCost) != self.cTotal):
-            self.logger.error("Something is wrong, \
-            detected cost discrepancy! %d %d %d" % (tCost, cCost, self.cTotal))
-            
-        return({"cost": self.cTotal, "center": self.center, "num": self.nt,
-                "assoc": self.Cassoc, "conc":set(self.Cassoc)})
 
     def __evalConc(self, c):
-        delta = [0] * self.nt
-        ter = [0] * self.nt
-        
-        expense = self.Ccost[c]
+        if c in self.saved:
+            return(self.saved[c])
+
+        delta, ter = self.__findSavings(c)
+        expense = free = self.Ccost[c]
         slack = self.Wlimit
-        n = 0
-        # Calculates the saving if any that results from 
-        # connecting terminal t to concentrator c
-        # count the number of terminals and
-        # save the terminal number in Ter
-        for t in range(self.nt):
-            s = self.cost[t][c] - self.cost[t][self.Cassoc[t]]
-            if(s < 0):
-                delta[n] = s    # amount saved
-                ter[n] = t      # terminal 
-                n += 1
-        
-        if(n==0): # no terminal benefited
-            return(expense)
-        
-        # Sort the savings, largest first and return index of sorted list
-        permu = sorted(range(len(delta)), key=lambda k: delta[k]) 
+        self.evaluations += 1
 
-        for p in permu:
-            t = ter[p]
-            if(delta[p] >= 0):
-                break
-            elif((self.weight[t]<=slack) and ((self.Cassoc[t]==self.center) 
-                                           or (delta[p] + self.th_move < 0))):
-                expense += delta[p]
-                slack -= self.weight[t]
+        if ter: 
+            # Sort the savings, largest first and return index of sorted list
+            permu = sorted(range(len(delta)), key=lambda k: delta[k]) 
+            self.sorts += 1
+
+            for p in permu:
+                t = ter[p]
+                if((self.Cassoc[t]==self.center) 
+                                           or (delta[p] + self.th_move < 0)):
+                    free += delta[p]
+                    if(self.weight[t]<=slack):
+                        expense += delta[p]
+                        slack -= self.weight[t]
                 
-        self.logger.debug("Savings for concentrator %d is %d" % (c, expense))
+            self.logger.debug("Savings for concentrator %d is %d", c, expense)
+
+        if self.incremental:
+            self.saved[c] = expense
+        if self.lazy:
+            self.bound[c] = expense if self.uniform else free
         return(expense)
 
     def __addConc(self, c):
-        delta = []
-        ter = []
-        for t in range(self.nt):
-            s = self.cost[t][c] - self.cost[t][self.Cassoc[t]]
-            if(s < 0):
-                delta.append(s)    # amount saved
-                ter.append(t)      # terminal 
+        delta, ter = self.__findSavings(c)
+        moved = []
      
         slack = self.Wlimit
         permu = sorted(range(len(delta)), key=lambda k: delta[k]) 
-        #permu = [b[0] for b in sorted(enumerate(delta), key=lambda k:k[1])] 
+        self.sorts += 1
         for p in permu:
             t = ter[p]
-            if(delta[p] >= 0):
-                break
-            elif((self.weight[t]<=slack) and ((self.Cassoc[t]==self.center) 
+            if((self.weight[t]<=slack) and ((self.Cassoc[t]==self.center) 
                                            or (delta[p] + self.th_move < 0))):
+                moved.append((t, self.Tcost[t]))
                 self.Cassoc[t] = c
+                self.Tcost[t] = getItem(self.cost, t, c)
                 slack -= self.weight[t]
 
-        self.logger.debug("Adding concentrator %d" % c)
+        self.count("added")
+        self.count("moved", len(moved))
+        self.logger.debug("Adding concentrator %d", c)
+        return moved
+
+    # Calculates the saving if any that results from connecting terminal t 
+    # to concentrator c, and returns the savings with the terminals, in 
+    # terminal order 
+    def __findSavings(self, c):
+        delta = []
+        ter = []
+        if c in self.cand or self.near is not None:
+            terms = self.cand[c] if c in self.cand else self.near[c]
+            col = getColumn(self.cost, c, terms) if terms else []
+        else:
+            terms = range(self.nt)
+            col = getColumn(self.cost, c)
+        for t, x in zip(terms, col):
+            s = x - self.Tcost[t]
+            if(s < 0):
+                delta.append(s)    # amount saved
+                ter.append(t)      # terminal 
+
+        # The association costs can only decrease, so the terminals that 
+        # benefit from c later on are a subset of the ones found now
+        if self.incremental:
+            self.cand[c] = ter
+        return delta, ter
+
+    # Find the k cheapest concentrators of every terminal, other than the
+    # central location, and index the terminals by concentrator
+    def __setNearest(self):
+        self.near = [[] for c in range(self.nc)]
+        if np is None:
+            concs = [c for c in range(self.nc) if c != self.center]
+            for t in range(self.nt):
+                row = getRow(self.cost, t)
+                for c in heapq.nsmallest(self.k, concs, key=row.__getitem__):
+                    self.near[c].append(t)
+            return
+
+        step = max(1, self.blockSize // self.nc)
+        for b in range(0, self.nt, step):
+            if hasattr(self.cost, "shape"):
+                rows = np.array(self.cost[b:b+step], dtype=np.float64)
+            else:
+                rows = np.array([getRow(self.cost, t) for t in 
+                           range(b, min(b+step, self.nt))], dtype=np.float64)
+            rows[:, self.center] = np.inf
+            if self.k > 0:
+                nearest = np.argpartition(rows, self.k - 1, axis=1)
+            else:
+                nearest = np.empty((len(rows), 0), dtype=int)
+            for t, concs in enumerate(nearest[:, :self.k].tolist(), b):
+                for c in concs:
+                    self.near[c].append(t)
+
+    # Prepare the arrays used by the numpy backend. Savings are computed in
+    # 64 bits whatever the type of the cost matrix is.
+    def __setArrays(self):
+        if np is None:
+            raise ImportError("The numpy backend of ADD requires numpy")
+        self.C = np.asarray(self.cost)
+        self.W = np.asarray(self.weight)
+        self.Cc = np.asarray(self.Ccost)
+        if self.C.dtype.kind in "iub":
+            self.dtype = np.int64
+        else:
+            self.dtype = np.float64
+
+    # Evaluate all the remaining concentrators that have no saved savings at
+    # once, with the same result as __evalConc
+    def __evalArray(self, remConc):
+        cols = [c for c in remConc if c not in self.saved]
+        if not cols or self.near is not None:
+            # With candidate lists, __evalConc only reads a few terminals
+            return
+        self.evaluations += len(cols)
+        cur = np.array(self.Tcost, dtype=self.dtype)
+        central = np.array(self.Cassoc) == self.center
+        minW = self.W.min()
+        
+        # Only the largest savings of each concentrator need to be sorted, 
+        # as long as the weight limit is reached before the last of them
+        if minW > 0:
+            nsort = min(self.nt, 2 * int(self.Wlimit // minW) + 16)
+        else:
+            nsort = self.nt
+        
+        step = max(1, self.blockSize // self.nt)
+        for b in range(0, len(cols), step):
+            blk = cols[b:b+step]
+            S = self.C[:, blk].astype(self.dtype) - cur[:, None]
+            neg = S < 0
+            if nsort < self.nt:
+                v = np.partition(np.where(neg, S, 0), nsort-1, axis=0)[nsort-1]
+                part = v < 0
+                neg &= S <= v
+            else:
+                part = np.zeros(len(blk), dtype=bool)
+
+            # Savings sorted by concentrator, largest first, then terminal
+            ti, ci = np.nonzero(neg)
+            d = S[ti, ci]
+            order = np.lexsort((ti, d, ci))
+            self.sorts += len(blk)
+            ti, ci, d = ti[order], ci[order], d[order]
+            first = np.searchsorted(ci, np.arange(len(blk)))
+
+            # Take the terminals in order until the weight limit is reached
+            move = central[ti] | (d + self.th_move < 0)
+            w = np.where(move, self.W[ti], 0)
+            used = np.cumsum(w)
+            used -= (used - w)[first[ci]]
+            take = move & (used <= self.Wlimit)
+
+            expense = self.Cc[blk].astype(np.result_type(self.Cc, d))
+            np.add.at(expense, ci[take], d[take])
+            expense = expense.tolist()
+
+            # The terminals are taken one by one when a terminal is skipped 
+            # and a lighter one follows, when some savings were not sorted
+            # and the limit is not reached, or if weights are not integers
+            if self.W.dtype.kind in "iub":
+                load = np.zeros(len(blk), dtype=w.dtype)
+                np.add.at(load, ci[take], w[take])
+                left = self.Wlimit - load
+                skip = move & ~take
+                redo = ci[skip][self.W[ti[skip]] <= left[ci[skip]]]
+                redo = set(redo.tolist()) | set(
+                                np.flatnonzero(part & (left >= minW)).tolist())
+            else:
+                redo = range(len(blk))
+            for k in redo:
+                expense[k] = self.__pickArray(blk[k], S[:, k], central)
+
+            self.saved.update(zip(blk, expense))
+            if self.lazy and self.uniform:
+                self.bound.update(zip(blk, expense))
+            elif self.lazy:
+                # Savings without the Wlimit constraint, added in the same 
+                # order as by __evalConc
+                free = np.where((S < 0) & (central[:, None] 
+                                        | (S + self.th_move < 0)), S, 0)
+                free = np.vstack([self.Cc[blk], np.sort(free, axis=0)])
+                self.bound.update(zip(blk, 
+                                      np.cumsum(free, axis=0)[-1].tolist()))
+
+    # Evaluate concentrator c from its savings s, one terminal at a time
+    def __pickArray(self, c, s, central):
+        ter = np.flatnonzero(s < 0)
+        delta = s[ter]
+        permu = np.argsort(delta, kind="stable")
+        self.sorts += 1
+
+        expense = self.Ccost[c]
+        slack = self.Wlimit
+        for t, d in zip(ter[permu].tolist(), delta[permu].tolist()):
+            if((self.weight[t]<=slack) and (central[t] 
+                                           or (d + self.th_move < 0))):
+                expense += d
+                slack -= self.weight[t]
+        return(expense)
+
+    # Share the cost matrix with the worker processes, once for the run
+    def __startPool(self):
+        if np is None:
+            raise ImportError("Parallel evaluation in ADD requires numpy")
+        C = np.asarray(self.cost)
+        self.shm = shared_memory.SharedMemory(create=True, 
+                                              size=max(1, C.nbytes))
+        shared = np.ndarray(C.shape, dtype=C.dtype, buffer=self.shm.buf)
+        shared[:] = C
+        del shared
+        params = {"Ccost": self.Ccost, "weight": self.weight, 
+                  "center": self.center, "Wlimit": self.Wlimit, 
+                  "th_move": self.th_move, "k": self.k}
+        self.pool = multiprocessing.Pool(self.workers, 
+                                initializer=_initWorker, 
+                                initargs=(self.shm.name, C.shape, C.dtype.str,
+                                          params))
+
+    def __stopPool(self):
+        self.pool.terminate()
+        self.pool.join()
+        self.shm.close()
+        self.shm.unlink()
+        self.pool = self.shm = None
+
+    # Evaluate the concentrators that have no saved savings in the worker 
+    # processes, one contiguous shard of remConc per worker
+    def __evalPool(self, remConc):
+        cols = [c for c in remConc if c not in self.saved]
+        if not cols:
+            return
+        self.evaluations += len(cols)
+        self.sorts += len(cols)
+        Cassoc = np.array(self.Cassoc)
+        size = -(-len(cols) // self.workers)
+        shards = [cols[i:i+size] for i in range(0, len(cols), size)]
+        tasks = [(Cassoc, shard) for shard in shards]
+        for shard, expense in zip(shards, self.pool.map(_evalShard, tasks)):
+            self.saved.update(zip(shard, expense))
+
+    # Drop the cached savings of the concentrators that are affected by
+    # moving terminals, given as (terminal, previous cost) pairs. The savings
+    # of c can only change if a moved terminal used to benefit from c.
+    def __invalidate(self, moved, remConc):
+        moved = [(getRow(self.cost, t), prev) for t, prev in moved]
+        for c in remConc:
+            if c not in self.saved:
+                continue
+            for row, prev in moved:
+                if row[c] < prev:
+                    del self.saved[c]
+                    break
+
+# The worker processes of ADD.run(workers=N) evaluate concentrators with the
+# numpy backend, on the cost matrix in shared memory
+_worker = None
+
+def _initWorker(name, shape, dtype, params):
+    global _worker
+    shm = shared_memory.SharedMemory(name=name)
+    cost = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker = ADD()
+    _worker.shm = shm
+    _worker.prepare(cost, backend="numpy", **params)
+
+def _evalShard(task):
+    Cassoc, concs = task
+    return _worker.evaluate(concs, Cassoc.tolist())
 
 # print cost list of network produced by ADD algorithm
 def printCost(out, cost):   
     concList = out["conc"]
-    termList = out["assoc"]
     ncenter = out["center"]
     numConc = len(concList)
-    nodeAssoc = [(i,termList.count(i)-1) for i in concList]
-    c = [cost[i][ncenter] for i in range(len(cost))] 
+    counts = out.summary()
+    nodeAssoc = [(i,counts[i]-1) for i in concList]
+    c = getColumn(cost, ncenter)
     print("Original cost =", sum(c))
     print("Central node =",ncenter)
     print("Number of concentrators =", numConc)
@@ -166,45 +699,11 @@ def printCost(out, cost):
     print("Total Cost =", out["cost"])
 
 
-# Plot topology produced by MENTOR algorithm
+# Plot topology produced by ADD algorithm, see plot.py. matplotlib is loaded
+# on the first call, and the figure is only saved unless show is True. With
+# maxEdges, only about maxEdges of the terminal links are drawn.
 def plotNetwork(out, pos, labels=[], filename="figure_add.png", 
-                                        title='ADD Algorithm', show_center=False):
-    numNodes = out["num"]
-    center = out["center"]
-    concList = out["conc"]
-    edges = [(k, out["assoc"][k]) for k in range(numNodes)]
-    tree = [(center, n) for n in out["conc"]]
-
-    plt.figure(figsize=(6,6), facecolor="white")
-    G=nx.path_graph(numNodes)
-
-    nx.draw_networkx_edges(G, pos, edgelist=edges, alpha=0.3, 
-                                              edge_color="blue")
-    if show_center:
-        nx.draw_networkx_edges(G, pos, edgelist=tree, width=2, 
-                                              edge_color="blue", alpha=0.1)
-    
-    # Draw all nodes 
-    nx.draw_networkx_nodes(G, pos, node_size=10, node_color="green", alpha=0.5)
-    nx.draw_networkx_nodes(G, pos, nodelist=[center], node_size=150, 
-                                                     node_color="black")
-    nx.draw_networkx_nodes(G, pos, nodelist=concList, node_size=50, 
-                                                     node_color="red")
-
-    # Draw node and edge labels       
-    #elabels = {e:ch[mesh.index(e)] for e in mesh}
-    #nx.draw_networkx_edge_labels(G, pos, elabels, edgelist=mesh, font_size=10,     
-    #                                                        font_color="grey")
-    if labels:
-        nLabel = {n:labels[n] for n in concList}
-        npos = {n:(pos[n][0], pos[n][1]+0.03) for n in pos}
-        nx.draw_networkx_labels(G, npos, nLabel, nodelist=concList, 
-                                 font_size=10, font_color="black")
-
-    plt.xlim(-0.05,1.05)
-    plt.ylim(-0.05,1.05)
-    plt.axis('off')
-    plt.title(title)
-    plt.savefig(filename)
-    plt.show()
-    
+                title='ADD Algorithm', show_center=False, show=False, 
+                maxEdges=None):
+    from .plot import plotAdd
+    plotAdd(out, pos, labels, filename, title, show_center, show, maxEdges)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# This file includes a batch solver for many ADD problems on blocks of one 
+# cost matrix, like regions of a national network. Every job gives its 
+# terminals (rows), its concentrators (columns), its center and its Wlimit.
+# The cost matrix is copied once to shared memory, and the jobs are solved 
+# by a pool of worker processes that read their block in place. Results are 
+# returned in the order of the jobs. The concentrators (the center and the 
+# entries of assoc) are numbered as in the full matrix, and assoc[k] is the 
+# concentrator of the k-th terminal of the job.
+#
+# Example:
+#   jobs = [(range(0, 200), range(0, 50), 7, 10),
+#           ([200, 205, 230], [50, 51, 60], 51, 5)]
+#   results = solveBatch(cost, Ccost, weight, jobs, workers=4)
+
+from .add import ADD
+from .main import getItem, getRow
+from .result import ADDResult
+from multiprocessing import shared_memory
+import multiprocessing
+
+try:
+    import numpy as np
+except ImportError:                 # the matrix is copied to every worker
+    np = None
+
+class SubMatrix(object):
+    # The block of matrix m with the given rows and columns, read in place.
+    # It can be given to ADD like a cost matrix.
+    def __init__(self, m, rows, cols):
+        self.m = m
+        self.rows = list(rows)
+        self.cols = list(cols)
+        self.array = np is not None and hasattr(m, "shape")
+        if self.array:
+            self.cols = np.asarray(self.cols, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.rows)
+
+    # Return row i as a list
+    def __getitem__(self, i):
+        if not 0 <= i < len(self.rows):
+            raise IndexError("row index out of range")
+        if self.array:
+            return self.m[self.rows[i]][self.cols].tolist()
+        row = getRow(self.m, self.rows[i])
+        return [row[c] for c in self.cols]
+
+    # Return the entry (i, j)
+    def item(self, i, j):
+        return getItem(self.m, self.rows[i], self.cols[j])
+
+    # Return column j, for the given rows or for all rows
+    def column(self, j, rows=None):
+        rows = self.rows if rows is None else [self.rows[i] for i in rows]
+        c = self.cols[j]
+        if self.array:
+            return self.m[rows, c].tolist()
+        return [getItem(self.m, r, c) for r in rows]
+
+    def max(self):
+        return max([max(self[i]) for i in range(len(self.rows))])
+
+    # Build the block, for code that needs an array
+    def __array__(self, dtype=None, copy=None):
+        if self.array:
+            return np.asarray(self.m[np.ix_(self.rows, self.cols)], dtype=dtype)
+        return np.array([self[i] for i in range(len(self.rows))], dtype=dtype)
+
+# Return the block of m with the given rows and columns. Ranges of arrays 
+# are sliced, which does not copy them, other blocks are SubMatrix views.
+def block(m, rows, cols):
+    if np is not None and hasattr(m, "shape"):
+        r, c = _slice(rows), _slice(cols)
+        if r is not None and c is not None:
+            return m[r, c]
+    return SubMatrix(m, rows, cols)
+
+# Solve every job with ADD, where a job is (terminals, concentrators, center,
+# Wlimit). Ccost and weight are given for all the concentrators and all the 
+# terminals of cost. options are the other arguments of ADD.run(), the same
+# for all the jobs. With workers=1 the jobs are solved in this process.
+# Returns the results in the order of the jobs, as ADDResult with the 
+# concentrators numbered as in cost, and assoc in the order of the terminals
+# of the job.
+def solveBatch(cost, Ccost, weight, jobs, workers=None, **options):
+    jobs = [_job(k, job) for k, job in enumerate(jobs)]
+    data = {"cost": cost, "Ccost": Ccost, "weight": weight}
+
+    if workers == 1:
+        _initWorker(data, None, options)
+        return [_solveJob(job) for job in jobs]
+
+    # A matrix that numpy can hold is copied once to shared memory. Others,
+    # like cost models, are sent to every worker when it starts.
+    shm = None
+    shared = None
+    try:
+        if np is not None and not hasattr(cost, "column"):
+            C = np.asarray(cost)
+            if C.dtype.kind in "biuf":
+                shm = shared_memory.SharedMemory(create=True, 
+                                                 size=max(1, C.nbytes))
+                np.ndarray(C.shape, dtype=C.dtype, buffer=shm.buf)[:] = C
+                shared = (shm.name, C.shape, C.dtype.str)
+                data = dict(data, cost=None)
+        pool = multiprocessing.Pool(workers, initializer=_initWorker,
+                                    initargs=(data, shared, options))
+        try:
+            return pool.map(_solveJob, jobs, chunksize=1)
+        finally:
+            pool.terminate()
+            pool.join()
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+# Check a job, and give it as (index, terminals, concentrators, position of
+# the center among the concentrators, Wlimit)
+def _job(k, job):
+    terms, concs, center, Wlimit = job
+    terms = terms if isinstance(terms, range) else list(terms)
+    concs = concs if isinstance(concs, range) else list(concs)
+    try:
+        position = concs.index(center)
+    except ValueError:
+        raise ValueError("The center %s of job %d is not one of its "
+                         "concentrators" % (center, k))
+    return k, terms, concs, position, Wlimit
+
+# Return the slice of a range of indices, or None
+def _slice(index):
+    if isinstance(index, range):
+        if index.step == 1 or len(index) <= 1:
+            return slice(index.start, index.start + len(index))
+        return None
+    if len(index) and all([b == a + 1 for a, b in zip(index, index[1:])]):
+        return slice(index[0], index[0] + len(index))
+    return None
+
+# The worker processes of solveBatch() keep the matrices and the options
+_worker = None
+
+def _initWorker(data, shared, options):
+    global _worker
+    shm = None
+    data = dict(data)
+    if shared is not None:
+        name, shape, dtype = shared
+        shm = shared_memory.SharedMemory(name=name)
+        data["cost"] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker = (data, options, shm)
+
+def _solveJob(job):
+    data, options, shm = _worker
+    k, terms, concs, center, Wlimit = job
+    cost = block(data["cost"], terms, concs)
+    Ccost = [data["Ccost"][c] for c in concs]
+    weight = [data["weight"][t] for t in terms]
+    out = ADD().run(cost, Ccost, weight, center=center, Wlimit=Wlimit, 
+                    **options)
+    return ADDResult(out.cost, concs[center], 
+                     [concs[c] for c in out.assoc.tolist()], out.stats)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# This file includes a cache for the results of the stages of an algorithm.
+# A stage result is stored under a key made from the inputs of the stage, so
+# that a run with other parameters only recomputes the stages whose inputs
+# have changed. Matrices are part of a key through their fingerprint, a hash
+# of their contents.
+#
+# Example:
+#   algo = MENTOR(cache=StageCache(path="mentor-cache"))
+#   out1 = algo.run(cost, req, alpha=0.5)
+#   out2 = algo.run(cost, req, alpha=1.0)    # reuses the backbone
+
+from collections import OrderedDict
+import hashlib, os, pickle, tempfile
+
+class StageCache(object):
+    # Keep up to maxEntries results in memory, least recently used first.
+    # If path is given, results are also saved in that directory, one file
+    # per key, and read back when they are not in memory. Files are never
+    # removed by the cache.
+    def __init__(self, maxEntries=32, path=None):
+        self.entries = OrderedDict()
+        self.maxEntries = maxEntries
+        self.path = path
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries or (self.path is not None and
+                                       os.path.exists(self.__file(key)))
+
+    # Return the result saved under key, or None
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        if self.path is not None:
+            try:
+                with open(self.__file(key), "rb") as f:
+                    value = pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                pass
+            else:
+                self.__remember(key, value)
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self.__remember(key, value)
+        if self.path is not None:
+            # write to a temporary file first, so that readers never see a
+            # partial file
+            fd, name = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(name, self.__file(key))
+
+    def clear(self):
+        self.entries.clear()
+
+    def __remember(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxEntries:
+            self.entries.popitem(last=False)
+
+    def __file(self, key):
+        return os.path.join(self.path, key + ".pkl")
+
+# Return a key for the given parts, which are numbers, strings, fingerprints
+# or tuples of them
+def makeKey(*parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+# Return a hash of the contents of matrix m. Arrays are hashed a block of rows
+# at a time, objects with a fingerprint() method (like cost models) give their
+# own, and anything else is pickled.
+def fingerprint(m):
+    if m is None:
+        return None
+    if hasattr(m, "fingerprint"):
+        return m.fingerprint()
+    h = hashlib.blake2b(digest_size=20)
+    if hasattr(m, "shape") and hasattr(m, "dtype"):
+        h.update(repr((m.shape, m.dtype.str)).encode())
+        rows = m.reshape(len(m), -1) if m.ndim > 1 else m.reshape(1, -1)
+        step = max(1, (1 << 24) // max(1, rows.strides[0]))
+        for b in range(0, len(rows), step):
+            h.update(rows[b:b+step].tobytes())
+    else:
+        h.update(pickle.dumps(m, protocol=pickle.HIGHEST_PROTOCOL))
+    return h.hexdigest()
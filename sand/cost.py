@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy 
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights 
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell 
+# copies of the Software, and to permit persons to whom the Software is 
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR 
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, 
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE 
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER 
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, 
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# This file includes cost models for the SAND algorithms. A cost model 
+# computes the cost between two nodes from their positions when it is needed,
+# so that the full cost matrix does not have to be built. It can be given to
+# ADD and MENTOR instead of a cost matrix.
+
+import hashlib, math
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:                 # rows are computed one entry at a time
+    np = None
+
+# Cost functions between two points p and q given as (x, y)
+def euclidean(p, q):
+    dx = p[0] - q[0]
+    dy = p[1] - q[1]
+    return math.sqrt(dx * dx + dy * dy)
+
+# The square root of the Manhattan distance, as in the examples
+def sqrtManhattan(p, q):
+    return math.sqrt(abs(p[0] - q[0]) + abs(p[1] - q[1]))
+
+# Array versions of the cost functions, from the points P to the points Q.
+# They give the same values as the functions above.
+def _euclidean(P, Q):
+    dx = P[:, 0] - Q[:, 0]
+    dy = P[:, 1] - Q[:, 1]
+    return np.sqrt(dx * dx + dy * dy)
+
+def _sqrtManhattan(P, Q):
+    return np.sqrt(np.abs(P[:, 0] - Q[:, 0]) + np.abs(P[:, 1] - Q[:, 1]))
+
+METRICS = {"euclidean": (euclidean, _euclidean),
+           "sqrtmanhattan": (sqrtManhattan, _sqrtManhattan)}
+
+# A name for a metric function, for fingerprints. Functions are named by their
+# module and name, and by their code, defaults and closure, since all lambdas
+# have the same name. Values that are printed with their address make the 
+# name differ between processes, so that they are never mistaken for others.
+def _metricName(metric):
+    name = "%s.%s" % (getattr(metric, "__module__", None), 
+                      getattr(metric, "__qualname__", type(metric).__name__))
+    if not hasattr(metric, "__code__"):
+        return name if hasattr(metric, "__qualname__") else repr(metric)
+    closure = [c.cell_contents for c in metric.__closure__ or ()]
+    parts = (_code(metric.__code__), metric.__defaults__, 
+             metric.__kwdefaults__, closure)
+    return name + ":" + hashlib.sha1(repr(parts).encode()).hexdigest()
+
+def _code(code):
+    return (code.co_code, code.co_names, tuple([_code(c) 
+             if hasattr(c, "co_code") else c for c in code.co_consts]))
+
+class CostModel(object):
+    # pos are the positions of the nodes (rows), as a list or as a dict 
+    # indexed from 0 like in the examples. cpos are the positions of the 
+    # concentrators (columns), if they are not the same nodes. The cost 
+    # between p and q is metric(p, q) * scale, rounded to an integer if
+    # rounded is set. metric is the name of a metric in METRICS or any 
+    # function of two points. Rows are cached up to about maxBytes.
+    def __init__(self, pos, cpos=None, metric="euclidean", scale=1, 
+                 rounded=False, maxBytes=2**28):
+        self.pos = [pos[i] for i in range(len(pos))]
+        self.cpos = self.pos if cpos is None else [cpos[i] 
+                                                   for i in range(len(cpos))]
+        self.metricName = _metricName(metric) if callable(metric) else metric
+        if callable(metric):
+            self.metric, self.vmetric = metric, None
+        else:
+            self.metric, self.vmetric = METRICS[metric]
+        if np is None:
+            self.vmetric = None
+        elif self.vmetric is not None:
+            self.P = np.array(self.pos, dtype=np.float64).reshape(-1, 2)
+            self.Q = np.array(self.cpos, dtype=np.float64).reshape(-1, 2)
+        self.scale = scale
+        self.rounded = rounded
+
+        # Cached rows, least recently used first. A row is a list of Python
+        # numbers, about 32 bytes per entry.
+        self.rows = OrderedDict()
+        self.maxRows = max(1, maxBytes // (32 * max(1, len(self.cpos))))
+
+    def __len__(self):
+        return len(self.pos)
+
+    # Return row i as a list
+    def __getitem__(self, i):
+        if not 0 <= i < len(self.pos):
+            raise IndexError("row index out of range")
+        row = self.rows.get(i)
+        if row is None:
+            row = self.__costs([i], range(len(self.cpos)))
+            self.rows[i] = row
+            if len(self.rows) > self.maxRows:
+                self.rows.popitem(last=False)
+        else:
+            self.rows.move_to_end(i)
+        return row
+
+    # Return the entry (i, j)
+    def item(self, i, j):
+        row = self.rows.get(i)
+        if row is not None:
+            return row[j]
+        return self.__cost(self.pos[i], self.cpos[j])
+
+    # Return column j, for the given rows or for all rows. Columns are not 
+    # cached.
+    def column(self, j, rows=None):
+        if rows is None:
+            rows = range(len(self.pos))
+        return self.__costs(rows, [j])
+
+    # Return the largest cost, computing one row at a time
+    def max(self):
+        return max([max(self.__costs([i], range(len(self.cpos)))) 
+                                              for i in range(len(self.pos))])
+
+    # A hash of everything the costs depend on, for caches
+    def fingerprint(self):
+        parts = (self.pos, self.cpos, self.metricName, self.scale, self.rounded)
+        return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+    # Build the full cost matrix, for code that needs an array
+    def __array__(self, dtype=None, copy=None):
+        return np.array([self.__costs([i], range(len(self.cpos))) 
+                           for i in range(len(self.pos))], dtype=dtype)
+
+    def __cost(self, p, q):
+        c = self.metric(p, q) * self.scale
+        return round(c) if self.rounded else c
+
+    # Costs between the nodes in rows and the nodes in cols, one of which
+    # has a single element
+    def __costs(self, rows, cols):
+        if self.vmetric is None:
+            return [self.__cost(self.pos[i], self.cpos[j]) 
+                                              for i in rows for j in cols]
+        P = self.P[np.asarray(rows, dtype=np.intp)]
+        Q = self.Q[np.asarray(cols, dtype=np.intp)]
+        c = self.vmetric(P, Q) * self.scale
+        if self.rounded:
+            c = np.rint(c).astype(np.int64)
+        return c.tolist()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# This file includes a hierarchical design for networks that are too large 
+# for ADD and MENTOR, which take at least O(n^2). The nodes are split into 
+# regions of at most size nodes by their positions, ADD chooses the 
+# concentrators of every region on a pool of worker processes, and MENTOR 
+# designs the backbone between the concentrators only, with the traffic of 
+# the terminals added up by concentrator. Costs are computed from the 
+# positions, as by a CostModel, so no n x n matrix is built.
+#
+# The cost of a design is the cost of the terminal links, plus concCost for 
+# every concentrator, plus the cost of the backbone. With size >= n the same
+# steps give the flat design, which compareFlat() uses as a reference.
+#
+# Example:
+#   out = design(pos, req, size=1000, Wlimit=20, 
+#                mentorOptions={"cap": 1000, "alpha": 0.5})
+#   print(out["cost"], out["times"])
+
+from .add import ADD
+from .cost import CostModel
+from .main import getColumn, getItem, getRow
+from .mentor import MENTOR
+import multiprocessing
+import time
+
+try:
+    import numpy as np
+except ImportError:                 # regions and traffic use Python lists
+    np = None
+
+# Split the nodes at pos into regions of at most size nodes. A region is 
+# cut across its longer side, so that the parts have the number of nodes of
+# a whole number of regions. Returns the regions as lists of nodes.
+def partition(pos, size):
+    n = len(pos)
+    if size < 1:
+        raise ValueError("The size of a region must be at least 1")
+    P = [pos[i] for i in range(n)]
+    stack = [list(range(n))]
+    regions = []
+    while stack:
+        nodes = stack.pop()
+        parts = -(-len(nodes) // size)
+        if parts <= 1:
+            regions.append(nodes)
+            continue
+        xs = [P[i][0] for i in nodes]
+        ys = [P[i][1] for i in nodes]
+        axis = 0 if max(xs) - min(xs) >= max(ys) - min(ys) else 1
+        cut = len(nodes) * (parts // 2) // parts
+        if np is not None:
+            key = np.array(xs if axis == 0 else ys)
+            order = np.argpartition(key, cut).tolist()
+        else:
+            order = sorted(range(len(nodes)), key=lambda k: P[nodes[k]][axis])
+        stack.append([nodes[k] for k in order[cut:]])
+        stack.append([nodes[k] for k in order[:cut]])
+    return regions
+
+# Design the network of the nodes at pos (a list or a dict indexed from 0) 
+# with the traffic req, a matrix or a dict of (i, j): traffic. The costs are
+# metric(p, q) * scale, as in CostModel. weight is the weight of every node
+# for ADD (1 by default). addOptions and mentorOptions are other arguments of
+# ADD.run() and MENTOR.run(). With workers=1 the regions are solved in this
+# process.
+#
+# Returns a dict with:
+#   "regions": the nodes of every region
+#   "centers": the center of every region
+#   "concentrators": the concentrators, in the order of the backbone nodes
+#   "assoc": the concentrator of every node
+#   "backbone": the result of MENTOR, with nodes numbered as in 
+#               "concentrators"
+#   "cost": the cost of the "access" links, of the "concentrators", of the 
+#           "backbone" and the "total"
+#   "times": the time of every step in seconds, and the "total"
+def design(pos, req, size=1000, Wlimit=10, concCost=100, 
+           metric="sqrtmanhattan", scale=1000, rounded=True, weight=None, 
+           workers=None, addOptions=None, mentorOptions=None):
+    n = len(pos)
+    times = {}
+    start = time.perf_counter()
+    model = dict(metric=metric, scale=scale, rounded=rounded)
+
+    t = time.perf_counter()
+    regions = partition(pos, size)
+    times["partition"] = time.perf_counter() - t
+
+    # Every region is an ADD problem, with its node nearest to the middle of
+    # the region as the center
+    t = time.perf_counter()
+    tasks = []
+    for k, nodes in enumerate(regions):
+        P = [pos[i] for i in nodes]
+        w = [1] * len(nodes) if weight is None else [weight[i] for i in nodes]
+        tasks.append((k, P, w, Wlimit))
+    params = (model, concCost, addOptions or {})
+    if workers == 1 or len(tasks) == 1:
+        _initWorker(*params)
+        solved = [_solveRegion(task) for task in tasks]
+    else:
+        pool = multiprocessing.Pool(workers, initializer=_initWorker,
+                                    initargs=params)
+        try:
+            solved = pool.map(_solveRegion, tasks, chunksize=1)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    centers = []
+    concs = []
+    assoc = [0] * n
+    access = 0
+    for nodes, (center, local, links) in zip(regions, solved):
+        centers.append(nodes[center])
+        for i, c in zip(nodes, local):
+            assoc[i] = nodes[c]
+        concs.extend(sorted(set([nodes[c] for c in local])))
+        access += links
+    times["add"] = time.perf_counter() - t
+
+    # The traffic between concentrators is the traffic between their 
+    # terminals. Traffic between terminals of the same concentrator does not
+    # use the backbone.
+    t = time.perf_counter()
+    index = {c: k for k, c in enumerate(concs)}
+    group = [index[assoc[i]] for i in range(n)]
+    traffic = _aggregate(req, group, len(concs))
+    times["traffic"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    cost = CostModel([pos[c] for c in concs], **model)
+    if len(concs) > 1:
+        backbone = MENTOR().run(cost, traffic, **(mentorOptions or {}))
+        links = backbone.totalCost(cost)
+    else:
+        backbone = None
+        links = 0
+    times["mentor"] = time.perf_counter() - t
+    times["total"] = time.perf_counter() - start
+
+    return {"regions": regions, "centers": centers, "concentrators": concs, 
+            "assoc": assoc, "backbone": backbone,
+            "cost": {"access": access, 
+                     "concentrators": concCost * len(concs),
+                     "backbone": links,
+                     "total": access + concCost * len(concs) + links},
+            "times": times}
+
+# Design the network with design() and with one region for all the nodes,
+# and return the times and costs of both. kwargs are the arguments of 
+# design(), except size.
+def compareFlat(pos, req, size=1000, **kwargs):
+    hier = design(pos, req, size=size, **kwargs)
+    flat = design(pos, req, size=max(1, len(pos)), **kwargs)
+    return {"nodes": len(pos), "regions": len(hier["regions"]),
+            "concentrators": (len(hier["concentrators"]), 
+                              len(flat["concentrators"])),
+            "time": (hier["times"]["total"], flat["times"]["total"]),
+            "cost": (hier["cost"]["total"], flat["cost"]["total"]),
+            "speedup": flat["times"]["total"] / hier["times"]["total"],
+            "gap": hier["cost"]["total"] / flat["cost"]["total"] - 1}
+
+# Add up the traffic of req into k x k, where node i belongs to group[i]
+def _aggregate(req, group, k):
+    if np is not None:
+        out = np.zeros((k, k))
+        g = np.asarray(group, dtype=np.intp)
+        if hasattr(req, "items"):
+            if req:
+                ij = np.array(list(req.keys()), dtype=np.intp).reshape(-1, 2)
+                v = np.array(list(req.values()), dtype=np.float64)
+                np.add.at(out, (g[ij[:, 0]], g[ij[:, 1]]), v)
+        else:
+            # The columns are sorted by group, so that a block of rows is 
+            # added up by group with one reduceat
+            order = np.argsort(g, kind="stable")
+            starts = np.searchsorted(g[order], np.arange(k))
+            step = max(1, (1 << 22) // max(1, len(g)))
+            for b in range(0, len(g), step):
+                rows = np.asarray(req[b:b+step], dtype=np.float64)
+                sums = np.add.reduceat(rows[:, order], starts, axis=1)
+                np.add.at(out, g[b:b+step], sums)
+        np.fill_diagonal(out, 0)
+        return out
+
+    out = [[0] * k for i in range(k)]
+    if hasattr(req, "items"):
+        for (i, j), v in req.items():
+            out[group[i]][group[j]] += v
+    else:
+        for i in range(len(group)):
+            row = out[group[i]]
+            for j, v in enumerate(getRow(req, i)):
+                row[group[j]] += v
+    for i in range(k):
+        out[i][i] = 0
+    return out
+
+# The worker processes of design() keep the cost model and the options of 
+# ADD
+_worker = None
+
+def _initWorker(model, concCost, options):
+    global _worker
+    _worker = (model, concCost, options)
+
+# Solve the ADD problem of a region. Returns the center, the concentrator of
+# every node and the cost of the terminal links, with the nodes numbered in 
+# the region.
+def _solveRegion(task):
+    k, P, weight, Wlimit = task
+    model, concCost, options = _worker
+    cost = CostModel(P, **model)
+    if np is not None:
+        cost = np.asarray(cost)
+    mx = sum([p[0] for p in P]) / len(P)
+    my = sum([p[1] for p in P]) / len(P)
+    center = min(range(len(P)), 
+                 key=lambda i: (P[i][0] - mx)**2 + (P[i][1] - my)**2)
+    Ccost = [c + concCost for c in getColumn(cost, center)]
+    Ccost[center] = 0
+    out = ADD().run(cost, Ccost, weight, center=center, Wlimit=Wlimit, 
+                    **options)
+    assoc = out.assoc.tolist()
+    links = sum([getItem(cost, t, c) for t, c in enumerate(assoc)])
+    return center, assoc, links
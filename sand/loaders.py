@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# This file includes loaders of the matrices and vectors used by the SAND 
+# algorithms. They read:
+#   - "csv": text files with one row per line, with the values separated by 
+#     commas or spaces. Blank lines and lines starting with # are skipped.
+#   - "edges": text files with one entry per line, as "i j value", for 
+#     sparse matrices. The value is 1 if it is missing, and the entries that
+#     are not given are set to default.
+#   - "npy": numpy files, which are memory-mapped.
+#
+# Text files are read twice: once to find the size and the type of the 
+# matrix, and once to fill it row by row. The result is a numpy array, or a 
+# list of array.array rows without numpy, so no list of Python numbers is
+# built on the way.
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError:                 # matrices are lists of array rows
+    np = None
+
+FORMATS = ("csv", "edges", "npy")
+
+# The format of a file from its extension
+def fileFormat(path):
+    if path.endswith(".npy"):
+        return "npy"
+    if path.endswith((".edges", ".edgelist")):
+        return "edges"
+    return "csv"
+
+# Read a matrix from path, in the format fmt or the one of its extension. 
+# dtype is the type of the entries, like "int32" or "float32", by default 
+# 64 bit integers or floats, as found in the file. For edge lists, shape is
+# the size of the matrix (by default, one more than the largest indices), 
+# default is the value of the missing entries, diagonal the value of the 
+# entries (i, i) if it is given, and with symmetric every entry (i, j) is 
+# also set at (j, i).
+def loadMatrix(path, fmt=None, dtype=None, shape=None, default=0, 
+               diagonal=None, symmetric=False):
+    fmt = fmt or fileFormat(path)
+    if fmt == "npy":
+        if np is None:
+            raise ImportError("Reading .npy files requires numpy")
+        m = np.load(path, mmap_mode="r")
+        if dtype is not None and m.dtype != np.dtype(dtype):
+            m = m.astype(dtype)
+        return m
+    if fmt == "csv":
+        return _readCsv(path, dtype)
+    if fmt == "edges":
+        return _readEdges(path, dtype, shape, default, diagonal, symmetric)
+    raise ValueError("Unknown format '%s'" % fmt)
+
+# Read a vector, given as one row or as one value per line
+def loadVector(path, fmt=None, dtype=None):
+    m = loadMatrix(path, fmt, dtype)
+    if np is not None and hasattr(m, "shape"):
+        return m.reshape(-1)
+    if len(m) == 1:
+        return m[0]
+    return array(m[0].typecode if m else "q", [r[0] for r in m])
+
+# Whether a matrix of type dtype, as read by loadMatrix, can hold value
+def holds(dtype, value):
+    if dtype is None:
+        return True
+    if np is not None:
+        dt = np.dtype(dtype)
+        if dt.kind in "iu":
+            return np.iinfo(dt).min <= value <= np.iinfo(dt).max
+        return dt.kind == "f"
+    try:
+        array(_typecode(dtype, isinstance(value, float)), [value])
+    except OverflowError:
+        return False
+    return True
+
+# The lines of a text file with values, without blank lines and comments
+def _lines(path):
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line.replace(",", " ")
+
+def _isFloat(line):
+    return any([c in line for c in ".eEnNiI"])
+
+def _typecode(dtype, floating):
+    if dtype is None:
+        return "d" if floating else "q"
+    return {"int32": "i", "int64": "q", "float32": "f", 
+            "float64": "d"}[str(dtype)]
+
+def _readCsv(path, dtype):
+    rows = 0
+    cols = None
+    floating = False
+    for line in _lines(path):
+        if cols is None:
+            cols = len(line.split())
+        rows += 1
+        floating = floating or _isFloat(line)
+    cols = cols or 0
+
+    if np is not None:
+        dtype = dtype or (np.float64 if floating else np.int64)
+        m = np.empty((rows, cols), dtype=dtype)
+    else:
+        code = _typecode(dtype, floating)
+        m = []
+    for i, line in enumerate(_lines(path)):
+        try:
+            if np is not None:
+                row = np.fromstring(line, dtype=m.dtype, sep=" ")
+            else:
+                row = array(code, [float(v) if code in "fd" else int(v)
+                                                       for v in line.split()])
+        except ValueError:
+            raise ValueError("Row %d of %s is not a row of numbers" % (i, path))
+        if len(row) != cols:
+            raise ValueError("Row %d of %s has %d values, expected %d" % 
+                                                    (i, path, len(row), cols))
+        if np is not None:
+            m[i] = row
+        else:
+            m.append(row)
+    return m
+
+def _readEdges(path, dtype, shape, default, diagonal, symmetric):
+    n = 0
+    floating = False
+    for line in _lines(path):
+        v = line.split()
+        if len(v) not in (2, 3):
+            raise ValueError("Expected 'i j value' in %s, got '%s'" % 
+                                                                  (path, line))
+        n = max(n, int(v[0]) + 1, int(v[1]) + 1)
+        floating = floating or (len(v) == 3 and _isFloat(v[2]))
+    floating = floating or isinstance(default, float)
+    if shape is None:
+        shape = (n, n)
+
+    if np is not None:
+        dtype = dtype or (np.float64 if floating else np.int64)
+        m = np.full(shape, default, dtype=dtype)
+        kind = float if m.dtype.kind == "f" else int
+    else:
+        code = _typecode(dtype, floating)
+        m = [array(code, [default]) * shape[1] for i in range(shape[0])]
+        kind = float if code in "fd" else int
+    if diagonal is not None:
+        for i in range(min(shape)):
+            m[i][i] = diagonal
+    for line in _lines(path):
+        v = line.split()
+        i, j = int(v[0]), int(v[1])
+        x = kind(v[2]) if len(v) == 3 else 1
+        m[i][j] = x
+        if symmetric:
+            m[j][i] = x
+    return m
@@ -24,13 +24,98 @@
 # This file includes the base class for a library of Standard Algorithms for 
 # Network Design(SAND).
  
-import logging, math
+import contextlib, cProfile, logging, math, time
 
 class SANDAlgorithm(object):
     def __init__(self):
         self.INF = 2**32-1
         self.logger = logging.getLogger(__name__) #self.__class__.
+        self.times = {}                 # Seconds spent in each stage
+        self.counters = {}              # Number of operations of each kind
+        self.callback = None            # Called at the end of every stage
+        self.profiler = None            # Profile of the stages
+        self.__depth = 0                # Number of stages being timed
         
     def log(self, fname):
         logging.basicConfig(filename=fname, level=logging.DEBUG)
 
+    # Call callback(name, seconds, counters) at the end of every stage, and 
+    # profile the stages with cProfile if profile is set. The profile of all 
+    # the runs is kept in self.profiler and can be read with pstats.
+    def instrument(self, callback=None, profile=False):
+        self.callback = callback
+        self.profiler = cProfile.Profile() if profile else None
+        return self
+
+    # Clear the times and counters, at the start of a run
+    def resetStats(self):
+        self.times = {}
+        self.counters = {}
+
+    def count(self, name, k=1):
+        self.counters[name] = self.counters.get(name, 0) + k
+
+    # The counters and the times of the stages, for the result of a run
+    def getStats(self):
+        stats = dict(self.counters)
+        stats["times"] = dict(self.times)
+        return stats
+
+    # Time the statements of a with block, adding the time to 
+    # self.times[name]. Stages can be nested, the profiler runs from the 
+    # start of the outer one to its end.
+    @contextlib.contextmanager
+    def timer(self, name):
+        if self.profiler is not None and self.__depth == 0:
+            self.profiler.enable()
+        self.__depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.__depth -= 1
+            if self.profiler is not None and self.__depth == 0:
+                self.profiler.disable()
+            self.times[name] = self.times.get(name, 0) + seconds
+            if self.callback is not None:
+                self.callback(name, seconds, dict(self.counters))
+
+
+# Matrices and vectors can be given as lists or as numpy arrays, including
+# read-only memory-mapped arrays, or as cost models that compute entries on
+# demand (see cost.py). These functions read them without copying the whole 
+# matrix, and always return Python numbers, so that arithmetic on compact 
+# types (int32, float32) does not overflow or lose precision.
+
+# Return row i of matrix m
+def getRow(m, i):
+    r = m[i]
+    return r.tolist() if hasattr(r, "tolist") else r
+
+# Return column j of matrix m, for the given rows or for all rows
+def getColumn(m, j, rows=None):
+    if hasattr(m, "column"):
+        return m.column(j, rows)
+    if hasattr(m, "shape"):
+        return (m[:, j] if rows is None else m[rows, j]).tolist()
+    if rows is None:
+        return [r[j] for r in m]
+    return [m[i][j] for i in rows]
+
+# Return the entry (i, j) of matrix m
+def getItem(m, i, j):
+    if hasattr(m, "item"):
+        return m.item(i, j)
+    return m[i][j]
+
+# Return the largest entry of matrix m
+def getMax(m):
+    if hasattr(m, "max"):
+        v = m.max()
+        return v.item() if hasattr(v, "item") else v
+    return max([max(r) for r in m])
+
+# Return vector v as a list
+def asList(v):
+    return v.tolist() if hasattr(v, "tolist") else list(v)
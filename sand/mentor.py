@@ -26,18 +26,30 @@
 # McGraw-Hill, Inc., New York, NY, USA.
 
 
-from .main import SANDAlgorithm
-import math
-import networkx as nx
-import matplotlib.pyplot as plt
-import matplotlib.image as mpimg
+from .main import SANDAlgorithm, getRow, getColumn, getItem, getMax
+from .tree import TreePaths
+from .cache import makeKey, fingerprint
+from .result import MENTORResult
+from array import array
+import bisect, heapq, math, numbers
+
+try:
+    import numpy as np
+except ImportError:                 # tables are built as lists without numpy
+    np = None
  
 class MENTOR(SANDAlgorithm):  
-    def __init__(self):
+    blockSize = 1 << 22                 # Matrix entries per array block
+
+    # The results of the stages of run() are kept in cache, a StageCache, 
+    # if given
+    def __init__(self, cache=None):
         SANDAlgorithm.__init__(self)
+        self.cache = cache
+        self.state = None
         
     def run(self, cost, req, wparm=0, rparm=0.5, dparm=0.5, alpha=0.5, cap=1, 
-            slack=0.4):
+            slack=0.4, paths="matrix", warm=False):
         self.nt = len(cost)                 # Number of nodes
         self.cost = cost                    # Cost matrix (nt x nc)
         self.req = req                      # Traffic matrix (nt x nc)        
@@ -50,62 +62,333 @@ class MENTOR(SANDAlgorithm):
         self.alpha = alpha                  # PrimDijk parameter [0,1] 
         self.cap = cap                      # single-channel usable capacity
         self.slack = slack    
+        self.paths = paths                  # "matrix" or "lca", see below
+        if paths not in ("matrix", "lca"):
+            raise ValueError("Unknown paths '%s'" % paths)
+        # With warm set, the state of the run is kept for redesign()
+        self.params = dict(wparm=wparm, rparm=rparm, dparm=dparm, alpha=alpha,
+                           cap=cap, slack=slack, paths=paths, warm=warm)
+        self.state = {} if warm else None
+        self.resetStats()
     
         self.logger.debug('Starting MENTOR Algorithm')
 
+        # Every stage is keyed by its inputs: the parameters it uses and the
+        # key of the stage before it
+        if self.cache is not None:
+            costKey, reqKey = fingerprint(cost), fingerprint(req)
+            keys = {"backbone": makeKey("backbone", costKey, reqKey, wparm, 
+                                        rparm, dparm)}
+            keys["median"] = makeKey("median", keys["backbone"])
+            keys["pred"] = makeKey("pred", keys["median"], alpha)
+            keys["paths"] = makeKey("paths", keys["pred"], paths)
+            keys["sequence"] = makeKey("sequence", keys["paths"])
+            keys["mesh"] = makeKey("mesh", keys["sequence"], reqKey, cap, slack)
+            self.keys = keys
+
         # PART 1 : find backbone nodes
-        self.backbone, weight, Cassoc = self.__findBackbone()
-        self.logger.debug('Backbone nodes = {} : {}'.format(len(self.backbone), 
-                                            ','.join(map(str,self.backbone))))
+        self.backbone, weight, Cassoc, self.maxWeight, self.maxDist = \
+            self.__stage("backbone", self.__backboneStage)
+        self.backbone = list(self.backbone)
+        self.wparm = wparm * self.maxWeight
+        self.logger.debug('Backbone nodes = %d : %s', len(self.backbone), 
+                                                              self.backbone)
         
         # PART 2 : Create topology
-        median = self.__findBackboneMedian(self.backbone, weight)
-        self.logger.debug('Backbone Median = {}'.format(median))
+        median = self.__stage("median", self.__findBackboneMedian, 
+                              self.backbone, weight)
+        self.logger.debug('Backbone Median = %s', median)
         
-        pred = self.__findPrimDijk(median, Cassoc)
-        self.logger.debug('Pred nodes = {} {}'.format(len(pred), ','.join(map(str,pred))))
+        pred = self.__stage("pred", self.__findPrimDijk, median, Cassoc)
+        self.logger.debug('Pred nodes = %d %s', len(pred), pred)
         
+        if warm:
+            self.state.update(weight=weight, backbone=list(self.backbone), 
+                              Cassoc=Cassoc, median=median, pred=pred)
+            with self.timer("mesh"):
+                endList, multList = self.__meshStage(median, pred, True)
+        else:
+            endList, multList = self.__stage("mesh", self.__meshStage, 
+                                             median, pred)
 
-        spPred, spDist = self.__setDist(median, pred)
-        seqList, home = self.__setSequence(spPred)
-        endList, multList = self.__compress(seqList, home)
+        backbone = set(self.backbone)
+        tree = [(i, pred[i]) for i in range(len(pred)) 
+                                        if i in backbone and i != pred[i]]
+        return MENTORResult(self.backbone, tree, endList, multList, median, 
+                            self.getStats())
+
+    # Redesign the network found by the last run(warm=True), whose result 
+    # is out, after adding delta to the traffic matrix. delta maps node pairs
+    # (i, j) to the change of req[i][j]. The result is the same as that of
+    # run() with the new matrix, which is kept in self.req.
+    #
+    # If the backbone, the node associations and the median are unchanged, 
+    # so are the tree and the order of the pairs, and only the channels have
+    # to be found again. With integer traffic and capacity, only the pairs 
+    # whose traffic changes, directly or by overflows, are considered again.
+    # Otherwise all pairs are, or all of run() if the tree changes.
+    def redesign(self, out, delta):
+        state = self.state
+        if not state or out["median"] != state["median"] or \
+                        out["backbone"] != state["backbone"]:
+            raise ValueError("out is not the result of the last run(warm=True)")
+        self.resetStats()
+
+        # Apply delta to a copy of req, and update the weights of the nodes 
+        # it touches. An array keeps its type unless the changes need a 
+        # wider one.
+        if hasattr(self.req, "shape"):
+            values = np.array(list(delta.values()), dtype=self.req.dtype 
+                                                     if not delta else None)
+            req = np.array(self.req, dtype=np.result_type(self.req, values))
+        else:
+            req = [list(getRow(self.req, i)) for i in range(self.nt)]
+        for (i, j), d in delta.items():
+            req[i][j] += d
+        self.req = req
+        weight = list(state["weight"])
+        for n in set([i for pair in delta for i in pair]):
+            weight[n] = self.__nodeWeight(n)
+
+        self.wparm = self.params["wparm"]
+        with self.timer("backbone"):
+            backbone, weight, Cassoc = self.__findBackbone(weight)
+        with self.timer("median"):
+            median = self.__findBackboneMedian(backbone, weight)
+        if (backbone != state["backbone"] or Cassoc != state["Cassoc"] or 
+                                                median != state["median"]):
+            self.logger.debug('Redesign: the tree has changed')
+            self.redesigned = "all"
+            return self.run(self.cost, req, **self.params)
+        state["weight"] = weight
+
+        exact = (state["rxy"] is not None and 
+                 isinstance(self.cap, numbers.Integral) and 
+                 all([isinstance(d, numbers.Integral) 
+                      for d in delta.values()]))
+        with self.timer("channels"):
+            if exact:
+                self.__updateChannels(delta)
+                self.redesigned = "pairs"
+            else:
+                self.__compress(state["seqList"], state["home"], True)
+                self.redesigned = "mesh"
+        self.logger.debug('Redesign: %d pairs considered', 
+                     self.recomputed if exact else len(state["seqList"]))
+
+        pred = state["pred"]
+        backbone = set(self.backbone)
+        tree = [(i, pred[i]) for i in range(len(pred)) 
+                                        if i in backbone and i != pred[i]]
+        return MENTORResult(self.backbone, tree, state["endList"], 
+                            state["multList"], median, self.getStats())
 
-        tree = [(i, pred[i]) for i in range(len(pred)) if i in self.backbone and i != pred[i]]
-        return {"backbone": self.backbone, "tree": tree, "mesh": endList, 
-                "channels":multList, "median": median}
+    # Add delta to the traffic of the pairs and follow the changes of their
+    # overflows, in the order of the pairs, as __compress would. Overflows
+    # to pairs that come earlier are dropped, as they are by __compress.
+    def __updateChannels(self, delta):
+        state = self.state
+        seqList, seqPos, home = state["seqList"], state["seqPos"], state["home"]
+        rxyList, ryxList = state["rxy"], state["ryx"]
+        endList, multList, endPos = (state["endList"], state["multList"], 
+                                     state["endPos"])
+        changes = {}                    # pair -> changes of rxy and ryx
+        heap = []
+        def addChange(i, j, d):
+            pr = self.__makePair(self.nt, i, j)
+            if pr not in changes:
+                changes[pr] = [0, 0]
+                heapq.heappush(heap, seqPos[pr])
+            changes[pr][0 if i < j else 1] += d
+
+        for (i, j), d in delta.items():
+            if i != j and d:
+                addChange(i, j, d)
+
+        self.recomputed = 0
+        self.count("sorts")
+        while heap:
+            p = heapq.heappop(heap)
+            pr = seqList[p]
+            dxy, dyx = changes.pop(pr)
+            x, y = self.__splitPair(self.nt, pr)
+            h = home[pr]
+            mult0, ov12, ov21 = self.__channels(rxyList[pr], ryxList[pr], h)
+            rxyList[pr] += dxy
+            ryxList[pr] += dyx
+            mult, ovflow12, ovflow21 = self.__channels(rxyList[pr], 
+                                                       ryxList[pr], h)
+            self.recomputed += 1
+
+            # update the mesh, which is in the order of the pairs
+            k = bisect.bisect_left(endPos, p)
+            if mult0 > 0 and mult > 0:
+                multList[k] = mult
+            elif mult > 0:
+                endPos.insert(k, p)
+                endList.insert(k, (x, y))
+                multList.insert(k, mult)
+            elif mult0 > 0:
+                del endPos[k], endList[k], multList[k]
+
+            for i, j, d in ((x, h, ovflow12 - ov12), (h, y, ovflow12 - ov12),
+                            (y, h, ovflow21 - ov21), (h, x, ovflow21 - ov21)):
+                if d and seqPos[self.__makePair(self.nt, i, j)] > p:
+                    addChange(i, j, d)
+        self.count("pairs", self.recomputed)
+        self.count("pops", self.recomputed)
+
+    # Run stage(*args), or take its result from the cache, and time it
+    def __stage(self, name, stage, *args):
+        with self.timer(name):
+            if self.cache is None:
+                return stage(*args)
+            result = self.cache.get(self.keys[name])
+            if result is None:
+                result = stage(*args)
+                self.cache.put(self.keys[name], result)
+            else:
+                self.logger.debug('Using cached %s', name)
+            return result
+
+    def __backboneStage(self):
+        backbone, weight, Cassoc = self.__findBackbone()
+        return backbone, weight, Cassoc, self.maxWeight, self.maxDist
+
+    # Find the links and channels of the mesh, from the paths along the tree
+    def __meshStage(self, median, pred, record=False):
+        spPred = self.__stage("paths", self.__findPaths, median, pred)
+        seqList, home = self.__stage("sequence", self.__setSequence, spPred)
+        if record:
+            self.state.update(seqList=seqList, home=home)
+        with self.timer("channels"):
+            return self.__compress(seqList, home, record)
+
+    # The paths along the tree are kept as n x n tables, or found when 
+    # needed from an LCA index, which takes O(n log n) memory. The LCA index
+    # only replaces spPred and spDist: the home and dependency count of 
+    # every pair and the sequence of the pairs (see __setSequence) are still
+    # int32 tables of n(n-1)/2 entries, about 6n^2 bytes in all, and the 
+    # traffic matrix is n x n, so MENTOR still takes O(n^2) memory.
+    def __findPaths(self, median, pred):
+        if self.paths == "lca":
+            link = [getItem(self.cost, j, pred[j]) for j in range(self.nt)]
+            return TreePaths(pred, median, link)
+        spPred, spDist = self.__setDist(median, pred)
+        return spPred
 
     # Set node weights
     def __findWeight(self): 
+        if np is not None:
+            return self.__findWeightArray()
         weight = []                     # This is the weight
         for n in range(self.nt):
-            sum = 0
-            for i in range(self.nt):
-                sum += self.req[n][i]
-                sum += self.req[i][n]
-            weight.append(sum)
+            weight.append(self.__nodeWeight(n))
+        return weight
+
+    def __nodeWeight(self, n):
+        row = getRow(self.req, n)
+        col = getColumn(self.req, n)
+        sum = 0
+        for i in range(self.nt):
+            sum += row[i]
+            sum += col[i]
+        return sum
+
+    # The same with arrays, for blocks of rows and the same columns. Integers
+    # are summed exactly in any order. Other numbers are added in the same
+    # order as above, row and column entries in turn, with a running sum.
+    def __findWeightArray(self):
+        weight = []
+        step = max(1, self.blockSize // (2 * self.nt))
+        for b in range(0, self.nt, step):
+            nodes = range(b, min(b + step, self.nt))
+            R = self.__getRows(self.req, nodes)
+            C = self.__getColumns(self.req, nodes)
+            kind = np.result_type(R, C).kind
+            if kind in "iub":
+                w = (R.sum(axis=1, dtype=np.int64) + 
+                     C.sum(axis=1, dtype=np.int64))
+            elif kind == "f":
+                RC = np.empty((len(nodes), 2 * self.nt), dtype=np.float64)
+                RC[:, 0::2] = R
+                RC[:, 1::2] = C
+                w = np.cumsum(RC, axis=1)[:, -1]
+            else:
+                w = []
+                for row, col in zip(R.tolist(), C.tolist()):
+                    sum = 0
+                    for i in range(self.nt):
+                        sum += row[i]
+                        sum += col[i]
+                    w.append(sum)
+            weight.extend(w.tolist() if hasattr(w, "tolist") else w)
         return weight
               
     # Find the Median node for all nodes
     def __findMedian(self, weight):
-        moment = []
-        for i in range(self.nt):
-            cw = [self.cost[i][j] * weight[j] for j in range(self.nt)]
-            moment.append(sum(cw))
+        moment = self.__findMoment(range(self.nt), range(self.nt), weight)
         return moment.index(min(moment))
 
     # Find the Median node for backbone nodes
     def __findBackboneMedian(self, backbone, weight):
-        moment = []
-        for i in range(len(backbone)):
-            cw = [self.cost[backbone[i]][j] * weight[j] for j in backbone]
-            moment.append(sum(cw))
+        moment = self.__findMoment(backbone, backbone, weight)
         return backbone[moment.index(min(moment))]
+
+    # Find the moment of every node in rows, the sum of the cost to each node
+    # in cols times its weight
+    def __findMoment(self, rows, cols, weight):
+        moment = []
+        if np is None:
+            for i in rows:
+                row = getRow(self.cost, i)
+                cw = [row[j] * weight[j] for j in cols]
+                moment.append(sum(cw))
+            return moment
+
+        # Integer moments are found exactly with a matrix product. Otherwise
+        # the products are summed by sum() as above, which may not add them 
+        # in order.
+        cols = list(cols)
+        W = np.array([weight[j] for j in cols])
+        allCols = cols == list(range(self.nt))
+        step = max(1, self.blockSize // self.nt)
+        for b in range(0, len(rows), step):
+            R = self.__getRows(self.cost, rows[b:b+step])
+            if not allCols:
+                R = R[:, cols]
+            if R.dtype.kind in "iub" and W.dtype.kind in "iub":
+                M = R.astype(np.int64) @ W.astype(np.int64)
+                moment.extend(M.tolist())
+            elif R.dtype.kind in "iubf" and W.dtype.kind in "iubf":
+                CW = R.astype(np.float64) * W.astype(np.float64)
+                moment.extend([sum(cw) for cw in CW.tolist()])
+            else:
+                moment.extend([sum([r * w for r, w in zip(row, W.tolist())]) 
+                                                    for row in R.tolist()])
+        return moment
+
+    # Return the rows of matrix m, as an array
+    def __getRows(self, m, rows):
+        if hasattr(m, "shape"):
+            return np.asarray(m[rows[0]:rows[-1]+1] if isinstance(rows, range)
+                              else m[list(rows)])
+        return np.array([getRow(m, i) for i in rows])
+
+    # Return the columns of matrix m, as the rows of an array
+    def __getColumns(self, m, cols):
+        if hasattr(m, "shape"):
+            return np.asarray(m[:, cols[0]:cols[-1]+1]).T
+        if hasattr(m, "column"):
+            return np.array([m.column(j) for j in cols])
+        return np.array([r[cols[0]:cols[-1]+1] for r in m]).T
         
     # Select backbone nodes by comparing total traffic requirements
     # to a threshold 
-    def __findBackbone(self):       
+    def __findBackbone(self, weight=None):       
         backbone = []
-        weight = self.__findWeight()
+        if weight is None:
+            weight = self.__findWeight()
         median = self.__findMedian(weight)
         
         self.maxWeight = max(weight)
@@ -118,7 +401,7 @@ class MENTOR(SANDAlgorithm):
                tbAssigned.append(n)
         
         # find the maximum distance (radius) between any two nodes
-        self.maxDist = max([max(r) for r in self.cost])
+        self.maxDist = getMax(self.cost)
         
         # for the remaining nodes:
         # calculate the distance between each unassigned node and
@@ -126,298 +409,454 @@ class MENTOR(SANDAlgorithm):
         
         # The Figure of Merit function
         def figMerit(u):
-            return self.dParm * (self.cost[u][median] / self.maxDist) + \
-               (1-self.dParm) * (weight[u] / self.maxWeight)
+            return (self.dParm * (getItem(self.cost, u, median) / 
+                                  self.maxDist) + 
+                    (1-self.dParm) * (weight[u] / self.maxWeight))
         
         radius = self.maxDist * self.rParm
         Cassoc = [i for i in range(self.nt)]
-        while tbAssigned:
-            # while there are nodes to be assigned, associate nodes with
-            # the closest backbone node if there are within a given radius
-            unassigned = []
-            for c in tbAssigned:
-                lowestR = self.INF                # any big +ve number
-                assgnd = False
-                for b in backbone:
-                    if(self.cost[c][b] < radius):
-                        # if the distance is lower than the radius,
-                        # the node becomes a terminal node associated
-                        # with the closest backbone (or cheapest to connect)
-                        if(self.cost[c][b] < lowestR):
-                            lowestR = self.cost[c][b]
-                            Cassoc[c] = b
-                            assgnd = True
-                if not assgnd:
-                    # This node needs further evaluation 
-                    unassigned.append(c)
-            
-            # Terminate the loop if there are no more unassigned nodes
-            if not unassigned:
-                break
+        
+        # associate nodes with the closest backbone node if there are within 
+        # a given radius
+        unassigned = []
+        for c in tbAssigned:
+            lowestR = self.INF                # any big +ve number
+            assgnd = False
+            row = getRow(self.cost, c)
+            for b in backbone:
+                if(row[b] < radius):
+                    # if the distance is lower than the radius,
+                    # the node becomes a terminal node associated
+                    # with the closest backbone (or cheapest to connect)
+                    if(row[b] < lowestR):
+                        lowestR = row[b]
+                        Cassoc[c] = b
+                        assgnd = True
+            if not assgnd:
+                # This node needs further evaluation 
+                unassigned.append(c)
+
+        # The remaining nodes are not within the radius of any backbone node,
+        # so after a node becomes a backbone node, it is the only one they 
+        # need to be checked against. The node with the highest Figure of 
+        # Merit (the first one among equals) is taken from a heap, skipping 
+        # nodes that have been assigned since. Heaps are counted as sorts, 
+        # and the entries taken from them as pops.
+        heap = [(-figMerit(u), u) for u in unassigned]
+        heapq.heapify(heap)
+        self.count("sorts")
+        size = len(heap)
+        while unassigned:
+            while Cassoc[heap[0][1]] != heap[0][1]:
+                heapq.heappop(heap)
+            n = heapq.heappop(heap)[1]
+            backbone.append(n)
+            self.count("rounds")
+            unassigned.remove(n)
             
-            # Determine if a node can be a backbone node based on 
-            # Figure of Merit           
+            col = getColumn(self.cost, n, unassigned) if unassigned else []
             tbAssigned = unassigned
-            merit = [figMerit(u) for u in tbAssigned]
-            n = tbAssigned[merit.index(max(merit))]
-            backbone.append(n)
-            tbAssigned.remove(n)
+            unassigned = []
+            for c, r in zip(tbAssigned, col):
+                if r < radius and r < self.INF:
+                    Cassoc[c] = n
+                else:
+                    unassigned.append(c)
+        self.count("pops", size - len(heap))
                
         return backbone, weight, Cassoc
     
     # Build initial tree topology 
     def __findPrimDijk(self, root, Cassoc):
         assert root in self.backbone        
-        #outTree = list(range(self.nt))
-        outTree = list(self.backbone)
+        outTree = set(self.backbone)
         # strating with the terminal association list, assigning all backbone nodes
         # to root as predecessor
         pred = [(lambda x: root if Cassoc[x] == x else Cassoc[x])(i) for i in range(self.nt) ] 
         inTree = []
-        label = list(self.cost[root]) # copy the cost of every node to root
+        # copy the cost of every node to root
+        label = list(getRow(self.cost, root))
+
+        # Heap of (label, position in backbone). Ties between labels are
+        # broken by the order of the backbone, and entries whose label has 
+        # since decreased are skipped.
+        backbone = self.backbone
+        position = {b: k for k, b in enumerate(backbone)}
+        if np is not None:
+            out = np.ones(len(backbone), dtype=bool)
+            label = np.array([label[b] for b in backbone], dtype=np.float64)
+            bb = np.array(backbone)
+        else:
+            label = [label[b] for b in backbone]
+        heap = [(x, k) for k, x in 
+                    enumerate(label.tolist() if np is not None else label)]
+        heapq.heapify(heap)
+        self.count("sorts")
+        pops = 0
         while outTree:
             # select a node that is in the backbone, not already inTree, 
             # and has the least cost
             # the first item selected will be the root        
-            n = root
-            leastCost = self.INF
-            for b in self.backbone:
-                if label[b] < leastCost:
-                    leastCost = label[b]
-                    n = b
+            while heap and (backbone[heap[0][1]] not in outTree 
+                            or heap[0][0] != label[heap[0][1]]):
+                heapq.heappop(heap)
+                pops += 1
+            if heap and heap[0][0] < self.INF:
+                leastCost, k = heapq.heappop(heap)
+                pops += 1
+                n = backbone[k]
+            else:
+                n = root; k = position[root]
+                leastCost = self.INF
             
-            #leastCost = min(label)            
-            #n = label.index(leastCost)
             inTree.append(n)
             outTree.remove(n)
-            label[n] = self.INF  # prevent the node from being considered again
-            for o in outTree:
-                x = self.alpha * leastCost + self.cost[o][n]
-                if(label[o] > x):
-                    label[o] = x
-                    pred[o] = n                
+            if not outTree:
+                break
+            if np is not None:
+                out[k] = False
+                rest = np.flatnonzero(out)
+                if hasattr(self.cost, "shape"):
+                    col = self.cost[bb[rest], n]
+                else:
+                    col = getColumn(self.cost, n, bb[rest].tolist())
+                x = self.alpha * leastCost + np.asarray(col, dtype=np.float64)
+                better = label[rest] > x
+                rest = rest[better]; x = x[better]
+                label[rest] = x
+                for k, v in zip(rest.tolist(), x.tolist()):
+                    pred[backbone[k]] = n
+                    heapq.heappush(heap, (v, k))
+            else:
+                rest = list(outTree)
+                for o, c in zip(rest, getColumn(self.cost, n, rest)):
+                    x = self.alpha * leastCost + c
+                    k = position[o]
+                    if(label[k] > x):
+                        label[k] = x
+                        pred[o] = n                
+                        heapq.heappush(heap, (x, k))
+        self.count("pops", pops)
         return pred
 
     # Find the shortest path through the tree topology
     def __setDist(self, root, pred):
-        preOrder = [root]
-        n = 1
-        while n < self.nt:
+        preOrder = self.__preOrder(root, pred)
+        link = [getItem(self.cost, j, pred[j]) for j in range(self.nt)]
+
+        if np is None:
+            # Find the distance (cost) of the shortest path between any two
+            # nodes along the backbone tree
+            spDist = [[0 for j in range(self.nt)] for i in range(self.nt)]
             for i in range(self.nt):
-                if((i not in preOrder) and (pred[i] in preOrder)):
-                    preOrder.append(i)
-                    n += 1
+                j = preOrder[i]
+                p = pred[j]
+                for k in range(i):
+                    l = preOrder[k]
+                    spDist[j][l] = spDist[l][j] = spDist[p][l] + link[j]
 
-        # Find the distance (cost) of the shortest path between any two nodes
-        # along the backbone tree
-        spDist = [[0 for j in range(self.nt)] for i in range(self.nt)]
-        for i in range(self.nt):
-            j = preOrder[i]
+            # Set the predecessors. Row i gives the node before j on the path
+            # from i to j, which is the same as from pred[i] except for the 
+            # nodes i and pred[i].
+            spPred = [None] * self.nt
+            spPred[root] = list(pred)
+            spPred[root][root] = root
+            for j in preOrder[1:]:
+                p = pred[j]
+                spPred[j] = list(spPred[p])
+                spPred[j][j] = spPred[j][p] = j
+            return spPred, spDist
+
+        # The same with arrays. Distances are computed with the nodes in 
+        # preorder, so that the nodes before node i are D[:i].
+        order = np.array(preOrder)
+        rank = np.empty(self.nt, dtype=np.intp)
+        rank[order] = np.arange(self.nt)
+        w = np.array([link[j] for j in preOrder])
+        D = np.zeros((self.nt, self.nt), dtype=w.dtype)
+        for i in range(1, self.nt):
+            q = rank[pred[preOrder[i]]]
+            D[i, :i] = D[q, :i] + w[i]
+            D[:i, i] = D[i, :i]
+        spDist = D[np.ix_(rank, rank)]
+        del D
+
+        spPred = np.empty((self.nt, self.nt), dtype=np.int32 
+                          if self.nt < 2**31 else np.int64)
+        spPred[root] = pred
+        spPred[root, root] = root
+        for j in preOrder[1:]:
             p = pred[j]
-            #spDist[j][j] = 0
-            for k in range(i):
-                l = preOrder[k]
-                spDist[j][l] = spDist[l][j] = spDist[p][l] + self.cost[j][p]
+            spPred[j] = spPred[p]
+            spPred[j, j] = spPred[j, p] = j
         
-        # Set the predecessors
-        spPred = [[pred[j] for j in range(self.nt)] for i in range(self.nt)]
+        return spPred, spDist
+
+    # Order the nodes so that every node comes after its predecessor. This 
+    # is the order the nodes were found in by scanning all nodes repeatedly 
+    # and adding every node whose predecessor was already added: nodes are 
+    # sorted by scan, then by index. A node is found in the same scan as its
+    # predecessor if it comes later in the scan, otherwise in the next one.
+    def __preOrder(self, root, pred):
+        children = [[] for i in range(self.nt)]
         for i in range(self.nt):
-            spPred[i][i] = i
+            if i != root:
+                children[pred[i]].append(i)
+
+        scan = [0] * self.nt
+        queue = [root]
+        for p in queue:
+            for i in children[p]:
+                scan[i] = 1 if p == root else scan[p] + (p > i)
+                queue.append(i)
+
+        scans = [[] for n in range(max(scan) + 1)]
         for i in range(self.nt):
-            if(i == root):
-                continue
-            p = pred[i]
-            spPred[i][p] = i
-            while(p != root):
-                pp = pred[p]
-                spPred[i][pp] = p
-                p = pp
-        
-        return spPred, spDist
+            if i != root:
+                scans[scan[i]].append(i)
+        return [root] + [i for nodes in scans for i in nodes]
         
     # Find the order in which to consider node pairs
+    # Pairs (i, j), i < j, are numbered row by row (see __makePair), and the 
+    # tables over pairs are int32 arrays. home is -1 for tree links.
     def __setSequence(self, spPred):    
-        home = [[None for i in range(self.nt)] for j in range(self.nt)]
-        pair = [self.__makePair(self.nt,i,j)  for i in range(self.nt) 
-                                              for j in range(i+1,self.nt)]
-
-        np = self.nt * self.nt
-        nDep = [0] * np
-        dep1 = [0] * np
-        dep2 = [0] * np
-        for p in range(len(pair)):
-            pr = pair[p]
-            i , j = self.__splitPair(self.nt, pr)
-            p1 = spPred[i][j]
-            p2 = spPred[j][i]
-            if( p1==i): # this is a tree link
-                h = None
-            elif (p1==p2):  # 2-hop path, only one possible home
-                h = p1
-            else:
-                if( (self.cost[i][p1] + self.cost[p1][j]) 
-                 <= (self.cost[i][p2] + self.cost[p2][j])):
-                    h = p1
-                else:
-                    h = p2
-            home[i][j] = h
-            if(h): 
-                # increment the number of pairs that depend on (i, h)
-                pair_ih = self.__makePair(self.nt,i,h)
-                dep1[pr] = pair_ih
-                nDep[pair_ih] += 1
-                pair_jh = self.__makePair(self.nt,j,h)                
-                dep2[pr] = pair_jh
-                nDep[pair_jh] += 1
-            else:              
-                dep1[pr] = dep2[pr] = None
-               
-        #print("nDep :\n",nDep)
-        seqList = [p for p in pair if nDep[p] == 0]
+        npairs = (self.nt * (self.nt - 1))//2
+        home = array("i", [-1]) * npairs
+        nDep = array("i", [0]) * npairs
+        if np is not None:
+            self.__setHomeArray(spPred, np.frombuffer(home, dtype=np.int32), 
+                                np.frombuffer(nDep, dtype=np.int32))
+            free = np.flatnonzero(np.frombuffer(nDep, dtype=np.int32) == 0)
+            seqList = array("i", free.astype(np.int32).tobytes())
+        else:
+            pr = 0
+            for i in range(self.nt):
+                predFrom = getRow(spPred, i)
+                predTo = getColumn(spPred, i)
+                for j in range(i+1, self.nt):
+                    h = self.__findHome(i, j, predFrom[j], predTo[j])
+                    if h is not None:
+                        home[pr] = h
+                    if(h): 
+                        # increment the number of pairs that depend on (i, h)
+                        nDep[self.__makePair(self.nt,i,h)] += 1
+                        nDep[self.__makePair(self.nt,j,h)] += 1
+                    pr += 1
+            seqList = array("i", (p for p in range(npairs) if nDep[p] == 0))
 
+        # __splitPair and __makePair are inlined in this loop
+        n = self.nt
+        n2 = 2*n - 1
+        last = 8*(npairs - 1) + 1
+        isqrt = math.isqrt
         nseq = len(seqList)
         iseq = 0
         while iseq < nseq:
             p = seqList[iseq]
             iseq += 1
-            d = dep1[p]
-            if d:
-                if nDep[d] == 1:
-                    seqList.append(d)
-                    nseq += 1
-                else:
-                    nDep[d] -= 1
-            
-            d = dep2[p]
-            if d:
-                if nDep[d] == 1:
-                    seqList.append(d)
-                    nseq += 1
-                else:
-                    nDep[d] -= 1
-        
-        #print("seqList :\n", seqList)
+            h = home[p]
+            if h > 0:
+                i = n - 2 - (isqrt(last - 8*p) - 1)//2
+                hh = (h * (n2 - h))//2 - h - 1
+                for k in (i, p - (i * (n2 - i))//2 + i + 1):
+                    d = (k * (n2 - k))//2 - k - 1 + h if k < h else hh + k
+                    if nDep[d] == 1:
+                        seqList.append(d)
+                        nseq += 1
+                    else:
+                        nDep[d] -= 1
         
         return seqList, home
+
+    # Find the home of pair (i, j), the node through which its overflow 
+    # traffic is routed, given the predecessors p1 of j on the path from i 
+    # and p2 of i on the path from j
+    def __findHome(self, i, j, p1, p2):
+        if( p1==i): # this is a tree link
+            return None
+        elif (p1==p2):  # 2-hop path, only one possible home
+            return p1
+        elif( (getItem(self.cost, i, p1) + getItem(self.cost, p1, j)) 
+           <= (getItem(self.cost, i, p2) + getItem(self.cost, p2, j))):
+            return p1
+        else:
+            return p2
+
+    # Vectorized __findHome over all pairs, one row at a time, also counting
+    # the pairs that depend on each pair
+    def __setHomeArray(self, spPred, home, nDep):
+        n = self.nt
+        C = self.cost if hasattr(self.cost, "shape") else None
+        if C is not None:
+            ctype = np.float64 if C.dtype.kind == "f" else np.int64
+        start = 0
+        for i in range(n - 1):
+            j = np.arange(i + 1, n)
+            if hasattr(spPred, "shape"):
+                p1 = np.asarray(spPred[i, i+1:], dtype=np.int64)
+                p2 = np.asarray(spPred[i+1:, i], dtype=np.int64)
+            else:
+                p1 = spPred.prev(i, j).astype(np.int64)
+                p2 = spPred.prev(j, i).astype(np.int64)
+            h = p1.copy()
+            h[p1 == i] = -1
+            far = np.flatnonzero((p1 != i) & (p1 != p2))
+            if len(far):
+                a, b, c = p1[far], p2[far], j[far]
+                if C is not None:
+                    first = (C[i, a].astype(ctype) + C[a, c].astype(ctype) 
+                          <= C[i, b].astype(ctype) + C[b, c].astype(ctype))
+                else:
+                    first = np.array([self.__findHome(i, y, x, z) == x 
+                                      for x, y, z in zip(a.tolist(), 
+                                                         c.tolist(), 
+                                                         b.tolist())], 
+                                     dtype=bool)
+                h[far] = np.where(first, a, b)
+            end = start + n - 1 - i
+            home[start:end] = h
+            # pairs homed on node 0 have no dependencies, as before
+            k = np.flatnonzero(h > 0)
+            hk = h[k]
+            for a in (i, j[k]):
+                np.add.at(nDep, self.__makePairs(n, np.minimum(a, hk), 
+                                                 np.maximum(a, hk)), 1)
+            start = end
     
     # Select links and channels
-    def __compress(self, seqList, home):
-        # copy req to reqList
-        reqList = list(self.req)
-        for row in range(len(self.req)):
-            reqList[row] = list(self.req[row])
+    # With record set, the traffic of every pair after overflows is saved 
+    # for redesign(), if it is all integer
+    def __compress(self, seqList, home, record=False):
+        # Traffic added to req by overflows. An entry is only read when its 
+        # pair is processed, and can be dropped then.
+        extra = {}
         
         npairs = (self.nt * (self.nt - 1))//2
         endList = []
         multList = []
+        if record:
+            endPos = []
+            rxyList = array("q", [0]) * npairs
+            ryxList = array("q", [0]) * npairs
 
         for p in range(npairs):
-            x, y = self.__splitPair(self.nt, seqList[p])
-            h = home[x][y]
-
-            # assume full duplex always
-            mult = 0
-            load = max([reqList[x][y], reqList[y][x]])
-            if load >= self.cap:
-                mult = math.floor(load / self.cap)
-                load -= mult * self.cap
-
-            ovflow12 = ovflow21 = 0
-            if (h is None and load>0) or (load >= (1-self.slack) * self.cap):
-                mult += 1
-            else:
-                ovflow12 = max([0, reqList[x][y] - mult * self.cap])
-                ovflow21 = max([0, reqList[y][x] - mult * self.cap])
+            pr = seqList[p]
+            x, y = self.__splitPair(self.nt, pr)
+            h = home[pr]
+            rxy = extra.pop((x, y), None)
+            if rxy is None:
+                rxy = getItem(self.req, x, y)
+            ryx = extra.pop((y, x), None)
+            if ryx is None:
+                ryx = getItem(self.req, y, x)
+
+            mult, ovflow12, ovflow21 = self.__channels(rxy, ryx, h)
 
             if mult > 0:
                 endList.append((x, y))
                 multList.append(mult)
+                if record:
+                    endPos.append(p)
+            if record and rxyList is not None:
+                try:
+                    rxyList[pr] = rxy
+                    ryxList[pr] = ryx
+                except (TypeError, OverflowError):
+                    rxyList = ryxList = None
                         
             if ovflow12 > 0:
-                reqList[x][h] += ovflow12
-                reqList[h][y] += ovflow12
+                self.__addLoad(extra, x, h, ovflow12)
+                self.__addLoad(extra, h, y, ovflow12)
             if ovflow21 > 0:
-                reqList[y][h] += ovflow21
-                reqList[h][x] += ovflow21
+                self.__addLoad(extra, y, h, ovflow21)
+                self.__addLoad(extra, h, x, ovflow21)
          
+        if record:
+            self.state.update(endList=endList, multList=multList, endPos=endPos,
+                              rxy=rxyList, ryx=ryxList)
+            self.state["seqPos"] = self.__seqPositions(seqList)
+        self.count("pairs", npairs)
+        self.count("links", len(endList))
         return endList, multList
 
-    def __makePair(self, n, i, j):
-        if i<j:
-            return n * i + j
+    # Find the number of channels of a pair with traffic rxy and ryx and 
+    # home h, and the traffic that overflows to the home
+    def __channels(self, rxy, ryx, h):
+        # assume full duplex always
+        mult = 0
+        load = max([rxy, ryx])
+        if load >= self.cap:
+            mult = math.floor(load / self.cap)
+            load -= mult * self.cap
+
+        ovflow12 = ovflow21 = 0
+        if (h < 0 and load>0) or (load >= (1-self.slack) * self.cap):
+            mult += 1
         else:
-            return n * j + i
+            ovflow12 = max([0, rxy - mult * self.cap])
+            ovflow21 = max([0, ryx - mult * self.cap])
+        return mult, ovflow12, ovflow21
+
+    # The position of every pair in seqList
+    def __seqPositions(self, seqList):
+        seqPos = array("i", [0]) * len(seqList)
+        if np is not None:
+            np.frombuffer(seqPos, dtype=np.int32)[np.frombuffer(seqList, 
+                                 dtype=np.int32)] = np.arange(len(seqList))
+        else:
+            for k, p in enumerate(seqList):
+                seqPos[p] = k
+        return seqPos
+
+    # Add overflow traffic to the entry (i, j) of the traffic matrix
+    def __addLoad(self, extra, i, j, load):
+        if (i, j) in extra:
+            extra[(i, j)] += load
+        else:
+            extra[(i, j)] = getItem(self.req, i, j) + load
+
+    # Number the pair (i, j) among all pairs of n nodes, ordered by the 
+    # smaller node and then by the larger one
+    def __makePair(self, n, i, j):
+        if i > j:
+            i, j = j, i
+        return (i * (2*n - i - 1))//2 + j - i - 1
+
+    # __makePair for arrays of pairs with i < j
+    def __makePairs(self, n, i, j):
+        return (i * (2*n - i - 1))//2 + j - i - 1
     
     def __splitPair(self, n, p):
-        return p//n, p%n 
+        # count the pairs from the end to find the row
+        r = (math.isqrt(8 * ((n * (n - 1))//2 - 1 - p) + 1) - 1)//2
+        i = n - 2 - r
+        return i, p - (i * (2*n - i - 1))//2 + i + 1
         
 # print cost list of network produced by MENTOR algorithm
 def printCost(out, cost, labels):   
-    backbone = out["backbone"]
-    mesh = out["mesh"]
-    chlist = out["channels"]
-    
     total = 0
     print('%10s%10s%4s%8s' % ('From','To','Ch','Cost($)'))
     print(('=' * 34))
-    for i in range(len(mesh)):
-        x, y = mesh[i]
-        total += cost[x][y]*chlist[i]
-        print('%10s%10s%4d%8d' % (labels[x], labels[y], chlist[i], 
-                                                   cost[x][y]*chlist[i]))
+    for x, y, ch, c in out.report(cost):
+        total += c
+        print('%10s%10s%4d%8d' % (labels[x], labels[y], ch, c))
     print(('=' * 34))
     print('%12s%8d' % ('Total cost',total))
-    print('Number of backbone nodes =',len(backbone))
-    bknet = [p for p in mesh if p[0] in backbone and p[1] in backbone]
-    print('Number of links in the backbone =',len(bknet))
+    print('Number of backbone nodes =',len(out.backbone))
+    print('Number of links in the backbone =',len(out.backboneLinks()))
+
 
+# Total cost of the links in the network produced by MENTOR algorithm
+def totalCost(out, cost):
+    total = 0
+    for (x, y), ch in zip(out["mesh"], out["channels"]):
+        total += getItem(cost, x, y)*ch
+    return total
     
-# Plot topology produced by MENTOR algorithm
+# Plot topology produced by MENTOR algorithm, see plot.py. matplotlib is loaded
+# on the first call, and the figure is only saved unless show is True. With
+# maxEdges, only about maxEdges of the links outside the backbone are drawn.
 def plotNetwork(out, pos, labels=[], edisp=True, filename="figure_mentor.png", 
-                                                    title='MENTOR Algorithm'):
-    numNodes = len(pos)
-    mesh = out["mesh"]
-    ch = out["channels"]   
-    backbone = out["backbone"]
-    median = out["median"]
-    tree = out["tree"]
-
-    # Separate the mesh
-    bknet = [p for p in mesh if p[0] in backbone and p[1] in backbone ]
-    local = [p for p in mesh if p not in bknet]
-
-
-    plt.figure(figsize=(6,6), facecolor="white")
-    G=nx.path_graph(numNodes)
-
-    #nx.draw_networkx_edges(G,pos,alpha=0.1)
-    #nx.draw_networkx_edges(G,pos,edgelist=edges,alpha=0.2)    
-    nx.draw_networkx_edges(G, pos, local, alpha=0.3, edge_color="green")
-    nx.draw_networkx_edges(G, pos, bknet, alpha=0.8, edge_color="blue")
-    nx.draw_networkx_edges(G, pos, tree, width=2, edge_color="blue")
-    
-    # Draw all nodes 
-    nx.draw_networkx_nodes(G, pos, node_size=10, node_color="green", alpha=0.5)
-    nx.draw_networkx_nodes(G, pos, nodelist=[median], node_size=150, 
-                                                     node_color="black")
-    nx.draw_networkx_nodes(G, pos, nodelist=backbone, node_size=50, 
-                                                     node_color="red")
-
-    # Draw node and edge labels
-    if edisp:       
-        elabels = {e:ch[mesh.index(e)] for e in mesh}
-        nx.draw_networkx_edge_labels(G, pos, elabels, edgelist=mesh, 
-                                               font_size=10, font_color="grey")
-    if labels:
-        nLabel = {n:labels[n] for n in backbone}
-        npos = {n:(pos[n][0], pos[n][1]+0.03) for n in pos}
-        nx.draw_networkx_labels(G, npos, nLabel, nodelist=backbone, 
-                                              font_size=10, font_color="black")
-
-    plt.xlim(-0.05,1.05)
-    plt.ylim(-0.05,1.05)
-    plt.axis('off')
-    plt.title(title)
-    plt.savefig(filename)
-    plt.show()      
-
+                title='MENTOR Algorithm', show=False, maxEdges=None):
+    from .plot import plotMentor
+    plotMentor(out, pos, labels, edisp, filename, title, show, maxEdges)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# This file includes the plots of the networks found by ADD and MENTOR. It is
+# only loaded when a network is plotted, so that the algorithms do not need
+# matplotlib. Figures are drawn without pyplot, which is only loaded to show
+# them in a window. All the links of a kind are drawn as one LineCollection 
+# and all the nodes by one scatter call, so that large networks are drawn in
+# about the time matplotlib takes to render them. With maxEdges, only about
+# maxEdges of the terminal links are drawn, evenly spread over the list.
+
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+import numpy as np
+
+# Plot the network found by ADD and save it to filename. With show_center, 
+# the links between the center and the concentrators are drawn.
+def plotAdd(out, pos, labels=[], filename="figure_add.png", 
+            title='ADD Algorithm', show_center=False, show=False, 
+            maxEdges=None):
+    numNodes = out["num"]
+    center = out["center"]
+    concList = sorted(out["conc"])
+    assoc = np.asarray(out["assoc"], dtype=np.intp)
+    xy = _positions(pos, numNodes)
+
+    fig, ax = _figure(show)
+    terms = _sample(np.arange(numNodes), maxEdges)
+    _lines(ax, xy, terms, assoc[terms], color="blue", alpha=0.3)
+    if show_center:
+        _lines(ax, xy, [center] * len(concList), concList, color="blue", 
+               width=2, alpha=0.1)
+    _nodes(ax, xy, concList, [center])
+
+    # Draw node labels       
+    if labels:
+        _labels(ax, xy, concList, labels)
+
+    _finish(fig, ax, title, filename, show)
+
+# Plot the network found by MENTOR and save it to filename. With edisp, the 
+# number of channels of every link of the mesh is shown.
+def plotMentor(out, pos, labels=[], edisp=True, filename="figure_mentor.png", 
+               title='MENTOR Algorithm', show=False, maxEdges=None):
+    numNodes = len(pos)
+    mesh = out["mesh"]
+    ch = out["channels"]   
+    backbone = out["backbone"]
+    median = out["median"]
+    tree = out["tree"]
+    xy = _positions(pos, numNodes)
+
+    # Separate the mesh
+    inBackbone = set(backbone)
+    bknet = [p for p in mesh if p[0] in inBackbone and p[1] in inBackbone]
+    local = [p for p in mesh if p[0] not in inBackbone or 
+                                p[1] not in inBackbone]
+    local = [local[k] for k in _sample(np.arange(len(local)), maxEdges)]
+
+    fig, ax = _figure(show)
+    for links, width, alpha, color in ((local, 1, 0.3, "green"), 
+                                       (bknet, 1, 0.8, "blue"),
+                                       (tree, 2, 1, "blue")):
+        if len(links):
+            links = np.asarray(links, dtype=np.intp).reshape(-1, 2)
+            _lines(ax, xy, links[:, 0], links[:, 1], color=color, 
+                   width=width, alpha=alpha)
+    _nodes(ax, xy, backbone, [median])
+
+    # Draw node and edge labels, only for the links that are drawn
+    if edisp:       
+        channels = dict(zip(mesh, ch))
+        for i, j in bknet + local:
+            x, y = (xy[i] + xy[j]) / 2
+            ax.text(x, y, str(channels[(i, j)]), fontsize=10, color="grey", 
+                    ha="center", va="center", zorder=1,
+                    bbox=dict(boxstyle="round", ec="white", fc="white"))
+    if labels:
+        _labels(ax, xy, backbone, labels)
+
+    _finish(fig, ax, title, filename, show)
+
+# The positions of the nodes as an array, from a dict or a list
+def _positions(pos, n):
+    return np.array([pos[i] for i in range(n)], dtype=np.float64).reshape(-1, 2)
+
+# About maxEdges of the entries of a, evenly spread
+def _sample(a, maxEdges):
+    if maxEdges is None or len(a) <= maxEdges:
+        return a
+    step = -(-len(a) // max(1, maxEdges))
+    return a[::step]
+
+# Draw the links from the nodes a to the nodes b
+def _lines(ax, xy, a, b, color, width=1, alpha=1):
+    segments = np.stack((xy[np.asarray(a, dtype=np.intp)], 
+                         xy[np.asarray(b, dtype=np.intp)]), axis=1)
+    ax.add_collection(LineCollection(segments, colors=color, linewidths=width,
+                                     alpha=alpha, zorder=1))
+
+# Draw all nodes in green, the nodes in big in red and the nodes in biggest 
+# in black, on top of the others
+def _nodes(ax, xy, big, biggest):
+    n = len(xy)
+    order = np.concatenate((np.arange(n), np.asarray(big, dtype=np.intp), 
+                            np.asarray(biggest, dtype=np.intp)))
+    sizes = np.repeat([10, 50, 150], [n, len(big), len(biggest)])
+    colors = np.repeat([to_rgba("green", 0.5), to_rgba("red"), 
+                        to_rgba("black")], [n, len(big), len(biggest)], axis=0)
+    ax.scatter(xy[order, 0], xy[order, 1], s=sizes, c=colors, linewidths=0,
+               zorder=2)
+
+# Draw the labels of the nodes, above them
+def _labels(ax, xy, nodes, labels):
+    for n in nodes:
+        ax.text(xy[n, 0], xy[n, 1] + 0.03, labels[n], fontsize=10, 
+                color="black", ha="center", va="center", zorder=3)
+
+# A figure is made by pyplot only if it is to be shown
+def _figure(show):
+    if show:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=(6,6), facecolor="white")
+    else:
+        fig = Figure(figsize=(6,6), facecolor="white")
+    return fig, fig.add_subplot()
+
+def _finish(fig, ax, title, filename, show):
+    ax.set_xlim(-0.05,1.05)
+    ax.set_ylim(-0.05,1.05)
+    ax.axis('off')
+    ax.set_title(title)
+    if filename:
+        fig.savefig(filename)
+    if show:
+        import matplotlib.pyplot as plt
+        plt.show()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# This file includes the results of ADD and MENTOR. Nodes are kept in arrays
+# of 32 bit integers, and the indexes that reports need (the terminals of a
+# concentrator, the channels of a link) are built once when they are first
+# used, so that every report takes O(n). 
+#
+# Results can still be read like the dicts that run() used to return: 
+# out["assoc"] is a list, out["conc"] a set and out["mesh"] a list of pairs,
+# built when they are read. Results can be saved to an uncompressed .npz file
+# with save(), and read back by load() with the arrays memory-mapped.
+
+from .main import getItem
+from array import array
+import json, struct, zipfile
+
+try:
+    import numpy as np
+except ImportError:                 # results cannot be saved
+    np = None
+
+class Result(object):
+    __slots__ = ("stats",)
+    KEYS = ()
+    ARRAYS = ()                     # Keys saved as arrays
+    LISTS = ()                      # Keys that are found from the arrays
+    INFO = ("stats",)               # Keys that are not part of the network
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return self.get(key)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def keys(self):
+        return self.KEYS
+
+    # Results are equal if they describe the same network. A result is also
+    # equal to a dict with the same network, like run() used to return.
+    def __eq__(self, other):
+        if type(other) is not type(self) and not isinstance(other, dict):
+            return NotImplemented
+        return all([k in other and self.get(k) == other.get(k) 
+                    for k in self.KEYS if k not in self.INFO])
+
+    __hash__ = None
+
+    def __repr__(self):
+        items = ["%s=%r" % (k, self.get(k)) for k in self.KEYS 
+                                                      if k not in self.INFO]
+        return "%s(%s)" % (type(self).__name__, ", ".join(items))
+
+    # Save the result to path, an uncompressed .npz file. The arrays are 
+    # written as they are, the other values as JSON.
+    def save(self, path):
+        if np is None:
+            raise ImportError("Saving results requires numpy")
+        arrays = {name: np.asarray(getattr(self, name)) 
+                                                    for name in self.ARRAYS}
+        meta = {k: self.get(k) for k in self.KEYS if k not in self.ARRAYS and 
+                                                     k not in self.LISTS}
+        meta["type"] = type(self).__name__
+        np.savez(path, meta=np.array(json.dumps(meta)), **arrays)
+
+class ADDResult(Result):
+    __slots__ = ("cost", "center", "assoc", "compare", "__order", "__start", 
+                 "__conc")
+    KEYS = ("cost", "center", "num", "assoc", "conc", "stats", "compare")
+    ARRAYS = ("assoc",)
+    LISTS = ("num", "conc")
+    INFO = ("stats", "compare")
+
+    # assoc is the concentrator of every terminal
+    def __init__(self, cost, center, assoc, stats=None):
+        self.cost = cost
+        self.center = center
+        self.assoc = _array("i", assoc)
+        self.stats = stats if stats is not None else {}
+        self.compare = None             # Comparison with a cold run
+        self.__order = None
+
+    def get(self, key, default=None):
+        if key == "num":
+            return len(self.assoc)
+        if key == "assoc":
+            return self.assoc.tolist()
+        if key == "conc":
+            return set(self.assoc.tolist())
+        return getattr(self, key, default) if key in self.KEYS else default
+
+    # The concentrators, in increasing order
+    def concentrators(self):
+        self.__index()
+        return list(self.__conc)
+
+    # The terminals associated with concentrator c, in increasing order
+    def terminals(self, c):
+        self.__index()
+        k = self.__conc.get(c)
+        if k is None:
+            return self.__order[0:0]
+        return self.__order[self.__start[k]:self.__start[k+1]]
+
+    # The number of terminals associated with every concentrator
+    def summary(self):
+        self.__index()
+        return {c: self.__start[k+1] - self.__start[k] 
+                                            for c, k in self.__conc.items()}
+
+    # For every concentrator, the number of its terminals and the cost of
+    # connecting them to it
+    def report(self, cost):
+        total = dict.fromkeys(self.concentrators(), 0)
+        for t, c in enumerate(self.assoc.tolist()):
+            total[c] += getItem(cost, t, c)
+        counts = self.summary()
+        return [(c, counts[c], total[c]) for c in total]
+
+    # Sort the terminals by concentrator, counting them first
+    def __index(self):
+        if self.__order is not None:
+            return
+        assoc = self.assoc.tolist()
+        conc = sorted(set(assoc))
+        self.__conc = {c: k for k, c in enumerate(conc)}
+        start = [0] * (len(conc) + 1)
+        for c in assoc:
+            start[self.__conc[c] + 1] += 1
+        for k in range(len(conc)):
+            start[k+1] += start[k]
+        order = array("i", [0]) * len(assoc)
+        pos = start[:-1]
+        for t, c in enumerate(assoc):
+            k = self.__conc[c]
+            order[pos[k]] = t
+            pos[k] += 1
+        self.__start = start
+        self.__order = order
+
+class MENTORResult(Result):
+    __slots__ = ("backbone", "median", "tree", "mesh", "channels", 
+                 "__channel")
+    KEYS = ("backbone", "tree", "mesh", "channels", "median", "stats")
+    ARRAYS = ("backbone", "tree", "mesh", "channels")
+    LISTS = ()
+
+    # tree and mesh are lists of links (i, j), and channels the number of
+    # channels of every link of the mesh. The links are kept as arrays of 
+    # their two ends, one after the other. Channels are 64 bit integers.
+    def __init__(self, backbone, tree, mesh, channels, median, stats=None):
+        self.backbone = _array("i", backbone)
+        self.median = median
+        self.tree = _pairs(tree)
+        self.mesh = _pairs(mesh)
+        self.channels = _array("q", channels)
+        self.stats = stats if stats is not None else {}
+        self.__channel = None
+
+    def get(self, key, default=None):
+        if key in ("tree", "mesh"):
+            ends = getattr(self, key).tolist()
+            return list(zip(ends[0::2], ends[1::2]))
+        if key in ("backbone", "channels"):
+            return getattr(self, key).tolist()
+        return getattr(self, key, default) if key in self.KEYS else default
+
+    # The links of the mesh, with their channels, as (i, j, channels)
+    def links(self):
+        ends = self.mesh.tolist()
+        return list(zip(ends[0::2], ends[1::2], self.channels.tolist()))
+
+    # The number of channels between i and j, in either direction
+    def channel(self, i, j):
+        if self.__channel is None:
+            self.__channel = {}
+            for i1, j1, ch in self.links():
+                self.__channel[(i1, j1)] = self.__channel[(j1, i1)] = ch
+        return self.__channel.get((i, j), 0)
+
+    # The links of the mesh between two backbone nodes
+    def backboneLinks(self):
+        backbone = set(self.backbone.tolist())
+        return [(i, j, ch) for i, j, ch in self.links() 
+                                          if i in backbone and j in backbone]
+
+    # The cost of every link of the mesh, times its channels
+    def report(self, cost):
+        return [(i, j, ch, getItem(cost, i, j) * ch) 
+                                                for i, j, ch in self.links()]
+
+    def totalCost(self, cost):
+        return sum([c for i, j, ch, c in self.report(cost)])
+
+    # The total cost, the number of backbone nodes and the number of links
+    # of the mesh and of the backbone
+    def summary(self, cost):
+        return {"cost": self.totalCost(cost), 
+                "backbone": len(self.backbone),
+                "links": len(self.channels), 
+                "backboneLinks": len(self.backboneLinks())}
+
+# Read a result saved by save(). With mmap, the arrays are memory-mapped 
+# from the file instead of being read.
+def load(path, mmap=True):
+    if np is None:
+        raise ImportError("Loading results requires numpy")
+    with np.load(path, allow_pickle=False) as f:
+        meta = json.loads(f["meta"].item())
+        cls = {"ADDResult": ADDResult, "MENTORResult": MENTORResult}[
+                                                                meta["type"]]
+        arrays = {name: _mapped(path, name) if mmap else None 
+                                                     for name in cls.ARRAYS}
+        for name in arrays:
+            if arrays[name] is None:
+                arrays[name] = f[name]
+
+    out = cls.__new__(cls)
+    for k in cls.KEYS:
+        if k in arrays:
+            setattr(out, k, arrays[k])
+        elif k not in cls.LISTS:
+            setattr(out, k, meta.get(k))
+    if cls is ADDResult:
+        out._ADDResult__order = None
+    else:
+        out._MENTORResult__channel = None
+    return out
+
+# Map the array name of an uncompressed .npz file, or return None if it 
+# cannot be mapped
+def _mapped(path, name):
+    with zipfile.ZipFile(path) as z:
+        info = z.getinfo(name + ".npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(path, "rb") as f:
+        # skip the local header of the member, then the header of the array
+        f.seek(info.header_offset)
+        header = f.read(30)
+        n, m = struct.unpack("<HH", header[26:30])
+        f.seek(info.header_offset + 30 + n + m)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        elif version == (2, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        else:
+            return None
+        offset = f.tell()
+    if 0 in shape or dtype.hasobject:
+        return None
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape,
+                     order="F" if fortran else "C")
+
+def _array(code, values):
+    if isinstance(values, array) and values.typecode == code:
+        return values
+    if np is not None and hasattr(values, "dtype"):
+        a = array(code)
+        a.frombytes(np.ascontiguousarray(values, dtype=a.typecode).tobytes())
+        return a
+    return array(code, values)
+
+def _pairs(links):
+    return array("i", [i for link in links for i in link])
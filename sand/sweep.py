@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# This file includes parameter sweeps for the SAND algorithms. Every point of
+# a parameter grid is a run of ADD or MENTOR. The points are spread over a
+# pool of worker processes that share the cost and traffic matrices, and the
+# results are returned as they finish, with the total cost and run time.
+#
+# Example:
+#   for row in sweep("mentor", {"alpha": [0.5, 1], "cap": [16, 32]},
+#                    cost, req=req):
+#       print(row)
+#
+# or from the command line:
+#   python -m sand.sweep mentor cost.npy --req req.npy \
+#                        --grid alpha=0.5,1 cap=16,32
+
+from .add import ADD
+from .mentor import MENTOR, totalCost
+from .loaders import loadMatrix, loadVector
+from multiprocessing import shared_memory
+import multiprocessing
+import argparse, itertools, sys, time
+
+try:
+    import numpy as np
+except ImportError:                 # matrices are copied to every worker
+    np = None
+
+ALGORITHMS = {"add": ADD, "mentor": MENTOR}
+
+# The parameters that can be swept for every algorithm. Other arguments of
+# run() are given as options and are the same for all points.
+PARAMS = {"add": ("center", "Wlimit", "th_move"),
+          "mentor": ("wparm", "rparm", "dparm", "alpha", "cap", "slack")}
+
+# Return the points of a grid given as a dict of parameter values, with the
+# last parameter changing fastest
+def makeGrid(grid):
+    names = list(grid)
+    return [dict(zip(names, values))
+                  for values in itertools.product(*[grid[n] for n in names])]
+
+# Run algorithm ("add" or "mentor") for every point of grid, which is a dict
+# of parameter values or a list of points. MENTOR needs req, and ADD needs
+# Ccost and weight. Yields a dict for every point as soon as it finishes,
+# with the index of the point, its parameters, the total cost and the run
+# time in seconds. With workers=1 the points are run in this process.
+def sweep(algorithm, grid, cost, req=None, Ccost=None, weight=None,
+          workers=None, **options):
+    if algorithm not in ALGORITHMS:
+        raise ValueError("Unknown algorithm '%s'" % algorithm)
+    points = makeGrid(grid) if isinstance(grid, dict) else list(grid)
+    for point in points:
+        for name in point:
+            if name not in PARAMS[algorithm]:
+                raise ValueError("Unknown parameter '%s' for %s" %
+                                                          (name, algorithm))
+    data = {"cost": cost, "req": req, "Ccost": Ccost, "weight": weight}
+
+    if workers == 1:
+        _initWorker(algorithm, data, {}, options)
+        for task in enumerate(points):
+            yield _runPoint(task)
+        return
+
+    # Matrices that numpy can hold are copied once to shared memory. Others,
+    # like cost models, are sent to every worker when it starts.
+    shms = []
+    shared = {}
+    try:
+        for name in ("cost", "req"):
+            m = data[name]
+            if np is None or m is None or hasattr(m, "column"):
+                continue
+            M = np.asarray(m)
+            if M.dtype.kind not in "biuf":
+                continue
+            shm = shared_memory.SharedMemory(create=True, size=max(1, M.nbytes))
+            shms.append(shm)
+            np.ndarray(M.shape, dtype=M.dtype, buffer=shm.buf)[:] = M
+            shared[name] = (shm.name, M.shape, M.dtype.str)
+            data[name] = None
+
+        pool = multiprocessing.Pool(workers, initializer=_initWorker,
+                                    initargs=(algorithm, data, shared, options))
+        try:
+            for row in pool.imap_unordered(_runPoint, enumerate(points)):
+                yield row
+        finally:
+            pool.terminate()
+            pool.join()
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+# Print the results of a sweep as a table, in the order of the points
+def printTable(rows, file=sys.stdout):
+    rows = sorted(rows, key=lambda row: row["point"])
+    if not rows:
+        return
+    names = [n for n in rows[0] if n not in ("point", "cost", "time")]
+    print(_header(names), file=file)
+    print('=' * (10 * len(names) + 28), file=file)
+    for row in rows:
+        print(_format(row, names), file=file)
+
+def _header(names):
+    return ('%6s' % 'Point' + ''.join(['%10s' % n for n in names]) +
+            '%12s%10s' % ('Cost', 'Time(s)'))
+
+def _format(row, names):
+    cost = row["cost"]
+    if isinstance(cost, float):
+        cost = '%.2f' % cost
+    return ('%6d' % row["point"] + ''.join(['%10s' % row[n] for n in names]) +
+            '%12s%10.3f' % (cost, row["time"]))
+
+# The worker processes of sweep() keep the algorithm, the matrices and the
+# options of the sweep
+_worker = None
+
+def _initWorker(algorithm, data, shared, options):
+    global _worker
+    data = dict(data)
+    shms = []
+    for name, (shmName, shape, dtype) in shared.items():
+        shm = shared_memory.SharedMemory(name=shmName)
+        shms.append(shm)
+        data[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker = (algorithm, data, options, shms)
+
+def _runPoint(task):
+    index, point = task
+    algorithm, data, options, shms = _worker
+    kwargs = dict(options)
+    kwargs.update(point)
+    start = time.perf_counter()
+    if algorithm == "add":
+        out = ADD().run(data["cost"], data["Ccost"], data["weight"], **kwargs)
+        total = out["cost"]
+    else:
+        out = MENTOR().run(data["cost"], data["req"], **kwargs)
+        total = totalCost(out, data["cost"])
+    row = {"point": index}
+    row.update(point)
+    row["cost"] = total
+    row["time"] = time.perf_counter() - start
+    return row
+
+# Parse a number, or keep a string
+def _value(s):
+    for kind in (int, float):
+        try:
+            return kind(s)
+        except ValueError:
+            pass
+    return {"True": True, "False": False, "None": None}.get(s, s)
+
+def _assignments(items):
+    values = {}
+    for item in items:
+        name, sep, text = item.partition("=")
+        if not sep:
+            raise SystemExit("Expected name=value, got '%s'" % item)
+        values[name] = [_value(v) for v in text.split(",")]
+    return values
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sand.sweep",
+                    description="Run ADD or MENTOR over a grid of parameters.")
+    parser.add_argument("algorithm", choices=sorted(ALGORITHMS))
+    parser.add_argument("cost", help="cost matrix (.npy, .edges or text)")
+    parser.add_argument("--req", help="traffic matrix, for MENTOR")
+    parser.add_argument("--ccost", help="concentrator costs, for ADD")
+    parser.add_argument("--weight", help="terminal weights, for ADD "
+                                         "(default 1 for all)")
+    parser.add_argument("--grid", nargs="+", default=[], metavar="NAME=V1,V2",
+                        help="parameter values to sweep")
+    parser.add_argument("--option", nargs="+", default=[], metavar="NAME=V",
+                        help="other arguments of run(), the same for all "
+                             "points")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: all CPUs)")
+    args = parser.parse_args(argv)
+
+    cost = loadMatrix(args.cost)
+    data = {}
+    if args.algorithm == "mentor":
+        if args.req is None:
+            parser.error("MENTOR needs --req")
+        data["req"] = loadMatrix(args.req)
+    else:
+        if args.ccost is None:
+            parser.error("ADD needs --ccost")
+        data["Ccost"] = loadVector(args.ccost)
+        data["weight"] = (loadVector(args.weight) if args.weight else
+                          [1] * len(cost))
+    options = {n: v[0] for n, v in _assignments(args.option).items()}
+    grid = _assignments(args.grid)
+
+    # Print the points as they finish, then all of them in order
+    rows = []
+    print(_header(list(grid)))
+    for row in sweep(args.algorithm, grid, cost, workers=args.workers,
+                     **dict(data, **options)):
+        print(_format(row, list(grid)))
+        sys.stdout.flush()
+        rows.append(row)
+    print()
+    printTable(rows)
+
+if __name__ == "__main__":
+    main()
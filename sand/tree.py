@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# This file includes path queries on a tree given by the predecessor of every
+# node. They are answered with a lowest common ancestor (LCA) index built by
+# binary lifting, which takes O(n log n) memory, instead of n x n tables.
+# TreePaths can be read like the predecessor matrix spPred of MENTOR: row i
+# gives the node before j on the path from i to j.
+
+try:
+    import numpy as np
+except ImportError:                 # queries are answered one pair at a time
+    np = None
+
+class TreePaths(object):
+    # pred is the predecessor of every node, and pred[root] is root. link[j]
+    # is the cost of the link between j and pred[j], used for distances.
+    def __init__(self, pred, root, link=None):
+        self.n = len(pred)
+        self.root = root
+
+        children = [[] for i in range(self.n)]
+        for i in range(self.n):
+            if i != root:
+                children[pred[i]].append(i)
+        depth = [-1] * self.n
+        depth[root] = 0
+        queue = [root]
+        for p in queue:
+            for i in children[p]:
+                depth[i] = depth[p] + 1
+                queue.append(i)
+        if len(queue) < self.n:
+            raise ValueError("pred is not a tree rooted at %d" % root)
+
+        # distance from the root, adding the links from the root down
+        self.rootDist = None
+        if link is not None:
+            self.rootDist = [0] * self.n
+            for i in queue[1:]:
+                self.rootDist[i] = self.rootDist[pred[i]] + link[i]
+
+        # up[k][i] is the ancestor 2**k levels above i, or root
+        levels = max(1, max(depth).bit_length())
+        if np is not None:
+            itype = np.int32 if self.n < 2**31 else np.int64
+            self.depth = np.array(depth, dtype=itype)
+            self.up = np.empty((levels, self.n), dtype=itype)
+            self.up[0] = pred
+            self.up[0, root] = root
+            for k in range(1, levels):
+                self.up[k] = self.up[k-1][self.up[k-1]]
+            if self.rootDist is not None:
+                self.rootDist = np.array(self.rootDist)
+        else:
+            self.depth = depth
+            self.up = [list(pred)]
+            self.up[0][root] = root
+            for k in range(1, levels):
+                prev = self.up[-1]
+                self.up.append([prev[prev[i]] for i in range(self.n)])
+
+    def __len__(self):
+        return self.n
+
+    # Return row i, the node before each node j on the path from i to j
+    def __getitem__(self, i):
+        if not 0 <= i < self.n:
+            raise IndexError("row index out of range")
+        if np is None:
+            return [self.prev(i, j) for j in range(self.n)]
+        return self.prev(i, np.arange(self.n)).tolist()
+
+    # Return column j, the node before j on the path from each node i, for
+    # the given rows or for all rows
+    def column(self, j, rows=None):
+        if rows is None:
+            rows = range(self.n)
+        if np is None:
+            return [self.prev(i, j) for i in rows]
+        return self.prev(np.asarray(rows, dtype=np.intp), j).tolist()
+
+    # The ancestor of i at the given depth, which must not be below i
+    def ancestor(self, i, depth):
+        if np is None:
+            return self.__lift(i, self.depth[i] - depth)
+        i = np.asarray(i, dtype=np.intp)
+        return self.__scalar(self.__lift(i, self.depth[i] - depth))
+
+    # The lowest common ancestor of i and j
+    def lca(self, i, j):
+        if np is None:
+            if self.depth[i] < self.depth[j]:
+                i, j = j, i
+            i = self.__lift(i, self.depth[i] - self.depth[j])
+            if i == j:
+                return i
+            for k in range(len(self.up) - 1, -1, -1):
+                if self.up[k][i] != self.up[k][j]:
+                    i, j = self.up[k][i], self.up[k][j]
+            return self.up[0][i]
+
+        i, j = np.broadcast_arrays(np.asarray(i, dtype=np.intp),
+                                   np.asarray(j, dtype=np.intp))
+        swap = self.depth[i] < self.depth[j]
+        a = np.where(swap, j, i)
+        b = np.where(swap, i, j)
+        a = self.__lift(a, self.depth[a] - self.depth[b])
+        for k in range(len(self.up) - 1, -1, -1):
+            ua = self.up[k][a]
+            ub = self.up[k][b]
+            m = ua != ub
+            a = np.where(m, ua, a)
+            b = np.where(m, ub, b)
+        return self.__scalar(np.where(a == b, a, self.up[0][a]))
+
+    # The node before j on the path from i to j, which is i if j is i. That
+    # is the predecessor of j, unless j is above i, then it is the ancestor
+    # of i just below j.
+    def prev(self, i, j):
+        if np is None:
+            if i == j:
+                return i
+            if self.lca(i, j) != j:
+                return self.up[0][j]
+            return self.__lift(i, self.depth[i] - self.depth[j] - 1)
+
+        i, j = np.broadcast_arrays(np.asarray(i, dtype=np.intp),
+                                   np.asarray(j, dtype=np.intp))
+        above = self.lca(i, j) == j
+        below = self.__lift(i, np.maximum(self.depth[i] - self.depth[j] - 1, 0))
+        p = np.where(above, below, self.up[0][j])
+        return self.__scalar(np.where(i == j, i, p))
+
+    # The cost of the path between i and j
+    def dist(self, i, j):
+        if self.rootDist is None:
+            raise ValueError("Distances need the link costs")
+        a = self.lca(i, j)
+        d = self.rootDist[i] + self.rootDist[j] - 2 * self.rootDist[a]
+        return d.tolist() if hasattr(d, "tolist") else d
+
+    # Move the nodes i up by h levels
+    def __lift(self, i, h):
+        if np is None:
+            k = 0
+            while h:
+                if h & 1:
+                    i = self.up[k][i]
+                h >>= 1
+                k += 1
+            return i
+        for k in range(len(self.up)):
+            i = np.where((h >> k) & 1, self.up[k][i], i)
+        return i
+
+    def __scalar(self, a):
+        return a.item() if a.ndim == 0 else a
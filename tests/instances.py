@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# This file includes small random instances for the tests. Nodes are placed 
+# at random in the unit square, and the cost between two nodes is the square 
+# root of their Manhattan distance times 1000, rounded unless integer is 
+# False, as in the examples.
+
+import math, random
+
+# Random positions and the cost matrix between them, as a list of lists
+def network(n, seed, integer=True):
+    rnd = random.Random(seed)
+    pos = {i:(rnd.random(), rnd.random()) for i in range(n)}
+    cost = [[0] * n for i in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            d = math.sqrt(abs(pos[i][0] - pos[j][0]) + 
+                          abs(pos[i][1] - pos[j][1])) * 1000
+            cost[i][j] = cost[j][i] = round(d) if integer else d
+    return pos, cost
+
+# An instance of ADD: the positions, the cost matrix, the cost of the 
+# concentrators, the weights and the center. With weights, the weights are
+# random between 1 and 3.
+def addInstance(n, seed, integer=True, weights=False):
+    pos, cost = network(n, seed, integer)
+    rnd = random.Random(seed + 1)
+    center = rnd.randrange(n)
+    Ccost = [cost[i][center] + 100 for i in range(n)]
+    Ccost[center] = 0
+    weight = [rnd.randint(1, 3) if weights else 1 for i in range(n)]
+    return pos, cost, Ccost, weight, center
+
+# An instance of MENTOR: the positions, the cost matrix and the traffic
+# matrix. With integer, the traffic is rounded too.
+def mentorInstance(n, seed, integer=True):
+    pos, cost = network(n, seed, integer)
+    rnd = random.Random(seed + 2)
+    req = [[rnd.random() * 10 for j in range(n)] for i in range(n)]
+    if integer:
+        req = [[round(v) for v in r] for r in req]
+    return pos, cost, req
+
+# The parameters of ADD for instance seed
+def addParams(seed, center):
+    return {"center": center, "Wlimit": 3 + seed % 5, 
+            "th_move": (seed % 3) * 10}
+
+# The parameters of MENTOR for instance seed
+def mentorParams(seed):
+    rnd = random.Random(seed + 3)
+    return {"wparm": rnd.choice([0, 0.2, 0.5, 0.9, 1]), 
+            "rparm": rnd.choice([0.01, 0.3, 0.5]),
+            "dparm": rnd.choice([0, 0.5]), 
+            "alpha": rnd.choice([0, 0.5, 1]),
+            "cap": rnd.choice([3, 10, 40]), "slack": 0.2}
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# Tests of ADD. Every variant must give the same network as the reference 
+# implementation on random instances.
+
+import os, tempfile, unittest
+
+try:
+    import numpy as np
+except ImportError:                 # numpy variants are not tested
+    np = None
+
+from sand.add import ADD
+from benchmarks import reference
+from tests.instances import addInstance, addParams
+
+class ADDTest(unittest.TestCase):
+    # Run ADD with options and the reference on random instances. The cost
+    # matrix is given to ADD as matrix(cost).
+    def checkSame(self, seeds=range(24), algorithm=ADD, matrix=None, 
+                  **options):
+        for seed in seeds:
+            pos, cost, Ccost, weight, center = addInstance(8 + seed * 2, seed, 
+                                         integer=seed % 2 == 0, 
+                                         weights=seed % 3 == 0)
+            params = addParams(seed, center)
+            ref = reference.ADD().run(cost, Ccost, weight, **params)
+            m = cost if matrix is None else matrix(cost)
+            out = algorithm().run(m, Ccost, weight, **dict(params, **options))
+            self.assertEqual(out, ref, "seed %d" % seed)
+
+    def testDefault(self):
+        self.checkSame()
+
+    def testIncremental(self):
+        self.checkSame(incremental=True)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testNumpy(self):
+        self.checkSame(backend="numpy")
+
+    # With blocks of a few columns, some blocks have columns without any
+    # savings
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testNumpyBlocks(self):
+        self.checkSame(backend="numpy", algorithm=SmallBlocks)
+
+    # A concentrator that is too far from every terminal, as the last column
+    # of a block, has no savings
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testNumpyNoSavings(self):
+        for seed in range(6):
+            pos, cost, Ccost, weight, center = addInstance(12, seed)
+            cost = [row + [10**6] for row in cost]
+            Ccost = Ccost + [10]
+            params = addParams(seed, center)
+            ref = reference.ADD().run(cost, Ccost, weight, **params)
+            for algorithm in (ADD, SmallBlocks):
+                out = algorithm().run(cost, Ccost, weight, backend="numpy", 
+                                      **params)
+                self.assertEqual(out, ref, "seed %d" % seed)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testWorkers(self):
+        self.checkSame(seeds=range(0, 24, 4), workers=2)
+        self.checkSame(seeds=range(1, 24, 4), workers=2, incremental=True)
+
+    def testLazy(self):
+        self.checkSame(lazy=True)
+        self.checkSame(lazy=True, incremental=True)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testLazyNumpy(self):
+        self.checkSame(lazy=True, backend="numpy")
+
+    def testLazyWorkers(self):
+        pos, cost, Ccost, weight, center = addInstance(8, 0)
+        with self.assertRaises(ValueError):
+            ADD().run(cost, Ccost, weight, lazy=True, workers=2)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testArrays(self):
+        self.checkSame(matrix=np.array)
+        self.checkSame(matrix=np.array, backend="numpy")
+        self.checkSame(seeds=range(0, 24, 2), 
+                       matrix=lambda m: np.array(m, dtype=np.int32))
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testMemmap(self):
+        with tempfile.TemporaryDirectory() as path:
+            files = []
+            def memmap(m):
+                files.append(os.path.join(path, "%d.npy" % len(files)))
+                np.save(files[-1], np.array(m))
+                return np.load(files[-1], mmap_mode="r")
+            self.checkSame(seeds=range(8), matrix=memmap)
+            self.checkSame(seeds=range(8), matrix=memmap, backend="numpy")
+
+    # With k at least the number of concentrators, the candidate lists hold 
+    # every terminal
+    def testNearestAll(self):
+        self.checkSame(k=1000)
+        self.checkSame(seeds=range(0, 24, 3), k=1000, lazy=True)
+
+    # With fewer candidates the network is not the same, but it must be a 
+    # valid one, and every terminal is either at the center or at one of its
+    # k cheapest concentrators
+    def testNearest(self):
+        variants = [{}, {"incremental": True}, {"lazy": True}]
+        if np is not None:
+            variants.append({"backend": "numpy"})
+        for seed in range(24):
+            pos, cost, Ccost, weight, center = addInstance(8 + seed * 2, seed, 
+                                         weights=seed % 3 == 0)
+            params = addParams(seed, center)
+            concs = [c for c in range(len(cost)) if c != center]
+            for options in variants:
+                out = ADD().run(cost, Ccost, weight, k=3, 
+                                **dict(params, **options))
+                self.assertEqual(out.cost, 
+                    sum([cost[t][c] for t, c in enumerate(out["assoc"])]) + 
+                    sum([Ccost[c] for c in out["conc"]]))
+                for t, c in enumerate(out["assoc"]):
+                    near = sorted(concs, key=cost[t].__getitem__)[:3]
+                    self.assertTrue(c == center or 
+                                    cost[t][c] <= cost[t][near[-1]])
+                for c in out["conc"] - {center}:
+                    load = sum([weight[t] for t in out.terminals(c)])
+                    self.assertLessEqual(load, params["Wlimit"])
+
+class SmallBlocks(ADD):
+    blockSize = 64
+
+if __name__ == "__main__":
+    unittest.main()
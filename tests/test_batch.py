@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# Tests of the batch solver. Every job must give the network found by ADD on
+# a copy of its block of the cost matrix.
+
+import random, unittest
+
+try:
+    import numpy as np
+except ImportError:                 # matrices are lists
+    np = None
+
+from sand.add import ADD
+from sand.batch import SubMatrix, block, solveBatch
+from tests.instances import addInstance
+
+# Random jobs on n nodes: contiguous blocks, ranges and scattered nodes
+def randomJobs(n, seed):
+    rnd = random.Random(seed)
+    jobs = [(range(0, n // 2), range(0, n // 3), 1, 4),
+            (list(range(n // 2, n)), list(range(n // 3, n)), n - 1, 6),
+            (range(n - 1, -1, -3), range(0, n, 2), 4, 3)]
+    for k in range(3):
+        terms = rnd.sample(range(n), rnd.randint(1, n))
+        concs = rnd.sample(range(n), rnd.randint(1, n))
+        jobs.append((terms, concs, rnd.choice(concs), rnd.randint(1, 8)))
+    return jobs
+
+class BatchTest(unittest.TestCase):
+    # Solve the jobs with ADD on copied blocks, numbered as in the matrix
+    def solveCopies(self, cost, Ccost, weight, jobs, **options):
+        results = []
+        for terms, concs, center, Wlimit in jobs:
+            terms, concs = list(terms), list(concs)
+            sub = [[cost[t][c] for c in concs] for t in terms]
+            out = ADD().run(sub, [Ccost[c] for c in concs], 
+                            [weight[t] for t in terms], 
+                            center=concs.index(center), Wlimit=Wlimit, 
+                            **options)
+            results.append({"cost": out["cost"], "center": center, 
+                            "num": len(terms), 
+                            "assoc": [concs[c] for c in out["assoc"]],
+                            "conc": set([concs[c] for c in out["conc"]])})
+        return results
+
+    def checkSame(self, matrix=None, workers=(1, 2), **options):
+        for seed in range(3):
+            pos, cost, Ccost, weight, center = addInstance(40, seed, 
+                                                           weights=True)
+            jobs = randomJobs(40, seed)
+            ref = self.solveCopies(cost, Ccost, weight, jobs, **options)
+            m = cost if matrix is None else matrix(cost)
+            for w in workers:
+                out = solveBatch(m, Ccost, weight, jobs, workers=w, **options)
+                self.assertEqual(out, ref, "seed %d, workers %d" % (seed, w))
+
+    def testLists(self):
+        self.checkSame()
+
+    def testOptions(self):
+        self.checkSame(workers=(1,), incremental=True, lazy=True)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testArrays(self):
+        self.checkSame(matrix=np.array)
+        self.checkSame(matrix=np.array, backend="numpy", incremental=True)
+
+    def testBlocks(self):
+        m = [[10 * i + j for j in range(6)] for i in range(5)]
+        for rows, cols in (([1, 3, 4], [5, 0, 2]), (range(1, 4), range(2, 6)),
+                           ([], [1])):
+            expected = [[m[i][j] for j in cols] for i in rows]
+            for matrix in [m] + ([np.array(m)] if np is not None else []):
+                b = block(matrix, rows, cols)
+                self.assertEqual(len(b), len(expected))
+                self.assertEqual([list(b[i]) for i in range(len(b))], 
+                                 expected)
+        b = SubMatrix(m, [1, 3], [5, 0])
+        self.assertEqual(b.item(1, 0), 35)
+        self.assertEqual(b.column(1), [10, 30])
+        self.assertEqual(b.column(0, [1]), [35])
+        self.assertEqual(b.max(), 35)
+        with self.assertRaises(IndexError):
+            b[2]
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testSlices(self):
+        m = np.arange(30).reshape(5, 6)
+        self.assertFalse(isinstance(block(m, range(1, 4), [2, 3]), SubMatrix))
+        self.assertIsInstance(block(m, [1, 3], range(6)), SubMatrix)
+        self.assertEqual(np.asarray(block(m, [1, 3], [0, 5])).tolist(), 
+                         [[6, 11], [18, 23]])
+
+    def testErrors(self):
+        pos, cost, Ccost, weight, center = addInstance(10, 0)
+        with self.assertRaises(ValueError):
+            solveBatch(cost, Ccost, weight, [(range(5), range(5), 7, 3)])
+        self.assertEqual(solveBatch(cost, Ccost, weight, []), [])
+
+if __name__ == "__main__":
+    unittest.main()
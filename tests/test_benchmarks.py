@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# Tests of the benchmark suite and its instances.
+
+import unittest
+
+try:
+    import numpy as np
+except ImportError:                 # matrices are lists
+    np = None
+
+from benchmarks.instances import addInstance, costMatrix, positions
+from benchmarks.suite import APPROXIMATE, VARIANTS, compareBaseline, runCase
+
+class InstancesTest(unittest.TestCase):
+    def testSeeds(self):
+        self.assertEqual(positions(20, 3), positions(20, 3))
+        self.assertNotEqual(positions(20, 3), positions(20, 4))
+        a, b = addInstance(20, 3, "list"), addInstance(20, 3, "list")
+        self.assertEqual(a, b)
+
+    # The forms of the cost matrix have the same entries
+    def testForms(self):
+        pos = positions(30, 1)
+        lists = costMatrix(pos, "list")
+        model = costMatrix(pos, "model")
+        self.assertEqual([model[i] for i in range(30)], lists)
+        self.assertEqual(costMatrix(pos, "matrix").tolist() if np is not None
+                         else costMatrix(pos, "matrix"), lists)
+        with self.assertRaises(ValueError):
+            costMatrix(pos, "other")
+
+class SuiteTest(unittest.TestCase):
+    # Every variant gives the network of the first implementation, except 
+    # the approximate ones
+    def testVariants(self):
+        for algorithm in VARIANTS:
+            ref = runCase(algorithm, 40, "reference")
+            self.assertGreater(ref["memory"], 0)
+            for variant in VARIANTS[algorithm]:
+                if variant == "parallel" or (np is None and
+                                             "numpy" in variant):
+                    continue
+                row = runCase(algorithm, 40, variant, memory=False)
+                if (algorithm, variant) in APPROXIMATE:
+                    self.assertGreater(row["cost"], 0)
+                    continue
+                self.assertEqual(row["digest"], ref["digest"], variant)
+                self.assertEqual(row["cost"], ref["cost"])
+                self.assertIsNone(row["memory"])
+
+    def testBaseline(self):
+        row = {"algorithm": "add", "n": 10, "variant": "lazy", "time": 1.0,
+               "stages": {"add": 0.9}, "memory": 20.0}
+        base = {"time": 1.0, "stages": {"add": 0.9}, "memory": 20.0}
+        self.assertEqual(compareBaseline(row, {}), "-")
+        self.assertEqual(compareBaseline(row, {"add/10/lazy": base}), "1.00x")
+        slow = dict(row, time=2.0, stages={"add": 1.9}, memory=40.0)
+        self.assertEqual(compareBaseline(slow, {"add/10/lazy": base}),
+                         "SLOWER(add,total,memory)")
+
+if __name__ == "__main__":
+    unittest.main()
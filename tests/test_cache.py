@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# Tests of the stage cache. A run that takes stages from the cache must give
+# the same network as a run without it, and only reuse the stages whose 
+# inputs are the same.
+
+import tempfile, unittest
+
+try:
+    import numpy as np
+except ImportError:                 # arrays are not fingerprinted
+    np = None
+
+from sand.cache import StageCache, fingerprint, makeKey
+from sand.cost import CostModel
+from sand.mentor import MENTOR
+from tests.instances import mentorInstance
+
+class StageCacheTest(unittest.TestCase):
+    def testEntries(self):
+        cache = StageCache(maxEntries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 1, 2))
+
+    def testFiles(self):
+        with tempfile.TemporaryDirectory() as path:
+            StageCache(path=path).put("a", [1, 2])
+            cache = StageCache(path=path)
+            self.assertIn("a", cache)
+            self.assertEqual(cache.get("a"), [1, 2])
+
+    def testKeys(self):
+        self.assertEqual(makeKey("a", 1, (2, 3)), makeKey("a", 1, (2, 3)))
+        self.assertNotEqual(makeKey("a", 1), makeKey("a", 2))
+        self.assertEqual(fingerprint([[1, 2]]), fingerprint([[1, 2]]))
+        self.assertNotEqual(fingerprint([[1, 2]]), fingerprint([[1, 3]]))
+        if np is not None:
+            a = np.arange(12).reshape(3, 4)
+            self.assertEqual(fingerprint(a), fingerprint(a.copy()))
+            self.assertNotEqual(fingerprint(a), fingerprint(a.astype(float)))
+
+    # Runs with other parameters reuse the stages before the first one that
+    # changes, and give the same networks as runs without the cache
+    def testMENTOR(self):
+        with tempfile.TemporaryDirectory() as path:
+            for cache in (StageCache(), StageCache(path=path)):
+                self.checkMENTOR(cache)
+                self.assertGreater(cache.hits, 0)
+
+    def checkMENTOR(self, cache):
+        for seed in range(6):
+            pos, cost, req = mentorInstance(15 + seed, seed)
+            for alpha in (0, 0.5):
+                for cap in (5, 20):
+                    params = dict(wparm=0.5, alpha=alpha, cap=cap)
+                    self.assertEqual(MENTOR(cache).run(cost, req, **params),
+                                     MENTOR().run(cost, req, **params))
+
+    # Cost models with different metric functions, even lambdas, are 
+    # different inputs
+    def testMetrics(self):
+        pos, cost, req = mentorInstance(15, 1)
+        first = CostModel(pos, metric=lambda p, q: abs(p[0] - q[0]) * 1000)
+        second = CostModel(pos, metric=lambda p, q: abs(p[1] - q[1]) * 1000)
+        again = CostModel(pos, metric=lambda p, q: abs(p[0] - q[0]) * 1000)
+        self.assertNotEqual(first.fingerprint(), second.fingerprint())
+        self.assertEqual(first.fingerprint(), again.fingerprint())
+
+        def scaled(k):
+            return lambda p, q: abs(p[0] - q[0]) * k
+        self.assertNotEqual(CostModel(pos, metric=scaled(1)).fingerprint(),
+                            CostModel(pos, metric=scaled(2)).fingerprint())
+
+        cache = StageCache()
+        MENTOR(cache).run(first, req, wparm=0.5)
+        self.assertEqual(MENTOR(cache).run(second, req, wparm=0.5),
+                         MENTOR().run(second, req, wparm=0.5))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# Tests of the cost models. A cost model must give the same costs as the 
+# matrix it stands for, and ADD and MENTOR the same networks.
+
+import unittest
+
+from sand.add import ADD
+from sand.cost import CostModel
+from sand.mentor import MENTOR
+import sand.cost
+from benchmarks import reference
+from tests.instances import (addInstance, addParams, mentorInstance, 
+                             mentorParams)
+
+def model(pos, integer=True):
+    return CostModel(pos, metric="sqrtmanhattan", scale=1000, 
+                     rounded=integer)
+
+class CostModelTest(unittest.TestCase):
+    def testEntries(self):
+        for integer in (True, False):
+            pos, cost, req = mentorInstance(30, 1, integer)
+            m = model(pos, integer)
+            self.assertEqual(len(m), 30)
+            self.assertEqual([m[i] for i in range(30)], cost)
+            self.assertEqual(m.column(3), [r[3] for r in cost])
+            self.assertEqual(m.column(3, [5, 1]), [cost[5][3], cost[1][3]])
+            self.assertEqual(m.item(4, 7), cost[4][7])
+            self.assertEqual(m.max(), max([max(r) for r in cost]))
+
+    # The rows computed one entry at a time are the same
+    def testWithoutNumpy(self):
+        pos, cost, req = mentorInstance(20, 2)
+        saved = sand.cost.np
+        sand.cost.np = None
+        try:
+            m = model(pos)
+        finally:
+            sand.cost.np = saved
+        self.assertEqual([m[i] for i in range(20)], cost)
+
+    def testADD(self):
+        for seed in range(12):
+            pos, cost, Ccost, weight, center = addInstance(8 + seed * 2, seed)
+            params = addParams(seed, center)
+            ref = reference.ADD().run(cost, Ccost, weight, **params)
+            for options in ({}, {"incremental": True}, {"lazy": True}):
+                out = ADD().run(model(pos), Ccost, weight, 
+                                **dict(params, **options))
+                self.assertEqual(out, ref, "seed %d" % seed)
+
+    def testMENTOR(self):
+        for seed in range(30):
+            pos, cost, req = mentorInstance(3 + seed % 25, seed)
+            params = mentorParams(seed)
+            ref = reference.MENTOR().run(cost, req, **params)
+            out = MENTOR().run(model(pos), req, **params)
+            self.assertEqual(out, ref, "seed %d" % seed)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# Tests of the hierarchical design. Regions must cover every node once, and
+# the traffic must be added up the same way with and without numpy.
+
+import random, unittest
+
+try:
+    import numpy as np
+except ImportError:                 # Python lists only
+    np = None
+
+import sand.hierarchy
+from sand.cost import CostModel
+from sand.hierarchy import _aggregate, compareFlat, design, partition
+
+def randomPositions(n, seed):
+    rnd = random.Random(seed)
+    return [(rnd.random(), rnd.random()) for i in range(n)]
+
+def randomTraffic(n, seed):
+    rnd = random.Random(seed + 1)
+    return [[rnd.randint(0, 5) for j in range(n)] for i in range(n)]
+
+# Run f without numpy in the hierarchy module
+def withoutNumpy(f, *args, **kwargs):
+    saved = sand.hierarchy.np
+    sand.hierarchy.np = None
+    try:
+        return f(*args, **kwargs)
+    finally:
+        sand.hierarchy.np = saved
+
+class HierarchyTest(unittest.TestCase):
+    def testPartition(self):
+        for n, size in ((1, 1), (10, 3), (50, 7), (64, 16), (100, 100)):
+            pos = randomPositions(n, n)
+            regions = partition(pos, size)
+            self.assertEqual(sorted([i for r in regions for i in r]), 
+                             list(range(n)))
+            self.assertEqual(len(regions), -(-n // size))
+            self.assertTrue(all([0 < len(r) <= size for r in regions]))
+            self.assertEqual([sorted(r) for r in regions], 
+                             [sorted(r) for r in withoutNumpy(partition, 
+                                                              pos, size)])
+        with self.assertRaises(ValueError):
+            partition(pos, 0)
+
+    def testAggregate(self):
+        n, k = 30, 4
+        rnd = random.Random(5)
+        group = [rnd.randrange(k) for i in range(n)]
+        group[:k] = range(k)
+        req = randomTraffic(n, 5)
+        expected = [[0] * k for a in range(k)]
+        for i in range(n):
+            for j in range(n):
+                if group[i] != group[j]:
+                    expected[group[i]][group[j]] += req[i][j]
+        pairs = {(i, j): req[i][j] for i in range(n) for j in range(n) 
+                                                             if req[i][j]}
+        for r in (req, pairs, np.array(req) if np is not None else req):
+            for f in (_aggregate, lambda *a: withoutNumpy(_aggregate, *a)):
+                out = f(r, group, k)
+                self.assertEqual([list(row) for row in out], expected)
+        self.assertEqual([list(row) for row in _aggregate({}, group, k)], 
+                         [[0] * k for a in range(k)])
+
+    def checkDesign(self, pos, out, concCost=100):
+        n = len(pos)
+        assoc, concs = out["assoc"], out["concentrators"]
+        self.assertEqual(sorted(set(assoc)), sorted(concs))
+        self.assertTrue(all([assoc[c] == c for c in concs]))
+        for nodes, center in zip(out["regions"], out["centers"]):
+            self.assertIn(center, nodes)
+            self.assertTrue(all([assoc[i] in nodes for i in nodes]))
+        model = CostModel(pos, metric="sqrtmanhattan", scale=1000, rounded=True)
+        cost = out["cost"]
+        self.assertEqual(cost["access"], 
+                         sum([model.item(i, assoc[i]) for i in range(n)]))
+        self.assertEqual(cost["concentrators"], concCost * len(concs))
+        self.assertEqual(cost["total"], cost["access"] + 
+                         cost["concentrators"] + cost["backbone"])
+
+    def testDesign(self):
+        pos = randomPositions(120, 1)
+        req = randomTraffic(120, 1)
+        options = {"cap": 50}
+        out = design(pos, req, size=40, Wlimit=6, mentorOptions=options)
+        self.assertEqual(len(out["regions"]), 3)
+        self.checkDesign(pos, out)
+        pool = design(pos, req, size=40, Wlimit=6, workers=2, 
+                      mentorOptions=options)
+        self.assertEqual(pool["assoc"], out["assoc"])
+        self.assertEqual(pool["cost"], out["cost"])
+        self.assertEqual(pool["backbone"], out["backbone"])
+
+        # The traffic can be given as a dict, and nodes as a dict
+        pairs = {(i, j): req[i][j] for i in range(120) for j in range(120)}
+        other = design(dict(enumerate(pos)), pairs, size=40, Wlimit=6, 
+                       workers=1, mentorOptions=options)
+        self.assertEqual(other["cost"], out["cost"])
+        other = withoutNumpy(design, pos, req, size=40, Wlimit=6, workers=1,
+                             mentorOptions=options)
+        self.assertEqual(other["cost"], out["cost"])
+
+    def testFlat(self):
+        pos = randomPositions(60, 2)
+        req = randomTraffic(60, 2)
+        out = design(pos, req, size=60, concCost=50, weight=[2] * 60)
+        self.assertEqual(out["regions"], [list(range(60))])
+        self.checkDesign(pos, out, concCost=50)
+        cmp = compareFlat(pos, req, size=20, workers=1)
+        self.assertEqual(cmp["regions"], 3)
+        self.assertEqual(cmp["cost"][1], design(pos, req, size=60)["cost"]
+                                                                   ["total"])
+
+if __name__ == "__main__":
+    unittest.main()
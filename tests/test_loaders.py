@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# Tests of the loaders and of the command line. Matrices written as CSV, 
+# edge lists and .npy files must be read back with the same entries, and 
+# the command line must give the network found by the algorithms.
+
+import contextlib, io, json, os, tempfile, unittest
+
+try:
+    import numpy as np
+except ImportError:                 # .npy files are not tested
+    np = None
+
+import sand.loaders
+from sand.__main__ import main
+from sand.add import ADD
+from sand.loaders import holds, loadMatrix, loadVector
+from sand.mentor import MENTOR, totalCost
+from tests.instances import addInstance, addParams, mentorInstance, mentorParams
+
+# Rows of a matrix read by a loader, as lists
+def tolist(m):
+    return [list(r) for r in m]
+
+class LoaderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def checkCsv(self):
+        m = [[0, 3, 12], [3, 0, -4], [12, -4, 0]]
+        path = self.write("m.csv", "# costs\n0, 3, 12\n\n3 0 -4\n12,-4,0\n")
+        self.assertEqual(tolist(loadMatrix(path)), m)
+        self.assertEqual(tolist(loadMatrix(path, dtype="float32")), m)
+        path = self.write("f.txt", "0.5 1e3\ninf 2\n")
+        self.assertEqual(tolist(loadMatrix(path)), 
+                         [[0.5, 1000.0], [float("inf"), 2.0]])
+        self.assertEqual(list(loadVector(self.write("v.csv", "1 2 3\n"))), 
+                         [1, 2, 3])
+        self.assertEqual(list(loadVector(self.write("v.csv", "1\n2\n3\n"))), 
+                         [1, 2, 3])
+
+    def checkEdges(self):
+        path = self.write("m.edges", "0 1 5\n2 1\n# comment\n1 2 7\n")
+        self.assertEqual(tolist(loadMatrix(path)), 
+                         [[0, 5, 0], [0, 0, 7], [0, 1, 0]])
+        self.assertEqual(tolist(loadMatrix(path, default=9, diagonal=0)),
+                         [[0, 5, 9], [9, 0, 7], [9, 1, 0]])
+        self.assertEqual(tolist(loadMatrix(path, shape=(4, 4), default=9, 
+                                           symmetric=True))[:2],
+                         [[9, 5, 9, 9], [5, 9, 7, 9]])
+        self.assertEqual(tolist(loadMatrix(path, fmt="edges", 
+                                           dtype="float64")), 
+                         [[0, 5, 0], [0, 0, 7], [0, 1, 0]])
+
+    def checkErrors(self):
+        with self.assertRaises(ValueError):
+            loadMatrix(self.write("a.csv", "1 2\n3\n"))
+        with self.assertRaises(ValueError):
+            loadMatrix(self.write("b.csv", "1 2\n3 x\n"))
+        with self.assertRaises(ValueError):
+            loadMatrix(self.write("c.edges", "1 2 3 4\n"))
+        with self.assertRaises(ValueError):
+            loadMatrix(self.write("d.csv", "1\n"), fmt="xml")
+
+    def checkHolds(self):
+        self.assertTrue(holds(None, 2**32 - 1))
+        self.assertTrue(holds("int64", 2**32 - 1))
+        self.assertFalse(holds("int32", 2**32 - 1))
+        self.assertTrue(holds("int32", -2**31))
+        self.assertTrue(holds("float32", 2**32 - 1))
+
+    def testLoaders(self):
+        self.checkCsv()
+        self.checkEdges()
+        self.checkErrors()
+        self.checkHolds()
+
+    def testWithoutNumpy(self):
+        saved = sand.loaders.np
+        sand.loaders.np = None
+        try:
+            self.checkCsv()
+            self.checkEdges()
+            self.checkErrors()
+            self.checkHolds()
+        finally:
+            sand.loaders.np = saved
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testNpy(self):
+        path = os.path.join(self.tmp.name, "m.npy")
+        np.save(path, np.arange(12, dtype=np.int32).reshape(3, 4))
+        m = loadMatrix(path)
+        self.assertIsInstance(m, np.memmap)
+        self.assertEqual(tolist(m), [[0, 1, 2, 3], [4, 5, 6, 7], 
+                                     [8, 9, 10, 11]])
+        self.assertEqual(loadMatrix(path, dtype="float64").dtype, np.float64)
+        np.save(path, np.arange(3))
+        self.assertEqual(list(loadVector(path)), [0, 1, 2])
+
+class CommandTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def writeMatrix(self, name, m):
+        with open(self.path(name), "w") as f:
+            for r in m:
+                f.write(",".join(map(str, r)) + "\n")
+        return self.path(name)
+
+    def writeEdges(self, name, m):
+        with open(self.path(name), "w") as f:
+            for i, r in enumerate(m):
+                for j, x in enumerate(r):
+                    f.write("%d %d %s\n" % (i, j, x))
+        return self.path(name)
+
+    def runMain(self, argv):
+        out = self.path("out.json")
+        main(["-o", out] + argv)
+        with open(out) as f:
+            return json.load(f)
+
+    def testAdd(self):
+        for seed in range(4):
+            pos, cost, Ccost, weight, center = addInstance(20, seed, 
+                                                           weights=True)
+            params = addParams(seed, center)
+            ref = ADD().run(cost, Ccost, weight, **params)
+            argv = ["add", self.writeMatrix("cost.csv", cost), 
+                    self.writeMatrix("ccost.csv", [Ccost]),
+                    "--weight", self.writeMatrix("weight.csv", [weight]),
+                    "--center", str(center), 
+                    "--wlimit", str(params["Wlimit"]), 
+                    "--th-move", str(params["th_move"])]
+            for options in ([], ["--incremental", "--lazy"], ["--k", "19"]):
+                out = self.runMain(argv + options)
+                self.assertEqual(out["cost"], ref["cost"])
+                self.assertEqual(out["assoc"], ref["assoc"])
+                self.assertEqual(out["conc"], sorted(ref["conc"]))
+            out = self.runMain(["--dtype", "int64"] + argv[:1] + 
+                           [self.writeEdges("cost.edges", cost)] + argv[2:])
+            self.assertEqual(out["assoc"], ref["assoc"])
+
+    def testMentor(self):
+        for seed in range(4):
+            pos, cost, req = mentorInstance(20, seed)
+            params = mentorParams(seed)
+            ref = MENTOR().run(cost, req, **params)
+            argv = ["mentor", self.writeMatrix("cost.csv", cost), 
+                    self.writeEdges("req.edges", req)]
+            for name in ("wparm", "rparm", "dparm", "alpha", "cap", "slack"):
+                argv += ["--" + name, str(params[name])]
+            for options in ([], ["--paths", "lca"]):
+                out = self.runMain(argv + options)
+                self.assertEqual(out["backbone"], ref["backbone"])
+                self.assertEqual([tuple(e) for e in out["mesh"]], 
+                                 list(ref["mesh"]))
+                self.assertEqual(out["cost"], totalCost(ref, cost))
+
+    # Missing links of an edge list cost NO_LINK, which must fit in the type
+    # of the matrix. There is no link between 1 and 2 here, so no 
+    # concentrator is worth adding.
+    def testMissingLinks(self):
+        path = self.path("cost.edges")
+        with open(path, "w") as f:
+            f.write("0 1 4\n0 2 7\n1 0 4\n2 0 7\n")
+        ccost = self.writeMatrix("ccost.csv", [[0, 10, 9]])
+        dtypes = [None, "int64", "float32"]
+        if sand.loaders.np is not None:
+            dtypes.append("uint32")
+        for dtype in dtypes:
+            args = ["--dtype", dtype] if dtype else []
+            out = self.runMain(args + ["add", path, ccost])
+            self.assertEqual(out["assoc"], [0, 0, 0])
+            self.assertEqual(out["cost"], 11)
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            with self.assertRaises(SystemExit):
+                main(["--dtype", "int32", "add", path, ccost])
+        self.assertIn("missing links", stderr.getvalue())
+        # The cost matrix is only filled with NO_LINK for edge lists
+        out = self.runMain(["--dtype", "int32", "add", 
+                        self.writeMatrix("cost.csv", [[0, 4, 7], [4, 0, 1], 
+                                                      [7, 1, 0]]), ccost])
+        self.assertEqual(out["assoc"], [0, 2, 2])
+
+    def testWithoutNumpy(self):
+        saved = sand.loaders.np
+        sand.loaders.np = None
+        try:
+            self.testMissingLinks()
+        finally:
+            sand.loaders.np = saved
+
+    # Every input file has its format, from its extension or its option
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testFormats(self):
+        pos, cost, Ccost, weight, center = addInstance(15, 2)
+        ref = ADD().run(cost, Ccost, weight, center=center)
+        npy = self.path("cost.npy")
+        np.save(npy, np.array(cost))
+        ccost = self.writeMatrix("ccost.csv", [Ccost])
+        argv = ["add", npy, ccost, "--center", str(center)]
+        self.assertEqual(self.runMain(argv)["assoc"], ref["assoc"])
+        os.rename(npy, self.path("cost"))
+        argv[1] = self.path("cost")
+        self.assertEqual(self.runMain(["--format", "csv"] + argv + 
+                                      ["--cost-format", "npy"])["assoc"], 
+                         ref["assoc"])
+        with self.assertRaises(ValueError):
+            self.runMain(argv)
+
+if __name__ == "__main__":
+    unittest.main()
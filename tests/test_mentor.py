@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# Tests of MENTOR. Every variant must give the same network as the reference
+# implementation on random instances.
+
+import os, random, tempfile, unittest
+
+try:
+    import numpy as np
+except ImportError:                 # numpy variants are not tested
+    np = None
+
+from benchmarks.instances import randomTree
+from sand.mentor import MENTOR
+import sand.mentor, sand.tree
+from benchmarks import reference
+from tests.instances import mentorInstance, mentorParams
+
+# Run algo, then find its backbone, weights, associations, median and tree 
+# again, stage by stage
+def stages(algo, cost, req, params):
+    algo.run(cost, req, **params)
+    algo.wparm = params["wparm"]
+    backbone, weight, Cassoc = algo._MENTOR__findBackbone()
+    median = algo._MENTOR__findBackboneMedian(backbone, weight)
+    pred = algo._MENTOR__findPrimDijk(median, Cassoc)
+    return backbone, weight, Cassoc, median, pred
+
+def tolist(m):
+    return m.tolist() if hasattr(m, "tolist") else m
+
+# Run f without numpy in sand.mentor and sand.tree
+def withoutNumpy(f, *args, **kwargs):
+    saved = sand.mentor.np, sand.tree.np
+    sand.mentor.np = sand.tree.np = None
+    try:
+        return f(*args, **kwargs)
+    finally:
+        sand.mentor.np, sand.tree.np = saved
+
+class MENTORTest(unittest.TestCase):
+    # Run MENTOR with options and the reference on random instances. The
+    # cost and traffic matrices are given to MENTOR as matrix(cost) and 
+    # matrix(req).
+    def checkSame(self, seeds=range(60), matrix=None, **options):
+        for seed in seeds:
+            pos, cost, req = mentorInstance(3 + seed % 25, seed, 
+                                            integer=seed % 2 == 0)
+            params = mentorParams(seed)
+            ref = reference.MENTOR().run(cost, req, **params)
+            if matrix is not None:
+                cost, req = matrix(cost), matrix(req)
+            out = MENTOR().run(cost, req, **dict(params, **options))
+            self.assertEqual(out, ref, "seed %d" % seed)
+
+    def testDefault(self):
+        self.checkSame()
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testArrays(self):
+        self.checkSame(matrix=np.array)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testMemmap(self):
+        with tempfile.TemporaryDirectory() as path:
+            files = []
+            def memmap(m):
+                files.append(os.path.join(path, "%d.npy" % len(files)))
+                np.save(files[-1], np.array(m))
+                return np.load(files[-1], mmap_mode="r")
+            self.checkSame(seeds=range(20), matrix=memmap)
+
+    def testWithoutNumpy(self):
+        withoutNumpy(self.checkSame, seeds=range(30))
+
+    def testLca(self):
+        self.checkSame(paths="lca")
+        withoutNumpy(self.checkSame, seeds=range(30), paths="lca")
+
+    # The tree tables, for the trees found by MENTOR and for random trees
+    def testSetDist(self):
+        trees = []
+        for seed in range(20):
+            pos, cost, req = mentorInstance(3 + seed % 25, seed)
+            r = reference.MENTOR()
+            backbone, weight, Cassoc, median, pred = stages(r, cost, req, 
+                                                        mentorParams(seed))
+            trees.append((cost, median, pred))
+        for seed in range(20):
+            trees.append(randomTree(2 + seed * 3, seed))
+        for cost, root, pred in trees:
+            r = reference.MENTOR()
+            r.nt, r.cost = len(cost), cost
+            ref = r._MENTOR__setDist(root, pred)
+            algo = MENTOR()
+            algo.nt, algo.cost = len(cost), cost
+            out = algo._MENTOR__setDist(root, pred)
+            self.assertEqual([tolist(m) for m in out], list(ref))
+            out = withoutNumpy(algo._MENTOR__setDist, root, pred)
+            self.assertEqual([tolist(m) for m in out], list(ref))
+
+    # The backbone, the node weights and the associations, for thresholds
+    # from none to all of the nodes
+    def testBackbone(self):
+        for seed in range(40):
+            pos, cost, req = mentorInstance(3 + seed % 25, seed, 
+                                            integer=seed % 2 == 0)
+            for rparm in (0.01, 0.2, 0.5, 1):
+                params = dict(mentorParams(seed), rparm=rparm)
+                ref = stages(reference.MENTOR(), cost, req, params)
+                out = stages(MENTOR(), cost, req, params)
+                self.assertEqual(out[:3], ref[:3], "seed %d" % seed)
+
+    # The trees found by Prim-Dijkstra, for all values of alpha
+    def testPrimDijk(self):
+        for seed in range(40):
+            pos, cost, req = mentorInstance(3 + seed % 25, seed, 
+                                            integer=seed % 2 == 0)
+            for alpha in (0, 0.3, 0.5, 1):
+                params = dict(mentorParams(seed), alpha=alpha)
+                ref = stages(reference.MENTOR(), cost, req, params)
+                out = stages(MENTOR(), cost, req, params)
+                self.assertEqual(out[4], ref[4], "seed %d" % seed)
+
+    # The order of the pairs and their homes, as (i, j) pairs. The reference
+    # numbers the pairs n * i + j, MENTOR among the pairs with i < j.
+    def testSequence(self):
+        for seed in range(30):
+            pos, cost, req = mentorInstance(3 + seed % 25, seed)
+            n = len(cost)
+            params = mentorParams(seed)
+            r = reference.MENTOR()
+            backbone, weight, Cassoc, median, pred = stages(r, cost, req, 
+                                                            params)
+            spPred, spDist = r._MENTOR__setDist(median, pred)
+            seq, home = r._MENTOR__setSequence(spPred)
+            ref = ([divmod(p, n) for p in seq], 
+                   [home[i][j] for i in range(n) for j in range(i+1, n)])
+
+            pairs = [(i, j) for i in range(n) for j in range(i+1, n)]
+            algo = MENTOR()
+            stages(algo, cost, req, params)
+            for f in (algo._MENTOR__setSequence, 
+                      lambda spPred: withoutNumpy(algo._MENTOR__setSequence, 
+                                                  spPred)):
+                seq, home = f(algo._MENTOR__setDist(median, pred)[0])
+                out = ([pairs[p] for p in seq], 
+                       [None if h < 0 else h for h in home])
+                self.assertEqual(out, ref, "seed %d" % seed)
+
+    # After every change of the traffic, redesign() must give the network 
+    # that run() finds with the new traffic
+    def testRedesign(self):
+        for seed in range(30):
+            rnd = random.Random(seed)
+            pos, cost, req = mentorInstance(3 + seed % 25, seed, 
+                                            integer=seed % 3 != 0)
+            n = len(cost)
+            params = dict(mentorParams(seed), paths=rnd.choice(["matrix", 
+                                                                "lca"]))
+            algo = MENTOR()
+            start = req
+            if np is not None and seed % 4 == 1:
+                start = np.array(req)
+            out = algo.run(cost, start, warm=True, **params)
+            req = [list(r) for r in req]
+            for step in range(5):
+                delta = {}
+                for k in range(rnd.randint(1, 5)):
+                    i, j = rnd.randrange(n), rnd.randrange(n)
+                    d = rnd.choice([-3, -1, 1, 2, 5, 20])
+                    if req[i][j] + delta.get((i, j), 0) + d >= 0:
+                        delta[(i, j)] = delta.get((i, j), 0) + d
+                for (i, j), d in delta.items():
+                    req[i][j] += d
+                out = algo.redesign(out, delta)
+                ref = MENTOR().run(cost, req, **params)
+                self.assertEqual(out, ref, "seed %d step %d" % (seed, step))
+
+    # An integer array keeps its type, and numpy integer changes are pushed
+    # through the pairs like Python integers
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testRedesignArray(self):
+        pos, cost, req = mentorInstance(20, 4)
+        params = dict(mentorParams(4), cap=10)
+        algo = MENTOR()
+        out = algo.run(cost, np.array(req, dtype=np.int32), warm=True, 
+                       **params)
+        out = algo.redesign(out, {})
+        self.assertEqual(algo.req.dtype, np.int32)
+        self.assertEqual(out, MENTOR().run(cost, req, **params))
+        out = algo.redesign(out, {(2, 5): np.int64(7), (5, 2): np.int32(3)})
+        self.assertEqual(algo.redesigned, "pairs")
+        req[2][5] += 7
+        req[5][2] += 3
+        self.assertEqual(out, MENTOR().run(cost, req, **params))
+
+    def testRedesignCold(self):
+        with self.assertRaises(ValueError):
+            MENTOR().redesign({"median": 0, "backbone": []}, {})
+
+    # All nodes are in the backbone, but not in the order of their indexes.
+    # The median is found from the moments of the backbone nodes, with the 
+    # weights in the same order.
+    def testBackboneOrder(self):
+        cost = [[0, 2, 9], [2, 0, 7], [9, 7, 0]]
+        req = [[0, 0, 4], [0, 0, 1], [4, 0, 0]]
+        params = {"wparm": 1, "rparm": 0.01, "dparm": 0, "alpha": 0.5, 
+                  "cap": 3, "slack": 0.2}
+        out = MENTOR().run(cost, req, **params)
+        self.assertEqual(out["median"], 2)
+        self.assertEqual(out["tree"], [(0, 1), (1, 2)])
+        self.assertEqual(out, reference.MENTOR().run(cost, req, **params))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# Tests of the online changes of ADD. After every insertion and removal of a
+# terminal, the cost must be the cost of the network, and the network must 
+# be the one found by the same change with nothing cached.
+
+import random, unittest
+
+try:
+    import numpy as np
+except ImportError:                 # numpy variants are not tested
+    np = None
+
+from sand.add import ADD
+from tests.instances import addInstance
+
+VARIANTS = [{}, {"lazy": True}, {"k": 3}]
+if np is not None:
+    VARIANTS += [{"backend": "numpy"}, {"backend": "numpy", "lazy": True}]
+
+class OnlineADDTest(unittest.TestCase):
+    # The cost of the network out on the terminals of algo. As in run(), a 
+    # concentrator that is left without terminals by later concentrators is
+    # still paid for, so the concentrators are the ones not in remConc.
+    def checkCost(self, algo, out):
+        opened = set(range(algo.nc)).difference(algo.remConc)
+        cost = sum([algo.cost[t][c] for t, c in enumerate(out["assoc"])])
+        cost += sum([algo.Ccost[c] for c in opened])
+        self.assertAlmostEqual(out.cost, cost)
+        self.assertLessEqual(out["conc"], opened)
+        for c in out["conc"] - {algo.center}:
+            load = sum([algo.weight[t] for t in out.terminals(c)])
+            self.assertLessEqual(load, algo.Wlimit)
+
+    def checkChanges(self, seed, array, **options):
+        rnd = random.Random(seed)
+        n = 12 + seed % 20
+        pos, cost, Ccost, weight, center = addInstance(n + 15, seed, 
+                                     integer=seed % 2 == 0, 
+                                     weights=seed % 3 == 0)
+        matrix = np.array(cost[:n]) if array else cost[:n]
+        params = dict(options, center=center, Wlimit=2 + seed % 4)
+        algo, cold = ADD(), ADD()
+        algo.run(matrix, Ccost, weight[:n], **params)
+        cold.run(matrix, Ccost, weight[:n], **params)
+        extra = n
+        for step in range(20):
+            if rnd.random() < 0.5 and extra < len(cost):
+                cold.saved, cold.cand = {}, {}
+                out = algo.insertTerminal(cost[extra], weight[extra])
+                ref = cold.insertTerminal(cost[extra], weight[extra])
+                extra += 1
+            elif algo.nt > 1:
+                t = rnd.randrange(algo.nt)
+                cold.saved, cold.cand = {}, {}
+                out = algo.deleteTerminal(t)
+                ref = cold.deleteTerminal(t)
+            else:
+                continue
+            message = "seed %d step %d" % (seed, step)
+            self.checkCost(algo, out)
+            self.assertEqual(out, ref, message)
+            self.assertEqual(out.cost, ref.cost, message)
+
+    def testChanges(self):
+        for seed in range(24):
+            for options in VARIANTS:
+                self.checkChanges(seed, False, **options)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testChangesArray(self):
+        for seed in range(12):
+            for options in VARIANTS:
+                self.checkChanges(seed, True, **options)
+
+    # A concentrator that is left without terminals is opened again with 
+    # its savings found anew
+    def testEmptyConcentrator(self):
+        cost = [[18, 5, 12, 30, 20], [16, 21, 19, 3, 20], 
+                [1, 30, 27, 16, 9], [18, 8, 7, 23, 16]]
+        Ccost = [0, 8, 8, 7, 6]
+        algo = ADD()
+        algo.run(cost, Ccost, [1] * 4, Wlimit=2, incremental=True)
+        out = algo.deleteTerminal(1)
+        self.assertEqual(out.cost, 22)
+        self.checkCost(algo, out)
+
+    # Every terminal is removed, comparing with a cold run every time, and 
+    # one is inserted again
+    def testDeleteAll(self):
+        for seed in range(6):
+            for options in VARIANTS:
+                pos, cost, Ccost, weight, center = addInstance(10, seed)
+                algo = ADD()
+                algo.run(cost, Ccost, weight, center=center, Wlimit=3, 
+                         **options)
+                while algo.nt:
+                    out = algo.deleteTerminal(seed % algo.nt, compare=True)
+                    self.assertIsNotNone(out.compare)
+                    self.checkCost(algo, out)
+                self.assertEqual(out.compare["gap"], 0)
+                self.assertEqual(out["assoc"], [])
+                out = algo.insertTerminal(cost[0], compare=True)
+                self.assertEqual(out["assoc"], [center])
+                self.assertEqual(out.compare["moved"], 0)
+
+    def testErrors(self):
+        with self.assertRaises(ValueError):
+            ADD().deleteTerminal(0)
+        algo = ADD()
+        algo.run([[0, 1], [1, 0]], [0, 5], [1, 1])
+        with self.assertRaises(ValueError):
+            algo.insertTerminal([1, 2, 3])
+        with self.assertRaises(IndexError):
+            algo.deleteTerminal(2)
+
+if __name__ == "__main__":
+    unittest.main()
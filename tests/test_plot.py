@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# Tests of the plots. The algorithms must not load matplotlib, which is only
+# loaded by sand.plot when a network is plotted.
+
+import os, subprocess, sys, tempfile, unittest
+
+try:
+    import matplotlib
+    import numpy as np
+    from sand import plot
+except ImportError:                 # plots are not tested
+    matplotlib = None
+
+from sand import add, mentor
+from sand.add import ADD
+from sand.mentor import MENTOR
+from tests.instances import addInstance, addParams, mentorInstance, mentorParams
+
+# Names of the modules loaded by importing modules in a new interpreter, 
+# and running the statements of setup
+def loadedModules(*modules, setup=""):
+    code = ("import sys\nimport %s\n%s\nprint(' '.join(sys.modules))" % 
+            (", ".join(modules), setup))
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, check=True, 
+                         stdout=subprocess.PIPE, universal_newlines=True)
+    return set(out.stdout.split())
+
+class PlotTest(unittest.TestCase):
+    def testImports(self):
+        loaded = loadedModules("sand.add", "sand.mentor", "sand.result")
+        for name in ("matplotlib", "networkx", "sand.plot"):
+            self.assertNotIn(name, loaded)
+
+    def plotFile(self, plot, out, pos, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "figure.png")
+            plot(out, pos, filename=filename, show=False, **options)
+            self.assertGreater(os.path.getsize(filename), 0)
+
+    @unittest.skipIf(matplotlib is None, "matplotlib is not installed")
+    def testPlotAdd(self):
+        pos, cost, Ccost, weight, center = addInstance(30, 2)
+        out = ADD().run(cost, Ccost, weight, **addParams(2, center))
+        self.plotFile(add.plotNetwork, out, pos)
+        self.plotFile(add.plotNetwork, out, pos, show_center=True, 
+                      labels=[str(i) for i in range(30)])
+
+    @unittest.skipIf(matplotlib is None, "matplotlib is not installed")
+    def testPlotMentor(self):
+        pos, cost, req = mentorInstance(30, 2)
+        out = MENTOR().run(cost, req, **mentorParams(2))
+        self.plotFile(mentor.plotNetwork, out, pos)
+        self.plotFile(mentor.plotNetwork, out, pos, edisp=False)
+
+    # The axes of the figures drawn by draw(), instead of saving them
+    def drawnAxes(self, draw, *args, **options):
+        axes = []
+        saved = plot._finish
+        plot._finish = lambda fig, ax, *rest: axes.append(ax)
+        try:
+            draw(*args, filename=None, show=False, **options)
+        finally:
+            plot._finish = saved
+        return axes[0]
+
+    # The number of links drawn on ax
+    def drawnLinks(self, ax):
+        return sum([len(c.get_segments()) for c in ax.collections 
+                                            if hasattr(c, "get_segments")])
+
+    @unittest.skipIf(matplotlib is None, "matplotlib is not installed")
+    def testSample(self):
+        a = np.arange(100)
+        self.assertIs(plot._sample(a, None), a)
+        self.assertIs(plot._sample(a, 100), a)
+        for maxEdges in (1, 7, 30, 99):
+            b = plot._sample(a, maxEdges)
+            self.assertLessEqual(len(b), maxEdges)
+            self.assertGreaterEqual(len(b), maxEdges // 2)
+            self.assertEqual(b[0], 0)
+
+    @unittest.skipIf(matplotlib is None, "matplotlib is not installed")
+    def testMaxEdges(self):
+        pos, cost, Ccost, weight, center = addInstance(60, 4)
+        out = ADD().run(cost, Ccost, weight, **addParams(4, center))
+        ax = self.drawnAxes(plot.plotAdd, out, pos)
+        self.assertEqual(self.drawnLinks(ax), 60)
+        ax = self.drawnAxes(plot.plotAdd, out, pos, maxEdges=10)
+        self.assertLessEqual(self.drawnLinks(ax), 10)
+        self.plotFile(add.plotNetwork, out, pos, maxEdges=10)
+
+        pos, cost, req = mentorInstance(40, 4)
+        out = MENTOR().run(cost, req, **mentorParams(4))
+        backbone = set(out["backbone"])
+        bknet = len([e for e in out["mesh"] if e[0] in backbone and 
+                                               e[1] in backbone])
+        ax = self.drawnAxes(plot.plotMentor, out, pos)
+        self.assertEqual(self.drawnLinks(ax), 
+                         len(out["mesh"]) + len(out["tree"]))
+        self.assertEqual(len(ax.texts), len(out["mesh"]))
+        ax = self.drawnAxes(plot.plotMentor, out, pos, maxEdges=3)
+        self.assertLessEqual(self.drawnLinks(ax), 
+                             bknet + len(out["tree"]) + 3)
+        self.assertLessEqual(len(ax.texts), bknet + 3)
+
+    # Saving a figure, which is all plotNetwork does by default, does not 
+    # load pyplot, nor networkx
+    @unittest.skipIf(matplotlib is None, "matplotlib is not installed")
+    def testWithoutPyplot(self):
+        code = ("from sand.add import ADD, plotNetwork\n"
+                "out = ADD().run([[0, 1], [1, 0]], [0, 1], [1, 1])\n"
+                "plotNetwork(out, [(0, 0), (1, 1)], filename=%r)")
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "figure.png")
+            loaded = loadedModules("sand.add", setup=code % filename)
+            self.assertTrue(os.path.exists(filename))
+        self.assertIn("sand.plot", loaded)
+        self.assertNotIn("matplotlib.pyplot", loaded)
+        self.assertNotIn("networkx", loaded)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# Tests of the results of ADD and MENTOR. Results must be equal to the dicts
+# of the reference implementation, their reports must match the ones found
+# from those dicts, and they must be read back as they were saved.
+
+import os, tempfile, unittest
+
+try:
+    import numpy as np
+except ImportError:                 # results are not saved
+    np = None
+
+import sand.result
+from sand.add import ADD
+from sand.mentor import MENTOR
+from sand.result import ADDResult, MENTORResult, load
+from benchmarks import reference
+from tests.instances import addInstance, addParams, mentorInstance, mentorParams
+
+class ResultTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def runADD(self, seed):
+        pos, cost, Ccost, weight, center = addInstance(30 + seed, seed, 
+                                                       weights=True)
+        params = addParams(seed, center)
+        ref = reference.ADD().run(cost, Ccost, weight, **params)
+        return ADD().run(cost, Ccost, weight, **params), ref, cost
+
+    def runMENTOR(self, seed):
+        pos, cost, req = mentorInstance(20 + seed, seed)
+        params = mentorParams(seed)
+        ref = reference.MENTOR().run(cost, req, **params)
+        return MENTOR().run(cost, req, **params), ref, cost
+
+    def testADD(self):
+        for seed in range(8):
+            out, ref, cost = self.runADD(seed)
+            self.assertIsInstance(out, ADDResult)
+            self.assertEqual(out, ref)
+            self.assertEqual(set(out.keys()), set(ref) | {"stats", "compare"})
+            self.assertEqual(out.concentrators(), sorted(ref["conc"]))
+            termList = ref["assoc"]
+            self.assertEqual(out.summary(), {c: termList.count(c) 
+                                             for c in ref["conc"]})
+            for c in range(len(termList)):
+                self.assertEqual(list(out.terminals(c)), 
+                        [t for t in range(len(termList)) if termList[t] == c])
+            self.assertEqual(out.report(cost), 
+                [(c, termList.count(c), sum([cost[t][c] for t in 
+                  range(len(termList)) if termList[t] == c])) 
+                 for c in sorted(ref["conc"])])
+
+    def testMENTOR(self):
+        for seed in range(8):
+            out, ref, cost = self.runMENTOR(seed)
+            self.assertIsInstance(out, MENTORResult)
+            self.assertEqual(out, ref)
+            mesh, channels = ref["mesh"], ref["channels"]
+            self.assertEqual(out.links(), [(i, j, ch) for (i, j), ch in 
+                                                      zip(mesh, channels)])
+            for i in range(len(cost)):
+                for j in range(len(cost)):
+                    ch = channels[mesh.index((i, j))] if (i, j) in mesh else (
+                         channels[mesh.index((j, i))] if (j, i) in mesh else 0)
+                    self.assertEqual(out.channel(i, j), ch)
+            total = sum([cost[i][j] * ch for (i, j), ch in zip(mesh, channels)])
+            self.assertEqual(out.totalCost(cost), total)
+            backbone = set(ref["backbone"])
+            self.assertEqual(out.summary(cost), {"cost": total, 
+                "backbone": len(backbone), "links": len(mesh),
+                "backboneLinks": len([e for e in mesh if e[0] in backbone 
+                                                     and e[1] in backbone])})
+
+    def testCompare(self):
+        out, ref, cost = self.runADD(1)
+        other = dict(ref, cost=ref["cost"] + 1)
+        self.assertNotEqual(out, other)
+        self.assertNotEqual(out, [])
+        self.assertEqual(out, ADDResult(ref["cost"], ref["center"], 
+                                        ref["assoc"], {"sorts": 1}))
+        with self.assertRaises(KeyError):
+            out["mesh"]
+        self.assertIsNone(out.get("mesh"))
+        with self.assertRaises(TypeError):
+            hash(out)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testSave(self):
+        path = os.path.join(self.tmp.name, "out.npz")
+        for seed in range(4):
+            for out, ref, cost in (self.runADD(seed), self.runMENTOR(seed)):
+                out.save(path)
+                for mmap in (True, False):
+                    back = load(path, mmap=mmap)
+                    self.assertIs(type(back), type(out))
+                    self.assertEqual(back, ref)
+                    self.assertEqual(back.stats, out.stats)
+                    self.assertEqual(back.report(cost), out.report(cost))
+                    if mmap:
+                        for name in type(out).ARRAYS:
+                            self.assertIsInstance(getattr(back, name), 
+                                                  np.memmap)
+
+    def testWithoutNumpy(self):
+        out, ref, cost = self.runADD(0)
+        saved = sand.result.np
+        sand.result.np = None
+        try:
+            with self.assertRaises(ImportError):
+                out.save(os.path.join(self.tmp.name, "out.npz"))
+        finally:
+            sand.result.np = saved
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# Tests of the timers and counters of the algorithms.
+
+import logging, pstats, unittest
+
+try:
+    import numpy as np
+except ImportError:                 # numpy variants are not tested
+    np = None
+
+import sand.mentor, sand.tree
+from sand.add import ADD
+from sand.mentor import MENTOR
+from tests.instances import addInstance, addParams, mentorInstance, mentorParams
+
+class StatsTest(unittest.TestCase):
+    def runADD(self, algo, n=40, seed=3, **options):
+        pos, cost, Ccost, weight, center = addInstance(n, seed)
+        params = dict(addParams(seed, center), **options)
+        return algo.run(cost, Ccost, weight, **params)
+
+    def runMENTOR(self, algo, n=30, seed=3):
+        pos, cost, req = mentorInstance(n, seed)
+        return algo.run(cost, req, **mentorParams(seed))
+
+    # Every evaluation sorts the savings of a concentrator, and so does 
+    # every added concentrator
+    def testSortsADD(self):
+        stats = self.runADD(ADD()).stats
+        self.assertEqual(stats["sorts"], stats["evaluations"] + stats["added"])
+        self.assertIn("add", stats["times"])
+        stats = self.runADD(ADD(), incremental=True, lazy=True).stats
+        self.assertGreater(stats["skipped"], 0)
+        self.assertLessEqual(stats["sorts"], 
+                             stats["evaluations"] + stats["added"])
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testSortsNumpy(self):
+        stats = self.runADD(ADD(), backend="numpy", incremental=True).stats
+        self.assertGreaterEqual(stats["sorts"], 
+                                stats["evaluations"] + stats["added"])
+
+    # One heap for the backbone and one for the tree, with at least one 
+    # entry taken per backbone node
+    def testSortsMENTOR(self):
+        out = self.runMENTOR(MENTOR())
+        stats = out.stats
+        self.assertEqual(stats["sorts"], 2)
+        self.assertGreaterEqual(stats["pops"], len(out["backbone"]))
+        self.assertGreater(stats["pairs"], 0)
+
+    def testWithoutNumpy(self):
+        saved = sand.mentor.np
+        sand.mentor.np = sand.tree.np = None
+        try:
+            stats = self.runMENTOR(MENTOR()).stats
+        finally:
+            sand.mentor.np = sand.tree.np = saved
+        self.assertEqual(stats["sorts"], 2)
+
+    # The counters are reset at the start of every run
+    def testReset(self):
+        algo = ADD()
+        first = self.runADD(algo).stats
+        second = self.runADD(algo).stats
+        first.pop("times"), second.pop("times")
+        self.assertEqual(first, second)
+
+    def testCallback(self):
+        calls = []
+        algo = MENTOR().instrument(lambda *args: calls.append(args))
+        self.runMENTOR(algo)
+        self.assertTrue(calls)
+        for name, seconds, counters in calls:
+            self.assertGreaterEqual(seconds, 0)
+            self.assertIsInstance(counters, dict)
+        self.assertEqual(calls[-1][2]["sorts"], 2)
+
+    def testProfile(self):
+        algo = ADD().instrument(profile=True)
+        self.runADD(algo)
+        self.assertGreater(pstats.Stats(algo.profiler).total_calls, 0)
+
+    # Debug messages are formatted by the logger, only when they are logged
+    def testLazyLogging(self):
+        records = []
+        handler = logging.Handler(logging.DEBUG)
+        handler.emit = records.append
+        algo = ADD()
+        algo.logger.addHandler(handler)
+        algo.logger.setLevel(logging.DEBUG)
+        try:
+            self.runADD(algo)
+        finally:
+            algo.logger.removeHandler(handler)
+            algo.logger.setLevel(logging.NOTSET)
+        self.assertTrue(records)
+        assoc = [r for r in records if r.msg.startswith("Current association")]
+        self.assertTrue(assoc)
+        for r in assoc:
+            self.assertEqual(r.msg, "Current association = %s")
+
+if __name__ == "__main__":
+    unittest.main()
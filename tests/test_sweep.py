@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# Tests of the parameter sweeps. Every point must give the cost of a run of
+# the algorithm with its parameters.
+
+import unittest
+
+try:
+    import numpy as np
+except ImportError:                 # matrices are not shared
+    np = None
+
+from sand.add import ADD
+from sand.mentor import MENTOR, totalCost
+from sand.sweep import makeGrid, sweep
+from tests.instances import addInstance, mentorInstance
+
+class SweepTest(unittest.TestCase):
+    def testGrid(self):
+        self.assertEqual(makeGrid({"a": [1, 2], "b": [3, 4]}),
+                         [{"a": 1, "b": 3}, {"a": 1, "b": 4}, 
+                          {"a": 2, "b": 3}, {"a": 2, "b": 4}])
+
+    def checkADD(self, cost, workers):
+        pos, lists, Ccost, weight, center = addInstance(30, 1)
+        grid = {"Wlimit": [3, 5, 10], "th_move": [0, 50]}
+        rows = list(sweep("add", grid, cost, Ccost=Ccost, weight=weight, 
+                          workers=workers, center=center))
+        self.assertEqual(sorted([row["point"] for row in rows]), 
+                         list(range(6)))
+        for row in rows:
+            point = makeGrid(grid)[row["point"]]
+            out = ADD().run(lists, Ccost, weight, center=center, **point)
+            self.assertEqual(row["cost"], out.cost)
+            self.assertEqual({n: row[n] for n in point}, point)
+
+    def checkMENTOR(self, cost, req, workers):
+        pos, lists, reqLists = mentorInstance(20, 1)
+        grid = {"alpha": [0, 0.5, 1], "cap": [5, 20]}
+        rows = list(sweep("mentor", grid, cost, req=req, workers=workers,
+                          wparm=0.5))
+        for row in rows:
+            point = makeGrid(grid)[row["point"]]
+            out = MENTOR().run(lists, reqLists, wparm=0.5, **point)
+            self.assertEqual(row["cost"], totalCost(out, lists))
+
+    def testInProcess(self):
+        pos, cost, Ccost, weight, center = addInstance(30, 1)
+        self.checkADD(cost, 1)
+        pos, cost, req = mentorInstance(20, 1)
+        self.checkMENTOR(cost, req, 1)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def testWorkers(self):
+        pos, cost, Ccost, weight, center = addInstance(30, 1)
+        self.checkADD(np.array(cost), 2)
+        self.checkADD(cost, 2)
+        pos, cost, req = mentorInstance(20, 1)
+        self.checkMENTOR(np.array(cost), np.array(req), 2)
+
+    def testUnknown(self):
+        with self.assertRaises(ValueError):
+            list(sweep("add", {"alpha": [1]}, [[0]], Ccost=[0], weight=[1]))
+        with self.assertRaises(ValueError):
+            list(sweep("other", {}, [[0]]))
+
+if __name__ == "__main__":
+    unittest.main()
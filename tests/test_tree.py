@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2017 Maen Artimy
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+# Tests of the tree path queries. A TreePaths must read like the spPred and 
+# spDist tables of the first MENTOR.
+
+import unittest
+
+from benchmarks.instances import randomTree
+from sand.tree import TreePaths
+import sand.tree
+from benchmarks import reference
+
+class TreePathsTest(unittest.TestCase):
+    def checkTables(self):
+        for seed in range(20):
+            cost, root, pred = randomTree(1 + seed * 2, seed)
+            n = len(cost)
+            r = reference.MENTOR()
+            r.nt, r.cost = n, cost
+            spPred, spDist = r._MENTOR__setDist(root, pred)
+            paths = TreePaths(pred, root, [cost[j][pred[j]] for j in range(n)])
+            self.assertEqual(len(paths), n)
+            self.assertEqual([list(paths[i]) for i in range(n)], spPred)
+            self.assertEqual([list(paths.column(j)) for j in range(n)], 
+                             [[r[j] for r in spPred] for j in range(n)])
+            for i in range(n):
+                for j in range(n):
+                    self.assertEqual(paths.prev(i, j), spPred[i][j])
+                    self.assertEqual(paths.dist(i, j), spDist[i][j])
+
+    def testTables(self):
+        self.checkTables()
+
+    def testWithoutNumpy(self):
+        saved = sand.tree.np
+        sand.tree.np = None
+        try:
+            self.checkTables()
+        finally:
+            sand.tree.np = saved
+
+if __name__ == "__main__":
+    unittest.main()